@@ -1,17 +1,18 @@
 import streamlit as st
 import pandas as pd
-import unicodedata
-import glob
-import csv
-import re
 import base64
-from io import StringIO
+from io import BytesIO
 from pathlib import Path
-from datetime import datetime
 from openai import OpenAI
 from dotenv import load_dotenv
 import os
 
+from utils.ai_email import BULK_MAX_WORKERS, EMAIL_SYSTEM, buyer_email_prompt, chat_with_backoff, generate_emails_bulk
+from utils.llm_cache import get_llm_cache
+from utils.buyer_data import CSV_BUYER_FILES, buyer_source_signature, find_local_csv_by_name, load_buyer_snapshot
+from utils.buyer_dedupe import dedupe_buyer_candidates
+from utils.buyer_scoring import INDUSTRY_KEYWORDS, BuyerScoringEngine, buyer_domains, top_k_indices
+
 # ==================== 환경 변수 & OpenAI 초기화 ====================
 load_dotenv()
 
@@ -226,75 +227,15 @@ COUNTRY_OPTIONS = [
     "Australia", "New Zealand",
 ]
 
-# ==================== 상수: CSV 파일명 매핑 ====================
-CSV_BUYER_FILES = {
-    "KOTRA_해외바이어현황_20240829":           "대한무역투자진흥공사_해외바이어 현황_20240829.csv",
-    "중진공_해외바이어구매오퍼_20241231":       "중소벤처기업진흥공단_해외바이어 구매오퍼 정보_20241231.csv",
-    "중진공_해외바이어인콰이어리_20241230":     "중소벤처기업진흥공단_해외바이어 인콰이어리 신청_20241230.csv",
-    "무보_화장품바이어_20200812":              "한국무역보험공사_화장품 바이어 정보_20200812.csv",
-    "중진공_고비즈코리아거래처_20250523":       "중소벤처기업진흥공단_고비즈코리아 거래처정보_20250523.csv",
-}
-
-# ==================== 상수: 산업 키워드 매핑 ====================
-INDUSTRY_KEYWORDS = {
-    "화장품/뷰티": [
-        "cosmetics", "beauty", "skincare", "skin care", "makeup", "personal care",
-        "lotion", "cream", "serum", "toner", "cleanser", "sunscreen", "mask", "fragrance",
-        "k-beauty", "kbeauty",
-    ],
-    "전자제품": [
-        "electronics", "electronic", "device", "gadget", "semiconductor", "chip",
-        "display", "battery", "charger", "adapter", "smart", "iot", "sensor", "led",
-    ],
-    "식품": [
-        "food", "beverage", "snack", "drink", "coffee", "tea", "sauce",
-        "noodle", "ramen", "instant", "frozen", "seafood", "meat", "fruit",
-    ],
-    "섬유/의류": [
-        "apparel", "clothing", "garment", "textile", "fabric", "fashion",
-        "yarn", "cotton", "polyester", "knit", "denim", "outerwear", "sportswear",
-    ],
-    "자동차 부품": [
-        "auto", "automotive", "car", "vehicle", "spare parts", "parts",
-        "engine", "brake", "filter", "tire", "tyre", "transmission", "sensor",
-    ],
-    "기계/설비": [
-        "machinery", "equipment", "industrial", "manufacturing", "factory",
-        "pump", "valve", "compressor", "tool", "robot", "automation", "cnc",
-    ],
-    "의료기기": [
-        "medical", "healthcare", "diagnostic", "surgical", "hospital",
-        "clinic", "monitor", "disposable", "sterile",
-    ],
-    "기타": ["import", "export", "trade", "sourcing", "procurement"],
-}
-
-# ==================== 소스별 가중치 ====================
-SOURCE_WEIGHT = {
-    "중진공_해외바이어구매오퍼_20241231":   6,
-    "중진공_해외바이어인콰이어리_20241230": 6,
-    "무보_화장품바이어_20200812":          8,
-    "중진공_고비즈코리아거래처_20250523":   2,
-    "KOTRA_해외바이어현황_20240829":       -5,
-}
-
 # ============================================================
 # OpenAI 호출
 # ============================================================
-def get_openai_response(prompt: str, system_message: str = "당신은 무역 전문가입니다.") -> str:
+def get_openai_response(prompt: str, system_message: str = "당신은 무역 전문가입니다.", use_cache: bool = True) -> str:
     if not client:
         return "⚠️ OpenAI API가 설정되지 않았습니다. .env에 OPENAI_API_KEY를 확인하세요."
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user",   "content": prompt},
-            ],
-            temperature=0.7,
-            max_tokens=900,
-        )
-        return response.choices[0].message.content
+        # 같은 프롬프트 응답은 디스크 캐시(utils.llm_cache)에서 재사용 — use_cache=False 면 새로 생성
+        return chat_with_backoff(client, prompt, system_message, use_cache=use_cache)
     except Exception as e:
         return f"⚠️ API 오류: {e}"
 
@@ -309,281 +250,66 @@ def generate_buyer_email(
     purchase_history: list[str],
     contact_person: str | None = None,
     email: str | None = None,
+    use_cache: bool = True,
 ) -> str:
-    prompt = f"""
-다음 바이어에게 보낼 비즈니스 이메일을 한국어로 작성해주세요.
-
-- 회사명: {buyer_name}
-- 국가: {country}
-- 산업: {industry}
-- 관심 제품/범주: {', '.join(purchase_history)}
-- 담당자(알려진 경우): {contact_person or '미확인'}
-- 이메일(알려진 경우): {email or '미확인'}
-
-**중요**: 이메일 본문에서 반드시 "{buyer_name}" 회사명을 명시적으로 언급해주세요.
-한국 제품 수출 업체로서 파트너십을 제안하는 전문적이고 간결한 이메일을 작성해주세요.
-제목과 본문을 포함해주세요.
-"""
-    return get_openai_response(prompt, "당신은 국제 비즈니스 커뮤니케이션 전문가입니다.")
+    prompt = buyer_email_prompt(buyer_name, country, industry, purchase_history, contact_person, email)
+    return get_openai_response(prompt, EMAIL_SYSTEM, use_cache=use_cache)
 
 
-def translate_email(email_content: str, target_language: str) -> str:
+def translate_email(email_content: str, target_language: str, use_cache: bool = True) -> str:
     prompt = f"""
 다음 이메일을 {target_language}로 번역해주세요.
 비즈니스 이메일 톤을 유지하세요.
 
 {email_content}
 """
-    return get_openai_response(prompt, "당신은 전문 비즈니스 번역가입니다.")
+    return get_openai_response(prompt, "당신은 전문 비즈니스 번역가입니다.", use_cache=use_cache)
 
 
 # ============================================================
-# CSV 로딩 & 정규화 유틸리티
+# 바이어 테이블 로딩 (스냅샷) & 스코어링 엔진
 # ============================================================
-def _nfc(s: str) -> str:
-    return unicodedata.normalize("NFC", s)
-
-
-def _find_local_csv_by_name(filename: str) -> str | None:
-    target = _nfc(filename)
-    candidates = [
-        Path.cwd() / filename,
-        Path.cwd() / "data" / filename,
-        Path.cwd() / "datasets" / filename,
-    ]
-    for p in candidates:
-        if p.exists():
-            return str(p)
-    for p in glob.glob("**/*.csv", recursive=True):
-        if _nfc(Path(p).name) == target:
-            return str(Path(p))
-    return None
-
-
-def _read_csv_bytes_flexible(raw: bytes) -> tuple[pd.DataFrame, str, str]:
-    encodings = ["utf-8-sig", "utf-8", "cp949", "euc-kr"]
-    text, used_enc = None, None
-    for enc in encodings:
-        try:
-            text     = raw.decode(enc)
-            used_enc = enc
-            break
-        except Exception:
-            continue
-    if text is None:
-        text     = raw.decode("cp949", errors="replace")
-        used_enc = "cp949(errors=replace)"
-
-    sample = text[:5000]
-    try:
-        dialect = csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-        sep = dialect.delimiter
-    except Exception:
-        sep = ","
-
-    df = pd.read_csv(StringIO(text), sep=sep, engine="python", on_bad_lines="skip")
-    if df.shape[1] == 1:
-        for alt in [",", ";", "\t", "|"]:
-            if alt == sep:
-                continue
-            df2 = pd.read_csv(StringIO(text), sep=alt, engine="python", on_bad_lines="skip")
-            if df2.shape[1] > 1:
-                df, sep = df2, alt
-                break
-    return df, used_enc, sep
-
-
-def _read_csv_flexible_from_path(path: str) -> tuple[pd.DataFrame, str, str]:
-    return _read_csv_bytes_flexible(Path(path).read_bytes())
-
-
-def _norm_col(s: str) -> str:
-    s = re.sub(r"\s+", "", str(s).strip().lower())
-    return s.replace("-", "").replace("_", "")
-
-
-def _infer_col(cols: list[str], keywords: list[str]) -> str | None:
-    normed = {c: _norm_col(c) for c in cols}
-    for c, nc in normed.items():
-        for kw in keywords:
-            if kw in nc:
-                return c
-    return None
-
-
-def _safe_get(row, col) -> str:
-    if not col:
-        return ""
-    v = row.get(col)
-    return "" if pd.isna(v) else str(v).strip()
-
-
-def _parse_date_any(x: str):
-    if not x:
-        return None
-    for fmt in ["%Y-%m-%d", "%Y.%m.%d", "%Y/%m/%d", "%Y%m%d", "%Y-%m", "%Y.%m", "%Y/%m"]:
-        try:
-            return datetime.strptime(str(x).strip(), fmt)
-        except Exception:
-            continue
-    return None
-
-
-def _guess_country_from_text(text: str) -> str:
-    t = (text or "").lower()
-    if not t:
-        return ""
-    hints = {
-        "united states": "United States", "usa": "United States", "u.s.": "United States",
-        "canada": "Canada", "japan": "Japan",
-        "korea": "South Korea", "republic of korea": "South Korea",
-        "china": "China", "vietnam": "Vietnam", "singapore": "Singapore",
-        "hong kong": "Hong Kong", "taiwan": "Taiwan",
-        "uk": "United Kingdom", "united kingdom": "United Kingdom",
-        "germany": "Germany", "france": "France", "italy": "Italy", "spain": "Spain",
-        "australia": "Australia", "india": "India",
-        "u.a.e": "United Arab Emirates", "uae": "United Arab Emirates",
-        "saudi": "Saudi Arabia",
-    }
-    for k, v in hints.items():
-        if k in t:
-            return v
-    return ""
-
-
-@st.cache_data(ttl=3600)
-def load_and_standardize_buyer_csv(resolved_paths: dict) -> tuple[pd.DataFrame, pd.DataFrame]:
-    rows, meta = [], []
-    for source_name, path in resolved_paths.items():
-        if not path:
-            meta.append({"source": source_name, "status": "missing", "detail": "path not resolved"})
-            continue
-        try:
-            df, enc, sep = _read_csv_flexible_from_path(path)
-        except Exception as e:
-            meta.append({"source": source_name, "status": "fail", "detail": str(e)})
-            continue
-
-        cols = list(df.columns)
-        col_company  = _infer_col(cols, ["상호명", "회사", "기업", "업체", "buyer", "company", "corporation", "기관명", "조직"])
-        col_title    = _infer_col(cols, ["제목", "title"])
-        col_item     = _infer_col(cols, ["품목명", "품목", "제품", "item", "product", "카테고리", "category", "오퍼", "inquiry"])
-        col_country  = _infer_col(cols, ["국가명", "국가", "country", "nation", "소재국", "거주국"])
-        col_city     = _infer_col(cols, ["도시", "city", "영문도시", "영문시군구", "시군구", "소재지"])
-        col_hs       = _infer_col(cols, ["hs", "hscode", "hs코드", "품목코드", "세번"])
-        col_name     = _infer_col(cols, ["담당자", "contact", "name", "성명", "대표자"])
-        col_email    = _infer_col(cols, ["이메일", "email", "e-mail", "메일"])
-        col_phone    = _infer_col(cols, ["전화", "phone", "tel", "연락처", "mobile", "핸드폰"])
-        col_web      = _infer_col(cols, ["웹", "홈페이지", "website", "url", "domain", "사이트"])
-        col_addr     = _infer_col(cols, ["주소", "기본주소", "address"])
-        col_date     = _infer_col(cols, ["상담일", "신청시작일", "신청종료일", "등록", "신청", "일자", "날짜", "date", "created", "updated"])
-
-        for _, r in df.iterrows():
-            company = _safe_get(r, col_company)
-            title   = _safe_get(r, col_title)
-            item    = _safe_get(r, col_item)
-            if not company:
-                company = (f"Inquiry/Offer: {title or item}") if (title or item) else "Unknown Company"
-
-            country  = _safe_get(r, col_country)
-            addr     = _safe_get(r, col_addr)
-            website  = _safe_get(r, col_web)
-            email_v  = _safe_get(r, col_email)
-            if not country:
-                country = _guess_country_from_text(addr) or _guess_country_from_text(website) or _guess_country_from_text(email_v)
-
-            rows.append({
-                "company_name":   company,
-                "country":        country,
-                "city":           _safe_get(r, col_city),
-                "product_text":   " ".join(x for x in [item, title] if x),
-                "hs_code":        _safe_get(r, col_hs),
-                "contact_person": _safe_get(r, col_name),
-                "email":          email_v,
-                "phone":          _safe_get(r, col_phone),
-                "website":        website,
-                "address":        addr,
-                "date":           _parse_date_any(_safe_get(r, col_date)),
-                "date_raw":       _safe_get(r, col_date),
-                "source":         source_name,
-            })
-        meta.append({"source": source_name, "status": "ok", "rows": len(df), "cols": len(cols), "encoding": enc, "sep": sep, "path": path})
-
-    df_all  = pd.DataFrame(rows)
-    df_meta = pd.DataFrame(meta)
-    if not df_all.empty:
-        for c in ["company_name", "country", "city", "product_text", "hs_code",
-                  "contact_person", "email", "phone", "website", "address", "date_raw", "source"]:
-            df_all[c] = df_all[c].fillna("").astype(str).str.strip()
-    return df_all, df_meta
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_buyer_tables(resolved_paths: dict, source_sig: tuple) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # source_sig(원본 크기/mtime)가 바뀔 때만 다시 로드 — 반환 DataFrame 은 수정하지 말 것
+    return load_buyer_snapshot(resolved_paths)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_buyer_scoring_engine(resolved_paths: dict, source_sig: tuple) -> BuyerScoringEngine:
+    df_all, _ = load_buyer_tables(resolved_paths, source_sig)
+    return BuyerScoringEngine(df_all)
 
 
 # ============================================================
-# 스코어링 & 중복 제거
+# 검색 결과 후보 (상위 행만 dict 로 변환)
 # ============================================================
-def score_buyer_record(
-    row: dict,
-    industry: str,
-    hs_code: str,
-    countries_selected: list[str],
-    require_email: bool,
-) -> int:
-    score   = 0
-    prod    = (row.get("product_text") or "").lower()
-    comp    = (row.get("company_name") or "").lower()
-    hs      = (row.get("hs_code") or "").replace(" ", "")
-    country = (row.get("country") or "").lower()
-
-    kws = INDUSTRY_KEYWORDS.get(industry, [])
-    if any(kw.lower() in prod for kw in kws):  score += 30
-    if any(kw.lower() in comp for kw in kws):  score += 10
-
-    if hs_code:
-        hk = hs_code.replace(" ", "")
-        if hk and hk in hs:
-            score += 45
-
-    if countries_selected:
-        if any(c.lower() in country for c in countries_selected if c):
-            score += 20
-        else:
-            score -= 15
-
-    if row.get("email"):          score += 20
-    if row.get("contact_person"): score += 8
-    if row.get("phone"):          score += 6
-    if row.get("website"):        score += 6
-
-    if require_email and not row.get("email"):
-        score -= 999
-
-    dt = row.get("date")
-    if isinstance(dt, datetime):
-        days_ago = (datetime.now() - dt).days
-        if   days_ago <= 90:  score += 10
-        elif days_ago <= 365: score += 5
-
-    score += SOURCE_WEIGHT.get(row.get("source", ""), 0)
-    return max(-999, min(100, score))
-
-
-def dedupe_buyer_candidates(records: list[dict]) -> list[dict]:
-    if not records:
-        return records
-    df = pd.DataFrame(records)
-    if df.empty:
-        return records
-
-    df["email_key"] = df["email"].fillna("").astype(str).str.lower().str.strip()
-    df["cc_key"] = (
-        df["company_name"].fillna("").astype(str).str.lower().str.strip()
-        + "|"
-        + df["country_targets"].apply(lambda x: ",".join(x) if isinstance(x, list) else str(x)).str.lower().str.strip()
-    )
-    with_email = df[df["email_key"] != ""].sort_values("match_score", ascending=False).drop_duplicates("email_key")
-    no_email   = df[df["email_key"] == ""].sort_values("match_score", ascending=False).drop_duplicates("cc_key")
-    out = pd.concat([with_email, no_email]).sort_values("match_score", ascending=False)
-    return out.drop(columns=["email_key", "cc_key"]).to_dict(orient="records")
+def build_buyer_candidates(rows: pd.DataFrame, scores, industry: str, countries: list[str]) -> list[dict]:
+    website = rows["website"].fillna("").astype(str)
+    email   = rows["email"].fillna("").astype(str)
+    domain  = buyer_domains(website, email)
+    has_dom = domain != ""
+
+    out = pd.DataFrame({
+        "company_name":      rows["company_name"].to_numpy(),
+        "domain":            domain.to_numpy(),
+        "website":           website.where(website != "", ("https://" + domain).where(has_dom, "")).to_numpy(),
+        "industry":          industry,
+        "email":             email.where(email != "", ("info@" + domain).where(has_dom, "")).to_numpy(),
+        "contact_person":    rows["contact_person"].where(rows["contact_person"] != "", "미추출").to_numpy(),
+        "match_score":       pd.Series(scores, dtype="int64").to_numpy(),
+        "source":            rows["source"].to_numpy(),
+        "_raw_country":      rows["country"].to_numpy(),
+        "_raw_city":         rows["city"].to_numpy(),
+        "_raw_product_text": rows["product_text"].to_numpy(),
+        "_raw_hs":           rows["hs_code"].to_numpy(),
+        "_raw_phone":        rows["phone"].to_numpy(),
+    })
+    records = out.to_dict(orient="records")
+    for r in records:
+        r["match_score"] = int(r["match_score"])
+        r["country_targets"] = countries
+    return records
 
 
 # ============================================================
@@ -591,6 +317,10 @@ def dedupe_buyer_candidates(records: list[dict]) -> list[dict]:
 # ============================================================
 if "matched_buyers" not in st.session_state:
     st.session_state.matched_buyers = []
+if "matched_buyers_ver" not in st.session_state:
+    st.session_state.matched_buyers_ver = 0
+if "matched_query" not in st.session_state:
+    st.session_state.matched_query = {}   # 검색 당시의 HS 코드 / 제품 설명 (이메일 생성용, 입력창이 바뀌어도 유지)
 
 st.markdown("""
     <style>
@@ -734,10 +464,11 @@ st.markdown("""
 # ============================================================
 # CSV 로딩
 # ============================================================
-resolved_paths = {k: _find_local_csv_by_name(v) for k, v in CSV_BUYER_FILES.items()}
+resolved_paths = {k: find_local_csv_by_name(v) for k, v in CSV_BUYER_FILES.items()}
+source_sig     = buyer_source_signature(resolved_paths)
 
 with st.spinner("📦로딩 중…"):
-    df_all, df_meta = load_and_standardize_buyer_csv(resolved_paths)
+    df_all, df_meta = load_buyer_tables(resolved_paths, source_sig)
 
 loaded_count = df_meta[df_meta["status"] == "ok"].shape[0] if not df_meta.empty else 0
 total_rows   = len(df_all)
@@ -762,6 +493,7 @@ with col_left:
     st.markdown("### 제품 정보")
     industry    = st.selectbox("산업 분야", list(INDUSTRY_KEYWORDS.keys()))
     hs_code     = st.text_input("HS 코드 (선택)", placeholder="예: 3304, 8517")
+    query_text  = st.text_input("제품 설명 (선택)", placeholder="예: 비건 세럼, vitamin c serum")
     max_results = st.slider("최대 후보 수", min_value=10, max_value=300, value=60, step=10)
 
 with col_right:
@@ -786,50 +518,30 @@ if st.button("🔍 바이어 후보 발굴", use_container_width=True, type="pri
     if df_all.empty:
         st.error("데이터가 비어있습니다.")
     else:
-        df = df_all.copy()
-        df["match_score"] = df.apply(
-            lambda r: score_buyer_record(
-                r.to_dict(),
-                industry=industry,
-                hs_code=hs_code.strip(),
-                countries_selected=selected_countries,
-                require_email=require_email,
-            ),
-            axis=1,
+        scores = get_buyer_scoring_engine(resolved_paths, source_sig).score(
+            industry=industry,
+            hs_code=hs_code.strip(),
+            countries_selected=selected_countries,
+            require_email=require_email,
+            query_text=query_text,
         )
-
         threshold = 35 if hs_code.strip() else 20
-        df = df[df["match_score"] >= threshold].sort_values("match_score", ascending=False)
-
-        buyers = []
-        for _, row in df.iterrows():
-            website = row.get("website", "")
-            email   = row.get("email", "")
-            domain  = ""
-            if website:
-                domain = str(website).strip().lower().replace("https://", "").replace("http://", "").split("/")[0]
-            elif email and "@" in str(email):
-                domain = str(email).split("@")[-1].strip().lower()
-
-            buyers.append({
-                "company_name":      row.get("company_name", "Unknown"),
-                "domain":            domain,
-                "website":           website or (f"https://{domain}" if domain else ""),
-                "industry":          industry,
-                "country_targets":   selected_countries,
-                "email":             email or (f"info@{domain}" if domain else ""),
-                "contact_person":    row.get("contact_person", "") or "미추출",
-                "match_score":       int(row.get("match_score", 0)),
-                "source":            row.get("source", "CSV"),
-                "_raw_country":      row.get("country", ""),
-                "_raw_city":         row.get("city", ""),
-                "_raw_product_text": row.get("product_text", ""),
-                "_raw_hs":           row.get("hs_code", ""),
-                "_raw_phone":        row.get("phone", ""),
-            })
-
-        buyers = dedupe_buyer_candidates(buyers)[:max_results]
+
+        # 상위 후보만 꺼내 중복 제거 — 중복으로 max_results 가 안 채워지면 범위를 넓혀 다시 시도
+        fetch = max_results * 2
+        while True:
+            top = top_k_indices(scores, threshold, fetch)
+            buyers = dedupe_buyer_candidates(
+                build_buyer_candidates(df_all.iloc[top], scores[top], industry, selected_countries)
+            )
+            if len(buyers) >= max_results or len(top) < fetch:
+                break
+            fetch *= 2
+
+        buyers = buyers[:max_results]
         st.session_state.matched_buyers = buyers
+        st.session_state.matched_buyers_ver += 1
+        st.session_state.matched_query = {"hs_code": hs_code.strip(), "query_text": query_text.strip()}
 
         if buyers:
             st.markdown(f"""
@@ -845,37 +557,54 @@ if st.button("🔍 바이어 후보 발굴", use_container_width=True, type="pri
 # ============================================================
 # 결과 카드 + AI 이메일 생성
 # ============================================================
-if st.session_state.matched_buyers:
-    st.markdown("---")
-    st.markdown("### 검색된 바이어 후보 목록")
+def buyer_key(buyer: dict, idx: int) -> str:
+    return f"{buyer.get('domain','') or buyer.get('company_name','')}|{idx}"
+
+
+def buyer_email_args(buyer: dict) -> dict:
+    # 단건 / 일괄 생성 공용: generate_buyer_email / buyer_email_prompt 인자
+    # 입력창의 현재 값이 아니라 이 후보들을 찾을 때 쓴 검색 조건
+    query = st.session_state.matched_query
+    interest = [buyer.get("industry", "")]
+    if query.get("hs_code"):
+        interest.append(f"HS {query['hs_code']}")
+    if query.get("query_text"):
+        interest.append(query["query_text"])
+    contact_person = buyer.get("contact_person")
+    return {
+        "buyer_name":       buyer.get("company_name", ""),
+        "country":          ", ".join(buyer.get("country_targets", [])) or buyer.get("_raw_country", ""),
+        "industry":         buyer.get("industry", ""),
+        "purchase_history": [x for x in interest if x],
+        "contact_person":   None if contact_person == "미추출" else contact_person,
+        "email":            buyer.get("email"),
+    }
 
-    for idx, buyer in enumerate(st.session_state.matched_buyers):
-        key = f"{buyer.get('domain','') or buyer.get('company_name','')}|{idx}"
 
-        has_real_email = bool(buyer.get("email")) and "@" in buyer.get("email", "")
-        has_contact    = buyer.get("contact_person") not in ["", "미추출"]
-        badge_html     = (
-            '<span class="badge-ok">✅ 연락처 확보</span>'
-            if (has_real_email or has_contact)
-            else '<span class="badge-warn">🔍 미확인</span>'
-        )
+def render_buyer_detail(buyer: dict, idx: int) -> None:
+    key = buyer_key(buyer, idx)
 
-        st.markdown(
-            f"<div style='margin-top:8px;'>"
-            f"{badge_html} "
-            # f"<strong style='color:#051161;'>매칭 점수: {buyer['match_score']}점</strong>"
-            f"</div>",
-            unsafe_allow_html=True,
-        )
+    has_real_email = bool(buyer.get("email")) and "@" in buyer.get("email", "")
+    has_contact    = buyer.get("contact_person") not in ["", "미추출"]
+    badge_html     = (
+        '<span class="badge-ok">✅ 연락처 확보</span>'
+        if (has_real_email or has_contact)
+        else '<span class="badge-warn">🔍 미확인</span>'
+    )
 
-        with st.expander(
-            f"{idx+1}. {buyer['company_name']}  ({buyer.get('domain','') or 'no-domain'})",
-            expanded=(idx == 0),
-        ):
-            col_info, col_action = st.columns([3, 1])
+    st.markdown(
+        f"<div style='margin-top:8px;'>"
+        f"{badge_html} "
+        f"<strong style='color:#051161;'>{idx+1}. {buyer['company_name']}</strong> "
+        f"({buyer.get('domain','') or 'no-domain'})"
+        f"</div>",
+        unsafe_allow_html=True,
+    )
 
-            with col_info:
-                st.markdown(f"""
+    col_info, col_action = st.columns([3, 1])
+
+    with col_info:
+        st.markdown(f"""
 | 항목 | 내용 |
 |---|---|
 | 🌐 웹사이트 | {buyer.get('website') or 'N/A'} |
@@ -885,76 +614,196 @@ if st.session_state.matched_buyers:
 | 📍 국가 | {buyer.get('_raw_country') or 'N/A'} |
 """)
 
-            with col_action:
-                st.markdown("<br><br>", unsafe_allow_html=True)
-                if st.button("✉️ AI 이메일 생성", key=f"email_btn_{key}", use_container_width=True):
-                    st.session_state[f"generate_email_{key}"] = True
-                    st.rerun()
-
-            if st.session_state.get(f"generate_email_{key}", False):
-                st.markdown("#### 📧 AI 생성 제안 이메일")
-
-                contact_person = buyer.get("contact_person")
-                email_addr     = buyer.get("email")
-
-                interest = [buyer.get("industry", "")]
-                if hs_code.strip():
-                    interest.append(f"HS {hs_code.strip()}")
-
-                content_key = f"email_content_{key}"
-                if content_key not in st.session_state:
-                    with st.spinner("AI가 맞춤 이메일을 작성 중입니다…"):
-                        st.session_state[content_key] = generate_buyer_email(
-                            buyer_name=buyer.get("company_name", ""),
-                            country=", ".join(buyer.get("country_targets", [])) or buyer.get("_raw_country", ""),
-                            industry=buyer.get("industry", ""),
-                            purchase_history=[x for x in interest if x],
-                            contact_person=None if contact_person == "미추출" else contact_person,
-                            email=email_addr,
-                        )
-
-                edit_key = f"email_edit_{key}"
-                if edit_key not in st.session_state:
-                    st.session_state[edit_key] = st.session_state[content_key]
-
-                en_state_key = f"trans_en_result_{key}"
-                cn_state_key = f"trans_cn_result_{key}"
-                submit_en, submit_cn = False, False
-
-                with st.form(key=f"email_form_{key}"):
-                    st.text_area(
-                        "🇰🇷 한국어 이메일 (수정 가능)",
-                        height=280,
-                        key=edit_key,
+    with col_action:
+        st.markdown("<br><br>", unsafe_allow_html=True)
+        if st.button("✉️ AI 이메일 생성", key=f"email_btn_{key}", use_container_width=True):
+            st.session_state[f"generate_email_{key}"] = True
+
+    if st.session_state.get(f"generate_email_{key}", False):
+        st.markdown("#### 📧 AI 생성 제안 이메일")
+
+        content_key = f"email_content_{key}"
+        # 캐시에 저장된 이메일 대신 새로 작성 (캐시 우회)
+        regenerate = st.button("🔄 새로 작성", key=f"email_regen_{key}")
+        if regenerate:
+            for k in (content_key, f"email_edit_{key}", f"trans_en_result_{key}", f"trans_cn_result_{key}"):
+                st.session_state.pop(k, None)
+        if content_key not in st.session_state:
+            with st.spinner("AI가 맞춤 이메일을 작성 중입니다…"):
+                st.session_state[content_key] = generate_buyer_email(**buyer_email_args(buyer), use_cache=not regenerate)
+
+        edit_key = f"email_edit_{key}"
+        if edit_key not in st.session_state:
+            st.session_state[edit_key] = st.session_state[content_key]
+
+        en_state_key = f"trans_en_result_{key}"
+        cn_state_key = f"trans_cn_result_{key}"
+        submit_en, submit_cn = False, False
+
+        with st.form(key=f"email_form_{key}"):
+            st.text_area(
+                "🇰🇷 한국어 이메일 (수정 가능)",
+                height=280,
+                key=edit_key,
+            )
+            col_t1, col_t2 = st.columns(2)
+            with col_t1:
+                submit_en = st.form_submit_button("🇺🇸 영어로 번역", use_container_width=True)
+            with col_t2:
+                submit_cn = st.form_submit_button("🇨🇳 중국어로 번역", use_container_width=True)
+
+        if submit_en:
+            kr_text = st.session_state.get(edit_key, "").strip()
+            if kr_text:
+                with st.spinner("영어로 번역 중…"):
+                    st.session_state[en_state_key] = translate_email(kr_text, "영어")
+            else:
+                st.warning("번역할 내용이 없습니다.")
+
+        if submit_cn:
+            kr_text = st.session_state.get(edit_key, "").strip()
+            if kr_text:
+                with st.spinner("중국어로 번역 중…"):
+                    st.session_state[cn_state_key] = translate_email(kr_text, "중국어")
+            else:
+                st.warning("번역할 내용이 없습니다.")
+
+        if en_state_key in st.session_state:
+            st.text_area("🇺🇸 영어 번역", st.session_state[en_state_key], height=280, key=f"email_en_{key}")
+        if cn_state_key in st.session_state:
+            st.text_area("🇨🇳 중국어 번역", st.session_state[cn_state_key], height=280, key=f"email_cn_{key}")
+
+
+# 표 + 선택한 바이어 상세만 그리므로 후보 수와 관계없이 다시 그리는 비용이 일정
+# (표 선택 / 이메일 생성 클릭은 이 fragment 만 다시 실행 — 같은 실행 안에서 바로 아래에 그리므로 st.rerun 불필요)
+@st.fragment
+def render_matched_buyers() -> None:
+    buyers = st.session_state.matched_buyers
+
+    table = pd.DataFrame({
+        "No":     range(1, len(buyers) + 1),
+        "회사명": [b.get("company_name", "") for b in buyers],
+        "국가":   [b.get("_raw_country", "") for b in buyers],
+        "도메인": [b.get("domain", "") for b in buyers],
+        "연락처": [
+            "✅" if ((b.get("email") and "@" in b.get("email", "")) or b.get("contact_person") not in ["", "미추출"]) else "🔍"
+            for b in buyers
+        ],
+        "출처":   [b.get("source", "") for b in buyers],
+    })
+    event = st.dataframe(
+        table,
+        hide_index=True,
+        use_container_width=True,
+        height=min(38 + 35 * len(table), 400),
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"buyer_table_{st.session_state.matched_buyers_ver}",
+    )
+    st.caption("행을 클릭하면 상세 정보와 AI 이메일 생성 화면이 아래에 표시됩니다. (열 제목 클릭 시 정렬)")
+
+    rows = event.selection.rows
+    idx  = rows[0] if rows and rows[0] < len(buyers) else 0
+    render_buyer_detail(buyers[idx], idx)
+
+
+# 선택한 바이어들의 이메일을 워커 풀로 동시에 생성 (완료되는 대로 표에 추가)
+@st.fragment
+def render_bulk_email() -> None:
+    buyers = st.session_state.matched_buyers
+    ver    = st.session_state.matched_buyers_ver
+
+    with st.expander("📨 AI 이메일 일괄 생성", expanded=False):
+        # 후보가 1명이면 slider 의 min == max 라 만들 수 없음
+        top_n = 1 if len(buyers) == 1 else st.slider(
+            "생성할 바이어 수 (상위부터)",
+            min_value=1, max_value=len(buyers), value=min(50, len(buyers)),
+            key=f"bulk_top_n_{ver}",
+        )
+        picked = st.multiselect(
+            "직접 선택 (선택하면 위 개수 대신 사용)",
+            options=list(range(len(buyers))),
+            format_func=lambda i: f"{i+1}. {buyers[i].get('company_name', '')}",
+            key=f"bulk_picked_{ver}",
+        )
+        workers   = st.slider("동시 요청 수", min_value=1, max_value=8, value=BULK_MAX_WORKERS, key="bulk_workers")
+        use_cache = st.checkbox("이전에 생성한 이메일 재사용 (캐시)", value=True, key="bulk_use_cache")
+
+        if st.button("🚀 일괄 생성 시작", use_container_width=True, key=f"bulk_start_{ver}"):
+            if not client:
+                st.error("⚠️ OpenAI API가 설정되지 않았습니다. .env에 OPENAI_API_KEY를 확인하세요.")
+            else:
+                targets  = picked or list(range(top_n))
+                jobs     = [{"id": i, **buyer_email_args(buyers[i])} for i in targets]
+                progress = st.progress(0.0, text=f"0 / {len(jobs)}")
+                live     = st.empty()
+                done: list[dict] = []
+
+                def on_result(res: dict) -> None:
+                    done.append(res)
+                    progress.progress(len(done) / len(jobs), text=f"{len(done)} / {len(jobs)}")
+                    live.dataframe(
+                        pd.DataFrame(done)[["company_name", "status"]].rename(columns={"company_name": "회사명", "status": "상태"}),
+                        hide_index=True, use_container_width=True, height=240,
                     )
-                    col_t1, col_t2 = st.columns(2)
-                    with col_t1:
-                        submit_en = st.form_submit_button("🇺🇸 영어로 번역", use_container_width=True)
-                    with col_t2:
-                        submit_cn = st.form_submit_button("🇨🇳 중국어로 번역", use_container_width=True)
-
-                if submit_en:
-                    kr_text = st.session_state.get(edit_key, "").strip()
-                    if kr_text:
-                        with st.spinner("영어로 번역 중…"):
-                            st.session_state[en_state_key] = translate_email(kr_text, "영어")
-                    else:
-                        st.warning("번역할 내용이 없습니다.")
-                    st.rerun()
-
-                if submit_cn:
-                    kr_text = st.session_state.get(edit_key, "").strip()
-                    if kr_text:
-                        with st.spinner("중국어로 번역 중…"):
-                            st.session_state[cn_state_key] = translate_email(kr_text, "중국어")
-                    else:
-                        st.warning("번역할 내용이 없습니다.")
-                    st.rerun()
-
-                if en_state_key in st.session_state:
-                    st.text_area("🇺🇸 영어 번역", st.session_state[en_state_key], height=280, key=f"email_en_{key}")
-                if cn_state_key in st.session_state:
-                    st.text_area("🇨🇳 중국어 번역", st.session_state[cn_state_key], height=280, key=f"email_cn_{key}")
+
+                results = generate_emails_bulk(client, jobs, max_workers=workers, on_result=on_result, use_cache=use_cache)
+                for res in results:
+                    if res["status"] == "ok":
+                        # 상세 화면에서도 바로 보이도록 단건 생성 결과 자리에 저장
+                        st.session_state[f"email_content_{buyer_key(buyers[res['id']], res['id'])}"] = res["content"]
+                st.session_state.bulk_emails = {"ver": ver, "results": sorted(results, key=lambda r: r["id"])}
+                live.empty()
+
+        bulk = st.session_state.get("bulk_emails")
+        if bulk and bulk["ver"] == ver:
+            rows = []
+            for res in bulk["results"]:
+                b = buyers[res["id"]]
+                rows.append({
+                    "No":     res["id"] + 1,
+                    "회사명": b.get("company_name", ""),
+                    "국가":   b.get("_raw_country", ""),
+                    "이메일": b.get("email", ""),
+                    "상태":   "✅" if res["status"] == "ok" else f"⚠️ {res['error']}",
+                    "본문":   res["content"],
+                })
+            out = pd.DataFrame(rows)
+            ok  = (out["본문"] != "").sum()
+            st.success(f"{ok} / {len(out)}건 생성 완료")
+            st.dataframe(out, hide_index=True, use_container_width=True, height=300)
+
+            xlsx = BytesIO()
+            with pd.ExcelWriter(xlsx, engine="openpyxl") as writer:
+                out.to_excel(writer, index=False, sheet_name="emails")
+            col_csv, col_xlsx = st.columns(2)
+            with col_csv:
+                st.download_button(
+                    "⬇️ CSV 다운로드", out.to_csv(index=False).encode("utf-8-sig"),
+                    file_name="buyer_emails.csv", mime="text/csv", use_container_width=True,
+                )
+            with col_xlsx:
+                st.download_button(
+                    "⬇️ XLSX 다운로드", xlsx.getvalue(),
+                    file_name="buyer_emails.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    use_container_width=True,
+                )
+
+
+if st.session_state.matched_buyers:
+    st.markdown("---")
+    st.markdown("### 검색된 바이어 후보 목록")
+    render_matched_buyers()
+    render_bulk_email()
+
+    try:
+        cache_stats = get_llm_cache().stats()
+        st.caption(
+            f"💾 AI 응답 캐시: {cache_stats['entries']:,}건 · 적중 {cache_stats['hits']:,} / 미적중 {cache_stats['misses']:,}"
+        )
+    except Exception:
+        pass
 
 # --- Footer ---
 st.divider()
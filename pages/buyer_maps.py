@@ -3,10 +3,11 @@ import pandas as pd
 import folium
 from streamlit_folium import st_folium
 from datetime import datetime
-from pathlib import Path
 import os
 import base64
 
+from utils.data_files import find_data_file
+
 # ==========================================
 # [설정] 페이지 및 스타일
 # ==========================================
@@ -211,38 +212,9 @@ with st.sidebar:
 # [데이터] 경로 및 좌표 설정
 # ==========================================
 
-def find_data_file(filename: str) -> Path | None:
-    """
-    EXHIBITION_PLAN.csv 같은 파일을
-    (현재 파일 위치 -> 상위 폴더들)로 올라가며 자동 탐색해서 찾는다.
-    우선순위:
-      1) <어딘가>/assets/pages/data/<filename>
-      2) <어딘가>/pages/data/<filename>  (예비)
-      3) <어딘가>/data/<filename>        (예비)
-    """
-    here = Path(__file__).resolve()
-
-    candidates_rel = [
-        Path("assets/pages/data") / filename,
-        Path("pages/data") / filename,
-        Path("data") / filename,
-    ]
-
-    # __file__ 기준으로 위로 올라가며 탐색
-    for parent in [here.parent] + list(here.parents):
-        for rel in candidates_rel:
-            p = parent / rel
-            if p.exists():
-                return p
-
-    # 마지막 fallback: 현재 작업 디렉토리 기준도 한 번 더
-    cwd = Path.cwd().resolve()
-    for rel in candidates_rel:
-        p = cwd / rel
-        if p.exists():
-            return p
-
-    return None
+# 데이터 파일 위치는 utils.data_files 공용 매니페스트에서 조회 (find_data_file)
+# 우선순위: assets/pages/data → pages/data (예비) → data (예비)
+MAP_DATA_SUBDIRS = ["assets/pages/data", "pages/data", "data"]
 
 
 # 주요 도시 위경도 좌표
@@ -264,7 +236,7 @@ CITY_COORDS = {
 # ==========================================
 @st.cache_data
 def load_exhibitions():
-    csv_path = find_data_file("EXHIBITION_PLAN.csv")
+    csv_path = find_data_file("EXHIBITION_PLAN.csv", subdirs=MAP_DATA_SUBDIRS)
 
     if not csv_path:
         st.error("❌ EXHIBITION_PLAN.csv 파일을 찾지 못했습니다.")
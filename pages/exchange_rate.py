@@ -19,6 +19,8 @@ import plotly.graph_objects as go
 from urllib.parse import unquote
 import base64
 
+from utils.figure_cache import cached_figure
+
 # --- [1. 페이지 기본 설정] ---
 st.set_page_config(page_title="Trade Master 2026", layout="wide", page_icon="🚢")
 
@@ -260,6 +262,7 @@ def get_ai_exchange_insight(df_rates):
     except Exception as e:
         return f"❌ AI 분석 중 오류 발생: {e}"
 
+@cached_figure
 def draw_candlestick_chart(df, label):
     fig = go.Figure(data=[go.Candlestick(
         x=df['날짜'],
@@ -5,22 +5,26 @@ UN Comtrade + Amazon Rainforest API 통합 분석 모듈
 
 from __future__ import annotations
 
-import json
 import os
 import re
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import requests
 import streamlit as st
 from dotenv import load_dotenv
 from plotly.subplots import make_subplots
 from urllib.parse import quote
 import openai
 
+from utils.comtrade_client import MACRO_ANNUAL_YEARS, MACRO_MONTHLY_YEARS, MACRO_REPORTERS, get_comtrade_client
+from utils.comtrade_store import get_comtrade_store, monthly_periods
+from utils.countries import ISO3_BY_NAME, normalize_country
+from utils.figure_cache import FIGURE_CACHE_SIZE, cached_figure, clear_figure_cache, figure_cache_stats
+from utils.swr import revalidate
+
 # ==================== 설정 및 상수 ====================
 
 CACHE_EXPIRY_DAYS = 7
@@ -206,56 +210,69 @@ def has_any(text: str, keywords: List[str]) -> bool:
 
 # ==================== 헬퍼 함수 (Comtrade) ====================
 
-def get_country_name_comtrade(code) -> str:
-    if pd.isna(code):
-        return "알 수 없음"
-    try:
-        code = int(code)
-        return COUNTRY_CODE_MAP.get(code, f"국가코드 {code}")
-    except Exception:
-        return "알 수 없음"
+def _build_partner_lookup() -> pd.DataFrame:
+    """Comtrade 국가 코드 → 한글 국가명 → ISO-3 표 (모듈 로드 시 한 번). ISO_MAP 우선, 없으면 utils.countries"""
+    table = pd.DataFrame({"countryName": pd.Series(COUNTRY_CODE_MAP)})
+    table["iso_alpha"] = table["countryName"].map(ISO_MAP).fillna(
+        table["countryName"].map(lambda name: ISO3_BY_NAME.get(normalize_country(name)))
+    )
+    return table
 
-# ==================== 캐싱 (Comtrade) ====================
 
-def get_cache_filename(cache_dir: str, hs_code: str, reporter_code: str, flow_code: str, data_type: str) -> str:
-    return os.path.join(cache_dir, f"{hs_code}_{reporter_code}_{flow_code}_{data_type}.json")
+PARTNER_LOOKUP = _build_partner_lookup()
+ISO3_BY_COUNTRY_NAME = dict(zip(PARTNER_LOOKUP["countryName"], PARTNER_LOOKUP["iso_alpha"]))
 
-def is_cache_valid(cache_file: str) -> bool:
-    if not os.path.exists(cache_file):
-        return False
-    file_time = datetime.fromtimestamp(os.path.getmtime(cache_file))
-    return datetime.now() - file_time < timedelta(days=CACHE_EXPIRY_DAYS)
 
-def load_from_cache(cache_file: str) -> Optional[pd.DataFrame]:
-    try:
-        with open(cache_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            if data:
-                return pd.DataFrame(data)
-    except Exception:
-        return None
-    return None
+def add_partner_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    수집 시 한 번: partnerCode(없으면 reporterCode) → countryName / iso_alpha 를 category 열로 추가 (df 를 직접 수정).
+    이후 집계·지도는 이 열을 그대로 쓴다 (행마다 apply·복사 없음).
+    """
+    code_col = "partnerCode" if "partnerCode" in df.columns else "reporterCode" if "reporterCode" in df.columns else None
+    if code_col is None:
+        df["countryName"] = pd.Categorical(["알 수 없음"] * len(df))
+        df["iso_alpha"] = pd.Categorical([None] * len(df))
+        return df
+    codes = pd.to_numeric(df[code_col], errors="coerce")
+    # 공용 Series 를 매퍼로 쓰면 pandas 가 그 인덱스를 처음 쓸 때 내부 구조를 만들며, 이 부분이 스레드 안전하지 않다
+    # (연간/월별 수집 스레드가 동시에 부름). 그래서 dict 를 넘겨 호출마다 새로 만든다
+    names = codes.map(COUNTRY_CODE_MAP)
+    unknown = names.isna() & codes.notna()
+    if unknown.any():
+        names[unknown] = "국가코드 " + codes[unknown].astype("int64").astype(str)
+    df["countryName"] = names.fillna("알 수 없음").astype("category")
+    df["iso_alpha"] = df["countryName"].map(ISO3_BY_COUNTRY_NAME).astype("category")
+    return df
 
-def save_to_cache(cache_file: str, df: pd.DataFrame) -> bool:
-    try:
-        if df is not None and len(df) > 0:
-            with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(df.to_dict("records"), f, ensure_ascii=False)
-            return True
-    except Exception:
-        return False
-    return False
+
+def _with_partner_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # 수집 단계(_load_annual)를 거친 프레임은 그대로, 아니면 복사본에 열 추가
+    return df if "countryName" in df.columns and "iso_alpha" in df.columns else add_partner_columns(df.copy())
+
+# ==================== 캐싱 (Comtrade) ====================
+
+def _comtrade_store(cache_dir: str):
+    return get_comtrade_store(cache_dir, CACHE_EXPIRY_DAYS * 86400)
 
 def get_cache_info(cache_dir: str) -> Dict[str, float]:
     if not os.path.exists(cache_dir):
-        return {"count": 0, "size_mb": 0.0}
-    files = [f for f in os.listdir(cache_dir) if f.endswith(".json")]
-    total_size = sum(os.path.getsize(os.path.join(cache_dir, f)) for f in files)
-    return {"count": len(files), "size_mb": round(total_size / (1024 * 1024), 2)}
+        return {"count": 0, "size_mb": 0.0, "max_mb": 0.0, "hit_ratio": 0.0, "saved_mb": 0.0}
+    store = _comtrade_store(cache_dir)
+    stats = store.stats()
+    return {
+        "count":     stats["periods"],
+        "size_mb":   round(stats["bytes"] / (1024 * 1024), 2),
+        "max_mb":    round(store.max_bytes / (1024 * 1024), 1),
+        "hit_ratio": stats["hit_ratio"],
+        "saved_mb":  round(stats["bytes_saved"] / (1024 * 1024), 2),
+    }
 
 def clear_cache(cache_dir: str) -> bool:
     try:
         if os.path.exists(cache_dir):
+            _comtrade_store(cache_dir).clear()
+            clear_figure_cache()
+            # 예전 방식(요청별 JSON 파일) 캐시도 정리
             for file in os.listdir(cache_dir):
                 if file.endswith(".json"):
                     os.remove(os.path.join(cache_dir, file))
@@ -269,52 +286,29 @@ def _call_comtrade(url: str, params: dict, primary_key: Optional[str], secondary
     # 🚨 키가 없으면 호출 자체를 막아 에러 로그 도배 방지
     if not primary_key and not secondary_key:
         return None
-    
-    headers = {}
-    if primary_key:
-        headers["Ocp-Apim-Subscription-Key"] = primary_key
-    
-    try:
-        resp = requests.get(url, params=params, headers=headers, timeout=timeout)
-        
-        # 429(Too Many Requests) 또는 401 발생 시 보조 키 시도
-        if resp.status_code in (401, 429) and secondary_key:
-            headers["Ocp-Apim-Subscription-Key"] = secondary_key
-            resp = requests.get(url, params=params, headers=headers, timeout=timeout)
-        
-        if resp.status_code != 200:
-            return None
-        return resp.json()
-    except Exception as e:
-        st.error(f"❌ API 호출 실패: {e}")
-        return None
+    # 공용 클라이언트: 연결 재사용 + 호출 한도 + 429/5xx 백오프 + 키 순환
+    return get_comtrade_client([primary_key, secondary_key]).get(url, params, timeout=timeout)
 
 
-def fetch_comtrade_data_module(
-    hs_code: str,
-    year: str,
-    reporter_code: str,
-    flow_code: str = "M",
-    use_cache: bool = True,
-    cache_dir: Optional[str] = None,
-) -> Optional[pd.DataFrame]:
-    settings = get_settings()
-    cache_dir = cache_dir or settings["CACHE_DIR"]
-    
-    # 1. 캐시 확인
-    if use_cache:
-        cache_file = get_cache_filename(cache_dir, hs_code, reporter_code, flow_code, f"annual_{year}")
-        if is_cache_valid(cache_file):
-            cached = load_from_cache(cache_file)
-            if cached is not None:
-                st.info("✅ Comtrade 데이터 캐시에서 로드 (API 호출 절약!)")
-                return cached
-    
-    # 2. 키 확인 (없으면 조기 종료)
-    if not settings["PRIMARY_KEY"] and not settings["SECONDARY_KEY"]:
-        st.warning("⚠️ API 키가 없어 연간 데이터를 불러올 수 없습니다.")
-        return None
+# 월별(연도별) + 연간 요청을 동시에 보내는 최대 스레드 수 (실제 호출 속도는 공용 클라이언트의 호출 한도가 정함)
+COMTRADE_MAX_WORKERS = 8
+
+Notice = Tuple[str, str]   # (st 함수 이름, 메시지) — 작업 스레드에서는 st.* 를 부르지 않고 모아 두었다가 메인에서 출력
+
+
+def _emit_notices(notices: List[Notice]) -> None:
+    for level, msg in notices:
+        getattr(st, level)(msg)
+
 
+REFRESHING_BADGE = ":orange[🔄 갱신 중] 저장된 데이터를 먼저 보여 드리고, 최신 데이터를 뒤에서 받고 있습니다. (다시 실행하면 반영)"
+
+
+def _fetch_annual(
+    hs_code: str, year: str, reporter_code: str, flow_code: str,
+    keys: Tuple[Optional[str], Optional[str]], store,
+) -> Optional[List[dict]]:
+    """연간 API 호출 → 레코드 (호출 실패면 None). store 가 있으면 결과를 저장"""
     url = "https://comtradeapi.un.org/data/v1/get/C/A/HS"
     params = {
         "reporterCode": reporter_code,
@@ -323,90 +317,158 @@ def fetch_comtrade_data_module(
         "flowCode": flow_code,
         "typeCode": "C",
     }
-    
-    res = _call_comtrade(url, params, settings["PRIMARY_KEY"], settings["SECONDARY_KEY"], timeout=30)
-    if not res or "data" not in res or not res["data"]:
+    res = _call_comtrade(url, params, keys[0], keys[1], timeout=30)
+    if not res or "data" not in res:
         return None
-    
-    df = pd.DataFrame(res["data"])
-    
-    if "partnerCode" in df.columns:
-        df["countryName"] = df["partnerCode"].apply(get_country_name_comtrade)
-    elif "reporterCode" in df.columns:
-        df["countryName"] = df["reporterCode"].apply(get_country_name_comtrade)
-    else:
-        df["countryName"] = "알 수 없음"
-    
-    if use_cache:
-        cache_file = get_cache_filename(cache_dir, hs_code, reporter_code, flow_code, f"annual_{year}")
-        save_to_cache(cache_file, df)
-    
-    return df
+    records = res["data"] or []
+    if store is not None:
+        store.put(hs_code, reporter_code, flow_code, "A", [year], records)
+    return records
 
 
-def fetch_monthly_data_optimized(
+def _fetch_monthly(
+    hs_code: str, reporter_code: str, flow_code: str, periods: List[str],
+    keys: Tuple[Optional[str], Optional[str]], store,
+) -> Dict[int, Optional[List[dict]]]:
+    """월별 API 호출 (연도별 요청을 동시에) → {연도: 레코드 또는 None(호출 실패)}. store 가 있으면 저장"""
+    url = "https://comtradeapi.un.org/data/v1/get/C/M/HS"
+    months_by_year: Dict[int, List[str]] = {}
+    for p in periods:
+        months_by_year.setdefault(int(p[:4]), []).append(p)
+
+    def _year_params(months: List[str]) -> dict:
+        return {
+            "reporterCode": reporter_code,
+            "period": ",".join(months),
+            "cmdCode": hs_code,
+            "flowCode": flow_code,
+            "typeCode": "C",
+        }
+
+    years = sorted(months_by_year)
+    with ThreadPoolExecutor(max_workers=min(len(years), COMTRADE_MAX_WORKERS)) as pool:
+        responses = list(pool.map(
+            lambda y: _call_comtrade(url, _year_params(months_by_year[y]), keys[0], keys[1], timeout=60), years
+        ))
+
+    out: Dict[int, Optional[List[dict]]] = {}
+    for year, res in zip(years, responses):
+        if not res or "data" not in res:
+            out[year] = None
+            continue
+        out[year] = res["data"] or []
+        if store is not None:
+            # 빈 결과도 기록해 같은 달을 다시 요청하지 않음 (호출 실패는 기록하지 않음)
+            store.put(hs_code, reporter_code, flow_code, "M", months_by_year[year], out[year])
+    return out
+
+
+def _load_annual(
+    hs_code: str,
+    year: str,
+    reporter_code: str,
+    flow_code: str,
+    keys: Tuple[Optional[str], Optional[str]],
+    use_cache: bool,
+    cache_dir: str,
+) -> Tuple[Optional[pd.DataFrame], List[Notice]]:
+    year = str(year)
+    store = _comtrade_store(cache_dir) if use_cache else None
+    has_key = bool(keys[0] or keys[1])
+
+    # 1. 캐시 확인 (데이터가 없던 연도도 기록돼 있으면 다시 호출하지 않음)
+    records, notices = None, []
+    if store is not None:
+        cached, missing, stale = store.lookup(hs_code, reporter_code, flow_code, "A", [year])
+        if not missing:
+            records = cached
+            notices.append(("info", "✅ Comtrade 데이터 캐시에서 로드 (API 호출 절약!)"))
+            # TTL 이 지난 데이터는 바로 보여 주고 뒤에서 갱신 (저장소에서 연도 단위로 통째로 교체)
+            if stale and has_key:
+                revalidate(
+                    ("comtrade", store.path, hs_code, reporter_code, flow_code, "A", year),
+                    lambda: _fetch_annual(hs_code, year, reporter_code, flow_code, keys, store),
+                )
+                notices.append(("caption", REFRESHING_BADGE))
+
+    if records is None:
+        # 2. 키 확인 (없으면 조기 종료)
+        if not has_key:
+            return None, [("warning", "⚠️ API 키가 없어 연간 데이터를 불러올 수 없습니다.")]
+        records = _fetch_annual(hs_code, year, reporter_code, flow_code, keys, store)
+        if records is None:
+            return None, []
+
+    if not records:
+        return None, notices
+
+    df = add_partner_columns(pd.DataFrame(records))
+    return df, notices
+
+
+def _load_monthly(
     hs_code: str,
     reporter_code: str,
     flow_code: str,
     start_year: int,
     end_year: int,
-    use_cache: bool = True,
-    cache_dir: Optional[str] = None,
-) -> Optional[pd.DataFrame]:
-    settings = get_settings()
-    cache_dir = cache_dir or settings["CACHE_DIR"]
-    
+    keys: Tuple[Optional[str], Optional[str]],
+    use_cache: bool,
+    cache_dir: str,
+) -> Tuple[Optional[pd.DataFrame], List[Notice]]:
     if start_year > end_year:
         start_year, end_year = end_year, start_year
-    
-    # 1. 캐시 확인
-    if use_cache:
-        cache_file = get_cache_filename(cache_dir, hs_code, reporter_code, flow_code, f"monthly_{start_year}_{end_year}")
-        if is_cache_valid(cache_file):
-            cached = load_from_cache(cache_file)
-            if cached is not None:
-                st.info("✅ 월별 데이터 캐시에서 로드 (API 호출 절약!)")
-                return cached
-    
-    # 🚨 키 확인 (반복문 진입 전 체크하여 에러 도배 방지)
-    if not settings["PRIMARY_KEY"] and not settings["SECONDARY_KEY"]:
-        st.error(f"❌ UN Comtrade API 키가 없습니다. (확인된 변수: UN_COMTRADE_KEY)")
-        return None
 
-    url = "https://comtradeapi.un.org/data/v1/get/C/M/HS"
-    all_res_data = []
-
-    # 연도별 반복 호출
-    for year in range(start_year, end_year + 1):
-        periods = [f"{year}{m:02d}" for m in range(1, 13)]
-        period_str = ",".join(periods)
-        
-        params = {
-            "reporterCode": reporter_code,
-            "period": period_str,
-            "cmdCode": hs_code,
-            "flowCode": flow_code,
-            "typeCode": "C",
-        }
-        
-        res = _call_comtrade(url, params, settings["PRIMARY_KEY"], settings["SECONDARY_KEY"], timeout=60)
-        
-        if res and "data" in res and res["data"]:
-            all_res_data.extend(res["data"])
-            st.caption(f"📊 {year}년 월별 데이터 수집 완료...")
+    periods = monthly_periods(start_year, end_year)
+    store = _comtrade_store(cache_dir) if use_cache else None
+    has_key = bool(keys[0] or keys[1])
+
+    # 1. 캐시 확인: 이미 받아 둔 달은 저장소에서, 빠진 달만 API 로
+    all_res_data: List[dict] = []
+    missing, stale = periods, []
+    if store is not None:
+        all_res_data, missing, stale = store.lookup(hs_code, reporter_code, flow_code, "M", periods)
+
+    notices: List[Notice] = []
+    if not missing:
+        notices.append(("info", "✅ 월별 데이터 캐시에서 로드 (API 호출 절약!)"))
+    elif len(missing) < len(periods):
+        notices.append(("info", f"✅ 월별 데이터 {len(periods) - len(missing)}개월은 캐시에서 로드, {len(missing)}개월만 새로 요청합니다."))
+
+    # TTL 이 지난 달은 저장된 값을 그대로 쓰고 뒤에서 갱신
+    if stale and has_key:
+        revalidate(
+            ("comtrade", store.path, hs_code, reporter_code, flow_code, "M", tuple(stale)),
+            lambda: _fetch_monthly(hs_code, reporter_code, flow_code, stale, keys, store),
+        )
+        notices.append(("caption", REFRESHING_BADGE))
+
+    if missing:
+        # 🚨 키 확인 (요청 전 체크하여 에러 도배 방지)
+        if not has_key:
+            notices.append(("error", "❌ UN Comtrade API 키가 없습니다. (확인된 변수: UN_COMTRADE_KEY)"))
+            if not all_res_data:
+                return None, notices
         else:
-            st.warning(f"⚠️ {year}년 월별 데이터가 없거나 호출에 실패했습니다.")
+            # 연도별 요청을 동시에 보냄 (결과/메시지는 연도 순서대로)
+            for year, records in _fetch_monthly(hs_code, reporter_code, flow_code, missing, keys, store).items():
+                if records:
+                    all_res_data.extend(records)
+                    notices.append(("caption", f"📊 {year}년 월별 데이터 수집 완료..."))
+                else:
+                    notices.append(("warning", f"⚠️ {year}년 월별 데이터가 없거나 호출에 실패했습니다."))
 
     if not all_res_data:
-        return None
+        return None, notices
     
     df = pd.DataFrame(all_res_data)
     
     for col in ("primaryValue", "netWgt", "period"):
         if col not in df.columns:
             # 데이터가 있어도 필수 컬럼이 없으면 스킵
-            return None
+            return None, notices
     
+    df["period"] = df["period"].astype(str)
     monthly = (
         df.groupby("period", as_index=False)
         .agg({"primaryValue": "sum", "netWgt": "sum"})
@@ -418,10 +480,41 @@ def fetch_monthly_data_optimized(
     
     monthly = monthly[["period", "value", "weight", "price_per_kg"]].sort_values("period")
     
-    if use_cache:
-        cache_file = get_cache_filename(cache_dir, hs_code, reporter_code, flow_code, f"monthly_{start_year}_{end_year}")
-        save_to_cache(cache_file, monthly)
-    
+    return monthly, notices
+
+
+def fetch_comtrade_data_module(
+    hs_code: str,
+    year: str,
+    reporter_code: str,
+    flow_code: str = "M",
+    use_cache: bool = True,
+    cache_dir: Optional[str] = None,
+) -> Optional[pd.DataFrame]:
+    settings = get_settings()
+    df, notices = _load_annual(
+        hs_code, year, reporter_code, flow_code,
+        (settings["PRIMARY_KEY"], settings["SECONDARY_KEY"]), use_cache, cache_dir or settings["CACHE_DIR"],
+    )
+    _emit_notices(notices)
+    return df
+
+
+def fetch_monthly_data_optimized(
+    hs_code: str,
+    reporter_code: str,
+    flow_code: str,
+    start_year: int,
+    end_year: int,
+    use_cache: bool = True,
+    cache_dir: Optional[str] = None,
+) -> Optional[pd.DataFrame]:
+    settings = get_settings()
+    monthly, notices = _load_monthly(
+        hs_code, reporter_code, flow_code, start_year, end_year,
+        (settings["PRIMARY_KEY"], settings["SECONDARY_KEY"]), use_cache, cache_dir or settings["CACHE_DIR"],
+    )
+    _emit_notices(notices)
     return monthly
 
 
@@ -534,6 +627,7 @@ def search_hs_code_by_product(product_name: str) -> List[dict]:
 
 # ==================== 시각화 ====================
 
+@cached_figure
 def create_volume_trend_chart(monthly_data: pd.DataFrame, hs_code: str, flow_type: str) -> Optional[go.Figure]:
     if monthly_data is None or len(monthly_data) == 0:
         return None
@@ -582,24 +676,21 @@ def create_market_share_table(df: pd.DataFrame, flow_type: str) -> Optional[pd.D
     if df is None or len(df) == 0:
         return None
     
-    df2 = df.copy()
-    if "countryName" not in df2.columns:
-        if "partnerCode" in df2.columns:
-            df2["countryName"] = df2["partnerCode"].apply(get_country_name_comtrade)
-        else:
-            df2["countryName"] = "알 수 없음"
+    df = _with_partner_columns(df)
+    
+    # 필수 컬럼 보정 (집계 전에, 없는 열만 새 프레임에 추가)
+    missing = {col: 0 for col in ["primaryValue", "netWgt"] if col not in df.columns}
+    if missing:
+        df = df.assign(**missing)
     
-    # 필수 컬럼 보정
-    for col in ["primaryValue", "netWgt"]:
-        if col not in df2.columns: df2[col] = 0
-            
     country_data = (
-        df2.groupby("countryName", as_index=False)
+        df.groupby("countryName", as_index=False, observed=True)
         .agg({"primaryValue": "sum", "netWgt": "sum"})
         .sort_values("primaryValue", ascending=False)
         .head(15)
         .reset_index(drop=True)
     )
+    country_data["countryName"] = country_data["countryName"].astype(str)
     
     # netWgt를 숫자로 변환
     country_data["netWgt"] = pd.to_numeric(country_data["netWgt"], errors='coerce').fillna(0)
@@ -626,24 +717,18 @@ def create_market_share_table(df: pd.DataFrame, flow_type: str) -> Optional[pd.D
     return country_data[["순위", "국가명", "거래액 (USD)", "거래량 (톤)", "시장점유율 (%)", "평균단가 ($/kg)", "전년대비 성장률 (%)"]]
 
 
+@cached_figure
 def create_partner_value_map(df: pd.DataFrame, title: str) -> Tuple[Optional[go.Figure], int]:
     if df is None or len(df) == 0:
         return None, 0
     
-    df2 = df.copy()
-    if "countryName" not in df2.columns:
-        if "partnerCode" in df2.columns:
-            df2["countryName"] = df2["partnerCode"].apply(get_country_name_comtrade)
-        else:
-            df2["countryName"] = "알 수 없음"
-            
-    if "primaryValue" not in df2.columns: df2["primaryValue"] = 0
-    
-    agg = df2.groupby("countryName", as_index=False)["primaryValue"].sum()
-    agg["iso_alpha"] = agg["countryName"].map(ISO_MAP)
+    if "primaryValue" not in df.columns:
+        return None, 0
+    df = _with_partner_columns(df)
     
-    unmapped = int(agg["iso_alpha"].isna().sum())
-    agg = agg.dropna(subset=["iso_alpha"])
+    # ISO-3 가 없는 국가(지역 코드 등)는 지도에서 제외하고 개수만 알려 줌
+    unmapped = int(df.loc[df["iso_alpha"].isna(), "countryName"].nunique())
+    agg = df.groupby(["countryName", "iso_alpha"], as_index=False, observed=True)["primaryValue"].sum()
     
     if len(agg) == 0:
         return None, unmapped
@@ -674,27 +759,22 @@ def generate_market_insight(df: pd.DataFrame, hs_code: str, country_name: str) -
     if "primaryValue" not in df.columns:
         return "⚠️ primaryValue 컬럼이 없습니다."
     
-    df2 = df.copy()
-    if "countryName" not in df2.columns:
-        if "partnerCode" in df2.columns:
-            df2["countryName"] = df2["partnerCode"].apply(get_country_name_comtrade)
-        else:
-            df2["countryName"] = "알 수 없음"
+    df = _with_partner_columns(df)
     
-    top_3 = df2.sort_values(by="primaryValue", ascending=False).head(3)
+    top_3 = df.nlargest(3, "primaryValue")
     if len(top_3) == 0:
         return "⚠️ 상위 국가 데이터가 없습니다."
     
     top_country = top_3.iloc[0]["countryName"]
     top_value = float(top_3.iloc[0]["primaryValue"])
-    total_value = float(df2["primaryValue"].sum())
+    total_value = float(df["primaryValue"].sum())
     market_share = (top_value / total_value * 100) if total_value > 0 else 0
     
     insight = f"""
 💡 **AI 인사이트**:
 - **{country_name}** 시장에서 HS Code **{hs_code}** 품목은 **{top_country}**산 제품 비중이 가장 큽니다 (점유율: **{market_share:.1f}%**)
 - 총 거래액: **${total_value:,.0f}**
-- Top 3 파트너: **{", ".join(top_3["countryName"].tolist())}**
+- Top 3 파트너: **{", ".join(top_3["countryName"].astype(str).tolist())}**
 """
     return insight.strip()
 
@@ -744,10 +824,15 @@ def render_comtrade_analysis(key_prefix: str = "comtrade") -> None:
         c1, c2, c3 = st.columns([2, 1, 1])
         with c1:
             st.checkbox("캐시 사용", key=k("use_cache"))
-            st.caption(f"폴더: `{cache_dir}` | 유효: {CACHE_EXPIRY_DAYS}일")
-        with c2:
             info = get_cache_info(cache_dir)
-            st.metric("캐시 파일", f"{info['count']}개")
+            st.caption(f"폴더: `{cache_dir}` | 유효: {CACHE_EXPIRY_DAYS}일 | 한도: {info['max_mb']} MB (오래 안 쓴 기간부터 자동 정리)")
+            st.caption(f"적중률 {info['hit_ratio']:.0%} · API 호출 없이 재사용 {info['saved_mb']} MB")
+            fig_stats = figure_cache_stats()
+            st.caption(
+                f"📈 차트 캐시: {fig_stats['entries']}/{FIGURE_CACHE_SIZE}개 · 적중 {fig_stats['hits']:,} / 미적중 {fig_stats['misses']:,}"
+            )
+        with c2:
+            st.metric("캐시된 기간", f"{info['count']}개")
         with c3:
             st.metric("용량", f"{info['size_mb']} MB")
         
@@ -799,17 +884,13 @@ def render_comtrade_analysis(key_prefix: str = "comtrade") -> None:
         st.text_input("HS Code (6자리)", key=k("selected_hs_code"), placeholder="예: 382499")
     
     with col2:
-        target_year = st.selectbox("기준 연도", ["2022", "2021", "2020"], key=k("target_year"))
+        target_year = st.selectbox("기준 연도", MACRO_ANNUAL_YEARS, key=k("target_year"))
     
     with col3:
-        reporter_options = {
-            "미국": "842", "중국": "156", "한국": "410", "독일": "276", "일본": "392",
-            "영국": "826", "프랑스": "250", "캐나다": "124",
-        }
-        rep_name = st.selectbox("분석 대상국", list(reporter_options.keys()), key=k("reporter_name"))
-        rep_code = reporter_options[rep_name]
+        rep_name = st.selectbox("분석 대상국", list(MACRO_REPORTERS.keys()), key=k("reporter_name"))
+        rep_code = MACRO_REPORTERS[rep_name]
     
-    year_options = [2020, 2021, 2022, 2023]
+    year_options = MACRO_MONTHLY_YEARS
     try:
         default_end = int(target_year)
     except Exception:
@@ -834,30 +915,45 @@ def render_comtrade_analysis(key_prefix: str = "comtrade") -> None:
     if start_year > end_year:
         end_year = start_year
     
-    # 데이터 수집
+    # 자주 찾는 HS 코드 기록 (scripts/warm_comtrade_cache.py --top N 이 미리 받아 둘 대상)
+    try:
+        _comtrade_store(cache_dir).log_usage(current_hs, rep_code)
+    except Exception:
+        pass
+    
+    # 데이터 수집 — 4개 데이터셋을 동시에 요청 (캐시 적중은 바로 끝나고, API 호출은 공용 호출 한도를 나눠 씀)
+    keys = (settings["PRIMARY_KEY"], settings["SECONDARY_KEY"])
+    jobs = {
+        "monthly_import": ("수입 월별", _load_monthly, (current_hs, rep_code, "M", start_year, end_year)),
+        "monthly_export": ("수출 월별", _load_monthly, (current_hs, rep_code, "X", start_year, end_year)),
+        "annual_import":  ("수입 연간", _load_annual,  (current_hs, target_year, rep_code, "M")),
+        "annual_export":  ("수출 연간", _load_annual,  (current_hs, target_year, rep_code, "X")),
+    }
+    results: Dict[str, Optional[pd.DataFrame]] = {}
+    notices: Dict[str, List[Notice]] = {}
     with st.spinner("🔄 데이터 수집 중..."):
         progress_bar = st.progress(0)
         status_text = st.empty()
         
-        status_text.text("수입 월별... (1/4)")
-        monthly_import = fetch_monthly_data_optimized(current_hs, rep_code, "M", start_year, end_year, use_cache=use_cache, cache_dir=cache_dir)
-        progress_bar.progress(25)
-        
-        status_text.text("수출 월별... (2/4)")
-        monthly_export = fetch_monthly_data_optimized(current_hs, rep_code, "X", start_year, end_year, use_cache=use_cache, cache_dir=cache_dir)
-        progress_bar.progress(50)
-        
-        status_text.text("수입 연간... (3/4)")
-        df_import = fetch_comtrade_data_module(current_hs, target_year, rep_code, flow_code="M", use_cache=use_cache, cache_dir=cache_dir)
-        progress_bar.progress(75)
-        
-        status_text.text("수출 연간... (4/4)")
-        df_export = fetch_comtrade_data_module(current_hs, target_year, rep_code, flow_code="X", use_cache=use_cache, cache_dir=cache_dir)
-        progress_bar.progress(100)
+        with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+            futures = {
+                pool.submit(fn, *args, keys, use_cache, cache_dir): name
+                for name, (_, fn, args) in jobs.items()
+            }
+            for done, fut in enumerate(as_completed(futures), start=1):
+                name = futures[fut]
+                results[name], notices[name] = fut.result()
+                status_text.text(f"{jobs[name][0]} 완료... ({done}/{len(jobs)})")
+                progress_bar.progress(int(100 * done / len(jobs)))
         
         status_text.empty()
         progress_bar.empty()
     
+    for name in jobs:
+        _emit_notices(notices[name])
+    monthly_import, monthly_export = results["monthly_import"], results["monthly_export"]
+    df_import, df_export = results["annual_import"], results["annual_export"]
+    
     if all(x is None or len(x) == 0 for x in [monthly_import, monthly_export, df_import, df_export]):
         st.error("❌ 데이터를 불러올 수 없습니다. API 키가 정확한지 확인해주세요.")
         return
@@ -871,7 +967,7 @@ def render_comtrade_analysis(key_prefix: str = "comtrade") -> None:
     with tab_import:
         st.markdown("### SY AI 마켓 브리핑")
         if df_import is not None and len(df_import) > 0:
-            df_import_filtered = df_import[df_import.get("countryName", "") != "전세계"].copy()
+            df_import_filtered = df_import[df_import["countryName"] != "전세계"]
             st.success(generate_market_insight(df_import_filtered, current_hs, rep_name))
         else:
             st.info("데이터 없음")
@@ -904,7 +1000,7 @@ def render_comtrade_analysis(key_prefix: str = "comtrade") -> None:
     with tab_export:
         st.markdown("### 🤖 AI 글로벌 시장 분석 요약")
         if df_export is not None and len(df_export) > 0:
-            df_export_filtered = df_export[df_export.get("countryName", "") != "전세계"].copy()
+            df_export_filtered = df_export[df_export["countryName"] != "전세계"]
             st.success(generate_market_insight(df_export_filtered, current_hs, rep_name))
         else:
             st.info("데이터 없음")
@@ -12,6 +12,10 @@ from dotenv import load_dotenv
 import PyPDF2
 import xml.etree.ElementTree as ET  # [추가] XML 파싱용 라이브러리
 
+from utils.hs_codes import hs_heading_plan
+from utils.comtrade_client import COUNTRY_TO_COMTRADE, MARKET_SHARE_PERIOD, get_comtrade_client
+from utils.comtrade_store import COMTRADE_CACHE_TTL_DAYS, get_comtrade_store
+
 # ==========================================
 # 0. 설정 및 API 키 로드
 # ==========================================
@@ -364,38 +368,77 @@ def fetch_kotra_certification_info(target_country, product_category=""):
 # [수정] 2-3. UN Comtrade API 연동 (시장규모/경쟁사 분석)
 # ==========================================
 
-# UN Comtrade용 국가 코드 (ISO 3166-1 numeric code)
-# 한국: 410, 세계: 0
-COUNTRY_TO_COMTRADE = {
-    "미국": "840", "중국": "156", "일본": "392", "베트남": "704",
-    "홍콩": "344", "대만": "490", "인도": "356", "싱가포르": "702",
-    "호주": "036", "멕시코": "484", "독일": "276", "프랑스": "250",
-    "영국": "826", "러시아": "643", "브라질": "076", "캐나다": "124",
-    "인도네시아": "360", "태국": "764", "필리핀": "608", "아랍에미리트": "784",
-    "이탈리아": "380", "스페인": "724", "네덜란드": "528", "한국": "410", "세계": "0"
-}
+# UN Comtrade용 국가 코드: utils.comtrade_client.COUNTRY_TO_COMTRADE (캐시 예열 스크립트와 공용)
+
+def _local_market_records(store, hs_code, reporter_code, period):
+    """
+    로컬 저장소에서 먼저 찾기: 6단위 원본 → 4단위 호 원본(Comtrade 호 합계) → 없으면 4단위 합계(rollup).
+    (레코드, 찾은 HS 자릿수) 또는 (None, 0)
+    """
+    if len(hs_code) > 4:
+        cached, missing, _ = store.lookup(hs_code, reporter_code, "M", "A", [period])
+        if not missing and cached:
+            return cached, len(hs_code)
+    cached, missing, _ = store.lookup(hs_code[:4], reporter_code, "M", "A", [period])
+    if not missing and cached:
+        return cached, 4
+    rolled = store.rollup(hs_code[:4], reporter_code, "M", "A", period)
+    if rolled:
+        return rolled, 4
+    return None, 0
+
 
 @st.cache_data(ttl=3600)
 def fetch_un_comtrade_data(hs_code, target_country):
     """
-    UN Comtrade API 호출 
-    1. Primary/Secondary 키 자동 전환
-    2. 타겟 국가가 파트너 목록에 있으면 제거 (Self-reference 방지)
-    3. 6단위 조회 실패 시 4단위로 자동 재시도 (Failover)
+    UN Comtrade 수입 시장 점유율 데이터
+    1. 로컬 Comtrade 저장소(comtrade_cache/)를 먼저 확인 (6단위 → 4단위 호 → 4단위 합계)
+    2. 없으면 4단위 호 자신과 그 아래 6단위 소호 전체를 한 번에 받아 저장 → 4·2단위 합계도 함께 생성
+       (6단위 데이터가 없을 때의 4단위 대체는 API 재호출 없이 저장된 호 단위 값으로)
+    3. 타겟 국가가 파트너 목록에 있으면 제거 (Self-reference 방지)
     """
-    keys_to_try = []
-    key1 = os.getenv("UN_COMTRADE_KEY")
-    key2 = os.getenv("UN_COMTRADE_SECONDARY_KEY")
-    if key1: keys_to_try.append(key1)
-    if key2: keys_to_try.append(key2)
-    
-    if not keys_to_try:
-        return None, "API_KEY_MISSING"
-
     target_code = COUNTRY_TO_COMTRADE.get(target_country)
     if not target_code:
         return None, f"'{target_country}'은(는) 지원되지 않는 국가 코드입니다."
 
+    hs_code = re.sub(r"\D", "", str(hs_code))
+    period = MARKET_SHARE_PERIOD
+    store = get_comtrade_store(os.getenv("CACHE_DIR") or "./comtrade_cache", COMTRADE_CACHE_TTL_DAYS * 86400)
+    try:
+        store.log_usage(hs_code, target_code)
+    except Exception:
+        pass
+
+    records, digits = _local_market_records(store, hs_code, target_code, period)
+    if records is None:
+        keys_to_try = [os.getenv("UN_COMTRADE_KEY"), os.getenv("UN_COMTRADE_SECONDARY_KEY")]
+        keys_to_try = [k for k in keys_to_try if k]
+        if not keys_to_try:
+            return None, "API_KEY_MISSING"
+        comtrade = get_comtrade_client(keys_to_try)
+
+        # 4단위 호 자신 + 아래 6단위 소호 목록 (관세청 HS 표 기준, 입력 코드는 항상 포함)
+        heading, subheadings, chapter_headings = hs_heading_plan(hs_code)
+        params = {
+            "reporterCode": target_code,
+            "period": period,
+            "cmdCode": ",".join([heading, *subheadings]) if len(hs_code) >= 4 else hs_code,
+            "flowCode": "M",
+            "typeCode": "C",
+        }
+        # 키 순환 / 429·5xx 재시도는 공용 클라이언트가 처리 (파트너는 전체로 받아 거시 분석 페이지와 저장소 공유)
+        data = comtrade.get("https://comtradeapi.un.org/data/v1/get/C/A/HS", params, timeout=30)
+        if not data or "data" not in data:
+            return None, "ALL_KEYS_FAILED"
+        if len(hs_code) >= 4:
+            store.put_heading(heading, subheadings, chapter_headings,
+                              target_code, "M", "A", [period], data["data"] or [])
+            records, digits = _local_market_records(store, hs_code, target_code, period)
+        else:
+            records, digits = data["data"] or None, len(hs_code)
+        if not records:
+            return None, "ALL_KEYS_FAILED"
+
     # [수정 1] 파트너 리스트 관리 (자기 자신 제외)
     # 기본 파트너: 세계(0), 한국(410), 중국(156), 미국(840), 독일(276), 일본(392)
     default_partners = ["0", "410", "156", "840", "276", "392"]
@@ -403,82 +446,41 @@ def fetch_un_comtrade_data(hs_code, target_country):
     # 만약 타겟 국가가 파트너 리스트에 있다면 제거 (예: 미국 조회 시 파트너에서 미국 제외)
     if target_code in default_partners:
         default_partners.remove(target_code)
-    
-    partner_str = ",".join(default_partners)
-
-    # [수정 2] 6단위 시도 후 실패하면 4단위 시도할 수 있도록 리스트 구성
-    # 예: [330499, 3304]
-    hs_codes_to_try = [hs_code]
-    if len(hs_code) > 4:
-        hs_codes_to_try.append(hs_code[:4]) # 4자리 코드 추가
-
-    url = "https://comtradeapi.un.org/data/v1/get/C/A/HS"
-    
-    # --- 이중 루프: HS코드(6->4) 반복 -> API키 반복 ---
-    for current_hs in hs_codes_to_try:
-        params = {
-            "reporterCode": target_code,     
-            "partnerCode": partner_str, 
-            "period": "2023",           # 2개년도 동시 요청
-            "cmdCode": current_hs,              
-            "flowCode": "M",                 
-            "motCode": "0",                  
-            "freqCode": "A",                 
-            "format": "json"
-        }
-
-        for i, api_key in enumerate(keys_to_try):
-            headers = {"Ocp-Apim-Subscription-Key": api_key}
-            
-            try:
-                response = requests.get(url, params=params, headers=headers, timeout=15)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if 'data' in data and len(data['data']) > 0:
-                        df = pd.DataFrame(data['data'])
-                        
-                        # [핵심 수정 2] 숫자 코드(partnerCode)와 연도(refYear) 컬럼 확보
-                        cols_to_keep = ['partnerCode', 'partnerDesc', 'primaryValue', 'refYear']
-                        if all(col in df.columns for col in cols_to_keep):
-                            df = df[cols_to_keep]
-                            df['primaryValue'] = pd.to_numeric(df['primaryValue'], errors='coerce').fillna(0)
-                            
-                            # [핵심 수정 3] 최신 연도 데이터만 필터링
-                            # 데이터에 있는 연도 중 가장 큰 값(최신)을 찾음
-                            latest_year = df['refYear'].max()
-                            df_latest = df[df['refYear'] == latest_year].copy()
-                            
-                            # 국가명 한글 매핑 (시각화용)
-                            # partnerCode: 0(세계), 410(한국), 156(중국), 840(미국), 276(독일), 392(일본)
-                            code_map = {0: '전세계(시장규모)', 410: '한국', 156: '중국', 
-                                        840: '미국', 276: '독일', 392: '일본'}
-                            
-                            # map 함수를 써서 안전하게 변환
-                            df_latest['partnerDesc'] = df_latest['partnerCode'].map(code_map).fillna(df_latest['partnerDesc'])
-                            
-                            # 4자리로 찾았을 경우 메시지에 표시
-                            success_msg = f"SUCCESS({latest_year})"
-                            if len(current_hs) == 4:
-                                success_msg += "_4DIGIT" # 4자리로 찾았음을 표시
-
-                            return df_latest, success_msg
-
-                    # 데이터가 없으면(NO_DATA) -> 다음 키 시도하지 말고, 다음 HS 코드로 넘어감(break)
-                    # 왜냐하면 키 문제가 아니라 데이터 문제니까.
-                    else:
-                        break
-
-                elif response.status_code in [401, 403, 429]:
-                    continue 
-                else:
-                    # 기타 서버 에러면 다음 키 시도
-                    continue
 
-            except Exception as e:
-                continue
-        # 내부 for문(키 순환)이 끝났는데도 리턴이 안 됐다면 -> 다음 HS 코드(current_hs)로 넘어감
-    return None, "ALL_KEYS_FAILED"
+    df = pd.DataFrame(records)
+    for col, default in (("motCode", 0), ("partner2Code", 0), ("customsCode", "C00")):
+        if col in df.columns:
+            # 운송수단/2차 파트너/세관 구분 행은 빼고 합계 행만 (예전 motCode=0 조회와 같은 범위)
+            df = df[df[col].astype(str).isin([str(default), "None", "nan"])]
+    df = df[df["partnerCode"].astype(str).isin(default_partners)].copy()
+    if df.empty:
+        return None, "ALL_KEYS_FAILED"
+
+    # [핵심 수정 2] 숫자 코드(partnerCode)와 연도(refYear) 컬럼 확보
+    df["partnerCode"] = pd.to_numeric(df["partnerCode"], errors="coerce")
+    if "partnerDesc" not in df.columns:
+        df["partnerDesc"] = df["partnerCode"].astype(str)
+    if "refYear" not in df.columns:
+        df["refYear"] = int(period)
+    df = df[['partnerCode', 'partnerDesc', 'primaryValue', 'refYear']]
+    df['primaryValue'] = pd.to_numeric(df['primaryValue'], errors='coerce').fillna(0)
+
+    # [핵심 수정 3] 최신 연도 데이터만 필터링
+    latest_year = df['refYear'].max()
+    df_latest = df[df['refYear'] == latest_year].copy()
+
+    # 국가명 한글 매핑 (시각화용)
+    # partnerCode: 0(세계), 410(한국), 156(중국), 840(미국), 276(독일), 392(일본)
+    code_map = {0: '전세계(시장규모)', 410: '한국', 156: '중국',
+                840: '미국', 276: '독일', 392: '일본'}
+    df_latest['partnerDesc'] = df_latest['partnerCode'].map(code_map).fillna(df_latest['partnerDesc'])
+
+    # 4자리로 찾았을 경우 메시지에 표시
+    success_msg = f"SUCCESS({latest_year})"
+    if digits == 4 and len(hs_code) > 4:
+        success_msg += "_4DIGIT" # 4자리로 찾았음을 표시
+
+    return df_latest, success_msg
 # ==========================================
 # 3. 로직: 권역 및 국가 정보 매핑
 # ==========================================
@@ -0,0 +1,119 @@
+"""
+바이어 매칭 파이프라인 벤치마크 (합성 풀)
+
+    python scripts/bench_buyer_pipeline.py                          # 10k / 100k / 1M 행
+    python scripts/bench_buyer_pipeline.py --sizes 10000,100000     # 크기 지정
+    python scripts/bench_buyer_pipeline.py --json bench.json        # 결과 저장 (회귀 추적용)
+    python scripts/bench_buyer_pipeline.py --mixed-delimiters       # 소스별 구분자 섞기
+
+크기마다 utils.buyer_synth 로 실제 소스 스키마/인코딩의 합성 CSV 를 만들고
+load/standardize → 스코어링 엔진 구축 → 점수 계산 → top-k → 전체 중복 묶기 시간을 잰다.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from utils.buyer_data import load_and_standardize_buyer_csv  # noqa: E402
+from utils.buyer_dedupe import cluster_buyer_frame  # noqa: E402
+from utils.buyer_scoring import BuyerScoringEngine, top_k_indices  # noqa: E402
+from utils.buyer_synth import generate_buyer_pool  # noqa: E402
+
+# 페이지 기본 검색과 같은 조건 + HS 코드 검색
+QUERIES = [
+    {"industry": "화장품/뷰티", "hs_code": "", "countries_selected": ["United States"], "require_email": False},
+    {"industry": "식품", "hs_code": "3304, 2106", "countries_selected": ["Vietnam", "Malaysia", "Singapore"], "require_email": False},
+    {"industry": "화장품/뷰티", "hs_code": "", "countries_selected": [], "require_email": False, "query_text": "vitamin c serum"},
+]
+TOP_K = 60
+
+
+def _timed(results: dict, stage: str, fn):
+    t0 = time.perf_counter()
+    out = fn()
+    results[stage] = round(time.perf_counter() - t0, 4)
+    return out
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parents[1]).stdout.strip()
+    except OSError:
+        return ""
+
+
+def bench_size(rows: int, seed: int, mixed_delimiters: bool) -> dict:
+    stages: dict = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _timed(stages, "generate", lambda: generate_buyer_pool(tmp, rows, seed, mixed_delimiters))
+        csv_bytes = sum(os.path.getsize(p) for p in paths.values())
+        df, meta = _timed(stages, "load_standardize", lambda: load_and_standardize_buyer_csv(paths))
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        engine = _timed(stages, "engine_build", lambda: BuyerScoringEngine(df, cache_dir=cache_dir))
+        _timed(stages, "engine_build_cached", lambda: BuyerScoringEngine(df, cache_dir=cache_dir))
+    for i, q in enumerate(QUERIES):
+        scores = _timed(stages, f"score_q{i}_cold", lambda: engine.score(**q))
+        _timed(stages, f"score_q{i}_warm", lambda: engine.score(**q))
+        threshold = 35 if q["hs_code"] else 20
+        top = _timed(stages, f"topk_q{i}", lambda: top_k_indices(scores, threshold, TOP_K))
+        stages[f"matches_q{i}"] = int((scores >= threshold).sum())
+        stages[f"topk_q{i}_rows"] = int(len(top))
+
+    labels = _timed(stages, "dedupe", lambda: cluster_buyer_frame(df))
+    result = {
+        "rows":      int(len(df)),
+        "csv_bytes": int(csv_bytes),
+        "sources":   {m["source"]: m.get("rows", 0) for m in meta.to_dict("records")},
+        "clusters":  int(len(np.unique(labels))),
+        "seconds":   stages,
+    }
+    timings = ", ".join(f"{k} {v:.2f}s" for k, v in stages.items() if isinstance(v, float))
+    print(f"  {rows:,}행 ({csv_bytes / 1e6:.1f}MB) → 업체 {result['clusters']:,}개 | {timings}")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="바이어 매칭 파이프라인 벤치마크 (합성 풀)")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="쉼표로 구분한 총 행 수 목록")
+    parser.add_argument("--seed", type=int, default=0, help="합성 데이터 seed")
+    parser.add_argument("--mixed-delimiters", action="store_true", help="소스별로 ; / 탭 / | 구분자 섞기")
+    parser.add_argument("--json", help="결과를 JSON 으로 저장할 경로")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = {
+        "created_at":       datetime.now().isoformat(timespec="seconds"),
+        "commit":           _git_commit(),
+        "python":           platform.python_version(),
+        "pandas":           pd.__version__,
+        "numpy":            np.__version__,
+        "cpu_count":        os.cpu_count(),
+        "seed":             args.seed,
+        "mixed_delimiters": args.mixed_delimiters,
+        "results":          [],
+    }
+    for rows in sizes:
+        report["results"].append(bench_size(rows, args.seed, args.mixed_delimiters))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"  저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
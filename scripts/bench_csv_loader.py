@@ -0,0 +1,104 @@
+"""
+바이어 CSV 로더 벤치마크 (기존 python 엔진 로더 vs 빠른 C 엔진 로더)
+
+    python scripts/bench_csv_loader.py                      # 인콰이어리 파일 + 합성 500MB
+    python scripts/bench_csv_loader.py --synthetic-mb 50    # 합성 파일 크기 조절
+    python scripts/bench_csv_loader.py --synthetic-mb 0     # 합성 파일 생략
+
+두 로더의 결과(DataFrame, 인코딩, 구분자)가 같은지도 함께 확인한다.
+합성 파일은 인콰이어리 CSV 를 반복해 같은 인코딩(cp949)으로 임시 폴더에 만든다.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd  # noqa: E402
+
+from utils.buyer_data import (  # noqa: E402
+    CSV_BUYER_FILES,
+    _read_csv_bytes_flexible,
+    _read_csv_fast,
+    find_local_csv_by_name,
+)
+
+INQUIRY_SOURCE = "중진공_해외바이어인콰이어리_20241230"
+
+
+def _time(fn, repeat: int) -> tuple[float, tuple]:
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def _bench_file(label: str, path: str, repeat: int) -> dict:
+    t_old, old = _time(lambda: _read_csv_bytes_flexible(Path(path).read_bytes()), repeat)
+    t_new, new = _time(lambda: _read_csv_fast(path), repeat)
+    same = old[1:] == new[1:]
+    if same:
+        try:
+            pd.testing.assert_frame_equal(old[0], new[0])
+        except AssertionError:
+            same = False
+    result = {
+        "file":      label,
+        "bytes":     os.path.getsize(path),
+        "rows":      len(new[0]),
+        "old_sec":   round(t_old, 4),
+        "new_sec":   round(t_new, 4),
+        "speedup":   round(t_old / t_new, 2) if t_new else None,
+        "identical": same,
+    }
+    print(f"  {label}: {result['bytes'] / 1e6:.1f}MB, {result['rows']:,}행 | "
+          f"기존 {t_old:.3f}s → 신규 {t_new:.3f}s (x{result['speedup']}) | 동일: {same}")
+    return result
+
+
+def _make_synthetic(src: str, target_mb: int, out_dir: str) -> str:
+    raw = Path(src).read_bytes()
+    header, _, body = raw.partition(b"\n")
+    if not body.endswith(b"\n"):
+        body += b"\n"
+    path = os.path.join(out_dir, f"synthetic_{target_mb}mb.csv")
+    with open(path, "wb") as f:
+        f.write(header + b"\n")
+        written = len(header) + 1
+        while written < target_mb * 1024 * 1024:
+            f.write(body)
+            written += len(body)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="바이어 CSV 로더 벤치마크")
+    parser.add_argument("--synthetic-mb", type=int, default=500, help="합성 파일 크기(MB), 0 이면 생략")
+    parser.add_argument("--repeat", type=int, default=5, help="실제 파일 반복 측정 횟수 (최솟값 사용)")
+    parser.add_argument("--json", help="결과를 JSON 으로 저장할 경로")
+    args = parser.parse_args()
+
+    inquiry = find_local_csv_by_name(CSV_BUYER_FILES[INQUIRY_SOURCE])
+    if not inquiry:
+        sys.exit(f"{CSV_BUYER_FILES[INQUIRY_SOURCE]} 파일을 찾을 수 없습니다.")
+
+    results = [_bench_file("inquiry", inquiry, args.repeat)]
+    if args.synthetic_mb > 0:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _make_synthetic(inquiry, args.synthetic_mb, tmp)
+            results.append(_bench_file(f"synthetic_{args.synthetic_mb}mb", path, 1))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+바이어 CSV 표준화 스냅샷 빌드 스크립트
+
+    python scripts/build_buyer_snapshot.py          # 원본이 바뀐 소스만 재생성
+    python scripts/build_buyer_snapshot.py --force  # 전체 소스 재생성
+
+배포 직후 / 원본 CSV 교체 후 한 번 실행해 두면
+바이어 페이지 첫 로딩 시 CSV 파싱 없이 스냅샷을 바로 읽는다.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.buyer_data import (  # noqa: E402
+    BUYER_CACHE_DIR,
+    CSV_BUYER_FILES,
+    build_buyer_snapshot,
+    find_local_csv_by_name,
+    load_buyer_snapshot,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="바이어 CSV 표준화 스냅샷 빌드")
+    parser.add_argument("--force", action="store_true", help="원본 변경 여부와 관계없이 재생성")
+    parser.add_argument("--cache-dir", default=BUYER_CACHE_DIR, help=f"스냅샷 폴더 (기본: {BUYER_CACHE_DIR})")
+    args = parser.parse_args()
+
+    resolved_paths = {k: find_local_csv_by_name(v) for k, v in CSV_BUYER_FILES.items()}
+    for source_name, path in resolved_paths.items():
+        print(f"  {source_name}: {path or '(없음)'}")
+
+    t0 = time.perf_counter()
+    if args.force:
+        df_all, df_meta = build_buyer_snapshot(resolved_paths, args.cache_dir)
+    else:
+        df_all, df_meta = load_buyer_snapshot(resolved_paths, args.cache_dir)
+    print(f"✅ {len(df_all):,}건 ({time.perf_counter() - t0:.2f}s) → {args.cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
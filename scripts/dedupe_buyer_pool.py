@@ -0,0 +1,56 @@
+"""
+바이어 전체 풀 중복 묶기 (오프라인)
+
+    python scripts/dedupe_buyer_pool.py                     # 요약만 출력
+    python scripts/dedupe_buyer_pool.py --out buyers_dedup.csv
+    python scripts/dedupe_buyer_pool.py --out buyers_all.csv --keep-all   # buyer_id 만 붙여 전체 저장
+
+이메일 / 도메인 / 전화번호 정확 일치 + 회사명 MinHash 유사도로 같은 업체를 묶어
+buyer_id 를 부여한다. --keep-all 이 없으면 업체별 첫 행만 남긴다.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.buyer_data import BUYER_CACHE_DIR, CSV_BUYER_FILES, find_local_csv_by_name, load_buyer_snapshot  # noqa: E402
+from utils.buyer_dedupe import cluster_buyer_frame  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="바이어 전체 풀 중복 묶기")
+    parser.add_argument("--cache-dir", default=BUYER_CACHE_DIR, help=f"스냅샷 폴더 (기본: {BUYER_CACHE_DIR})")
+    parser.add_argument("--out", help="결과 CSV 경로 (utf-8-sig)")
+    parser.add_argument("--keep-all", action="store_true", help="중복 행도 buyer_id 와 함께 모두 저장")
+    parser.add_argument("--show", type=int, default=10, help="출력할 소스 간 중복 예시 수")
+    args = parser.parse_args()
+
+    resolved_paths = {k: find_local_csv_by_name(v) for k, v in CSV_BUYER_FILES.items()}
+    df_all, _ = load_buyer_snapshot(resolved_paths, args.cache_dir)
+
+    t0 = time.perf_counter()
+    df = df_all.copy()
+    df["buyer_id"] = cluster_buyer_frame(df)
+    elapsed = time.perf_counter() - t0
+
+    sizes = df.groupby("buyer_id")["source"].agg(["size", "nunique"])
+    print(f"✅ {len(df):,}행 → {len(sizes):,}개 업체 ({elapsed:.2f}s)")
+    print(f"  중복 묶음: {(sizes['size'] > 1).sum():,}개 / 소스 간 중복: {(sizes['nunique'] > 1).sum():,}개")
+
+    cross = sizes[sizes["nunique"] > 1].sort_values("size", ascending=False).head(args.show).index
+    for bid in cross:
+        print("  ---")
+        for _, r in df[df["buyer_id"] == bid].head(5).iterrows():
+            print(f"  {r['source']}: {r['company_name']} ({r['country']})")
+
+    if args.out:
+        out = df if args.keep_all else df.drop_duplicates("buyer_id")
+        out.to_csv(args.out, index=False, encoding="utf-8-sig")
+        print(f"  저장: {args.out} ({len(out):,}행)")
+
+
+if __name__ == "__main__":
+    main()
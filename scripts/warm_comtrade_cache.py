@@ -0,0 +1,176 @@
+"""
+UN Comtrade 캐시 예열 스크립트 (사용자가 찾기 전에 저장소를 미리 채워 둠)
+
+    python scripts/warm_comtrade_cache.py --hs 3304,382499          # 지정한 HS 코드
+    python scripts/warm_comtrade_cache.py --top 20                  # 최근 30일 가장 많이 분석한 HS 코드 20개
+    python scripts/warm_comtrade_cache.py --top 20 --max-calls 400  # 이번 실행의 API 호출 한도
+    python scripts/warm_comtrade_cache.py --top 20 --dry-run        # 받을 목록만 출력
+
+두 페이지가 실제로 조회하는 것과 같은 형태로 받는다 (기간은 utils.comtrade_client 의 페이지 공용 상수).
+- 거시 분석(MACRO_REPORTERS): HS × 대상국 × 수입/수출마다 연간(MACRO_ANNUAL_YEARS, 한 번에) 1회 + 월별 연도당 1회
+- 수출 솔루션 시장 점유율(COUNTRY_TO_COMTRADE, 세계 제외): HS × 대상국마다 MARKET_SHARE_PERIOD 수입을
+  4단위 호 자신과 그 아래 6단위 소호 전체로 1회 받아 4·2단위 합계까지 저장 (페이지와 같은 put_heading)
+이미 받아 둔(TTL 이내) 기간은 건너뛰므로 중간에 멈추거나 호출 한도에 걸려도 다시 실행하면 이어서 받는다.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dotenv import load_dotenv  # noqa: E402
+
+from utils.comtrade_client import (  # noqa: E402
+    COUNTRY_TO_COMTRADE,
+    MACRO_ANNUAL_YEARS,
+    MACRO_MONTHLY_YEARS,
+    MACRO_REPORTERS,
+    MARKET_SHARE_PERIOD,
+    comtrade_keys_from_env,
+    get_comtrade_client,
+)
+from utils.comtrade_store import COMTRADE_CACHE_TTL_DAYS, get_comtrade_store, monthly_periods  # noqa: E402
+from utils.hs_codes import hs_heading_plan  # noqa: E402
+
+ANNUAL_YEARS = ",".join(sorted(MACRO_ANNUAL_YEARS))
+MONTHLY_YEARS = (min(MACRO_MONTHLY_YEARS), max(MACRO_MONTHLY_YEARS))
+FLOWS = ("M", "X")
+MAX_CONSECUTIVE_FAILURES = 5   # 연속 실패면 한도 소진/키 문제로 보고 중단
+
+
+def market_reporters() -> list[str]:
+    return [c for c in COUNTRY_TO_COMTRADE.values() if c != "0"]
+
+
+def _heading_fresh(store, heading, subheadings, reporter) -> bool:
+    """수출 솔루션 페이지가 API 없이 답할 수 있는지: 호 합계가 있고 호·소호 원본이 모두 TTL 이내"""
+    if store.rollup(heading, reporter, "M", "A", MARKET_SHARE_PERIOD) is None:
+        return False
+    for sub in [heading, *subheadings]:
+        _, missing, stale = store.lookup(sub, reporter, "M", "A", [MARKET_SHARE_PERIOD], track=False)
+        if missing or stale:
+            return False
+    return True
+
+
+def plan_jobs(store, hs_codes, macro_reporters, share_reporters, annual_years, monthly_range) -> list[tuple]:
+    """
+    (hs, reporter, flow, freq, 받을 기간 목록, 호 묶음) 작업 목록. 작업 1개 = API 호출 1회.
+    호 묶음은 시장 점유율 작업의 (heading, 소호 목록, 같은 류의 호 개수), 거시 분석 작업은 None.
+    TTL 이 지난 기간도 다시 받는다 (예열 후에는 사용자가 '갱신 중' 화면을 보지 않도록).
+    """
+    jobs = []
+    for hs in hs_codes:
+        for reporter in macro_reporters:
+            for flow in FLOWS:
+                _, missing, stale = store.lookup(hs, reporter, flow, "A", annual_years, track=False)
+                if missing or stale:
+                    jobs.append((hs, reporter, flow, "A", sorted(set(missing) | set(stale)), None))
+                for year in range(monthly_range[0], monthly_range[1] + 1):
+                    _, missing, stale = store.lookup(hs, reporter, flow, "M", monthly_periods(year, year), track=False)
+                    if missing or stale:
+                        jobs.append((hs, reporter, flow, "M", sorted(set(missing) | set(stale)), None))
+
+        plan = hs_heading_plan(hs)
+        heading, subheadings, _ = plan
+        if len(hs) < 4:
+            continue   # 4자리 미만은 페이지도 합계를 만들지 않음
+        for reporter in share_reporters:
+            if not _heading_fresh(store, heading, subheadings, reporter):
+                jobs.append((heading, reporter, "M", "A", [MARKET_SHARE_PERIOD], plan))
+    return jobs
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="UN Comtrade 캐시 예열")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--hs", help="쉼표로 구분한 HS 코드 목록")
+    src.add_argument("--top", type=int, help="사용 기록에서 가장 많이 분석한 HS 코드 N 개")
+    parser.add_argument("--days", type=float, default=30, help="--top 집계 기간(일, 기본 30)")
+    parser.add_argument("--reporters", help="쉼표로 구분한 대상국 코드 (기본: 각 페이지의 국가 목록)")
+    parser.add_argument("--years", default=ANNUAL_YEARS, help=f"연간 데이터 연도 (기본 {ANNUAL_YEARS})")
+    parser.add_argument("--monthly", default=f"{MONTHLY_YEARS[0]}-{MONTHLY_YEARS[1]}", help="월별 데이터 연도 범위 (예: 2020-2023)")
+    parser.add_argument("--max-calls", type=int, default=250, help="이번 실행의 API 호출 한도 (재시도 포함, 기본 250)")
+    parser.add_argument("--cache-dir", default=os.getenv("CACHE_DIR") or "./comtrade_cache", help="캐시 폴더")
+    parser.add_argument("--dry-run", action="store_true", help="호출하지 않고 받을 목록만 출력")
+    args = parser.parse_args()
+
+    store = get_comtrade_store(args.cache_dir, COMTRADE_CACHE_TTL_DAYS * 86400)
+    if args.hs:
+        hs_codes = [h.strip() for h in args.hs.split(",") if h.strip()]
+    else:
+        top = store.top_hs(args.top, args.days)
+        hs_codes = [hs for hs, _ in top]
+        print("  사용 기록 상위 HS: " + (", ".join(f"{hs}({cnt}회)" for hs, cnt in top) or "(없음)"))
+    if args.reporters:
+        chosen = [r.strip() for r in args.reporters.split(",") if r.strip()]
+        macro_reporters = [r for r in chosen if r in MACRO_REPORTERS.values()]
+        share_reporters = [r for r in chosen if r in market_reporters()]
+    else:
+        macro_reporters, share_reporters = list(MACRO_REPORTERS.values()), market_reporters()
+    annual_years = [y.strip() for y in args.years.split(",") if y.strip()]
+    start, _, end = args.monthly.partition("-")
+    monthly_range = (int(start), int(end or start))
+
+    jobs = plan_jobs(store, hs_codes, macro_reporters, share_reporters, annual_years, monthly_range)
+    print(f"  HS {len(hs_codes)}개 × (거시 분석 대상국 {len(macro_reporters)}개 × {'/'.join(FLOWS)} "
+          f"+ 시장 점유율 대상국 {len(share_reporters)}개) → 받을 작업 {len(jobs)}건 (API 호출 한도 {args.max_calls}회)")
+    if args.dry_run or not jobs:
+        for hs, reporter, flow, freq, periods, plan in jobs:
+            what = f"호 + 소호 {len(plan[1])}개" if plan else f"{len(periods)}개 기간"
+            print(f"    {hs} {reporter} {flow} {freq} {periods[0]}~{periods[-1]} ({what})")
+        return
+
+    keys = comtrade_keys_from_env()
+    if not keys:
+        sys.exit("❌ UN Comtrade API 키가 없습니다. (UN_COMTRADE_KEY 등 환경변수 확인)")
+    client = get_comtrade_client(keys)
+    calls_before = client.stats()["calls"]
+    done = stored_rows = failures = 0
+    t0 = time.perf_counter()
+
+    for i, (hs, reporter, flow, freq, periods, plan) in enumerate(jobs, start=1):
+        used = client.stats()["calls"] - calls_before
+        if used >= args.max_calls:
+            print(f"⏸️ API 호출 한도({args.max_calls}회) 도달 — 남은 {len(jobs) - i + 1}건은 다시 실행하면 이어서 받습니다.")
+            break
+        params = {
+            "reporterCode": reporter,
+            "period": ",".join(periods),
+            "cmdCode": ",".join([plan[0], *plan[1]]) if plan else hs,
+            "flowCode": flow,
+            "typeCode": "C",
+        }
+        res = client.get(f"C/{freq}/HS", params, timeout=60)
+        kind = "시장 점유율" if plan else ("연간" if freq == "A" else "월별")
+        label = f"[{i}/{len(jobs)}] {hs} {reporter} {flow} {kind} {periods[0]}~{periods[-1]}"
+        if not res or "data" not in res:
+            failures += 1
+            print(f"  {label} ⚠️ 호출 실패 | API 호출 {used + 1}/{args.max_calls}")
+            if failures >= MAX_CONSECUTIVE_FAILURES:
+                print(f"⏹️ {failures}회 연속 실패 — 호출 한도 소진 또는 키 문제로 보고 중단합니다. 나중에 다시 실행하면 이어서 받습니다.")
+                break
+            continue
+        failures = 0
+        records = res["data"] or []
+        if plan:
+            store.put_heading(*plan, reporter, flow, freq, periods, records)
+        else:
+            store.put(hs, reporter, flow, freq, periods, records)
+        done += 1
+        stored_rows += len(records)
+        elapsed = time.perf_counter() - t0
+        eta = elapsed / i * (len(jobs) - i)
+        print(f"  {label} ✅ {len(records)}행 | API 호출 {client.stats()['calls'] - calls_before}/{args.max_calls} | 남은 시간 약 {eta:.0f}s")
+
+    stats = store.stats()
+    print(f"✅ 완료 {done}/{len(jobs)}건, {stored_rows:,}행 저장 ({time.perf_counter() - t0:.1f}s) "
+          f"→ {args.cache_dir} (기간 {stats['periods']:,}개, {stats['bytes'] / 1e6:.1f}MB)")
+
+
+if __name__ == "__main__":
+    main()
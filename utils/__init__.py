@@ -0,0 +1,3 @@
+"""
+SY Global Connect 공용 모듈 (pages/ 에서 import 해서 사용)
+"""
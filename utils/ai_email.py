@@ -0,0 +1,152 @@
+"""
+AI 바이어 이메일 생성 모듈
+- buyer_email_prompt      : 바이어 정보 → 이메일 작성 프롬프트 (단건 / 일괄 공용)
+- chat_with_backoff       : 429 / 5xx / 연결 오류 시 지수 백오프(+지터)로 재시도,
+                            응답은 utils.llm_cache 디스크 캐시에 저장 (호출별 use_cache=False 로 제외)
+- generate_emails_bulk    : 제한된 워커 풀로 여러 바이어 이메일을 동시에 생성,
+                            완료되는 순서대로 콜백으로 넘겨 진행 상황을 바로 표시
+"""
+
+from __future__ import annotations
+
+import random
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable
+
+import openai
+
+from utils.llm_cache import get_llm_cache, llm_cache_key
+
+EMAIL_MODEL       = "gpt-4o-mini"
+EMAIL_TEMPERATURE = 0.7
+EMAIL_MAX_TOKENS  = 900
+EMAIL_SYSTEM      = "당신은 국제 비즈니스 커뮤니케이션 전문가입니다."
+
+# 재시도 대상: 속도 제한 / 서버 오류 / 일시적 네트워크 오류
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.InternalServerError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+)
+
+BULK_MAX_WORKERS = 4
+MAX_RETRIES      = 5
+BASE_DELAY       = 1.0
+MAX_DELAY        = 30.0
+
+
+def buyer_email_prompt(
+    buyer_name: str,
+    country: str,
+    industry: str,
+    purchase_history: list[str],
+    contact_person: str | None = None,
+    email: str | None = None,
+) -> str:
+    return f"""
+다음 바이어에게 보낼 비즈니스 이메일을 한국어로 작성해주세요.
+
+- 회사명: {buyer_name}
+- 국가: {country}
+- 산업: {industry}
+- 관심 제품/범주: {', '.join(purchase_history)}
+- 담당자(알려진 경우): {contact_person or '미확인'}
+- 이메일(알려진 경우): {email or '미확인'}
+
+**중요**: 이메일 본문에서 반드시 "{buyer_name}" 회사명을 명시적으로 언급해주세요.
+한국 제품 수출 업체로서 파트너십을 제안하는 전문적이고 간결한 이메일을 작성해주세요.
+제목과 본문을 포함해주세요.
+"""
+
+
+def _retry_after(err: Exception) -> float | None:
+    # 서버가 알려준 대기 시간(Retry-After 헤더)이 있으면 우선 사용
+    response = getattr(err, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def chat_with_backoff(
+    client,
+    prompt: str,
+    system_message: str,
+    model: str = EMAIL_MODEL,
+    temperature: float = EMAIL_TEMPERATURE,
+    max_tokens: int = EMAIL_MAX_TOKENS,
+    max_retries: int = MAX_RETRIES,
+    use_cache: bool = True,
+) -> str:
+    """
+    chat.completions 호출. 재시도 가능한 오류는 백오프 후 다시 시도하고, 그 외 오류는 그대로 올린다.
+    use_cache=True 면 같은 (model, system, prompt, temperature, max_tokens) 의 저장된 응답을 먼저 쓴다.
+    """
+    key = llm_cache_key(model, system_message, prompt, temperature, max_tokens) if use_cache else None
+    if key:
+        try:
+            hit = get_llm_cache().get(key)
+        except (sqlite3.Error, OSError):   # 캐시 폴더 권한/디스크 문제면 캐시 없이 진행
+            hit = None
+        if hit is not None:
+            return hit
+
+    for attempt in range(max_retries + 1):
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_message},
+                    {"role": "user",   "content": prompt},
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            content = response.choices[0].message.content
+            if key and content:
+                try:
+                    get_llm_cache().put(key, model, content)
+                except (sqlite3.Error, OSError):
+                    pass
+            return content
+        except RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                raise
+            delay = _retry_after(e) or min(MAX_DELAY, BASE_DELAY * (2 ** attempt))
+            time.sleep(delay * random.uniform(0.8, 1.2))
+    raise RuntimeError("unreachable")
+
+
+def generate_emails_bulk(
+    client,
+    jobs: list[dict],
+    max_workers: int = BULK_MAX_WORKERS,
+    on_result: Callable[[dict], None] | None = None,
+    use_cache: bool = True,
+) -> list[dict]:
+    """
+    jobs: buyer_email_prompt 인자 dict 목록 (+ 결과에 그대로 실어 보낼 "id").
+    결과 dict: {"id", "company_name", "status": "ok"|"error", "content", "error"}
+    on_result 는 메인 스레드에서 완료 순서대로 호출된다 (Streamlit 진행 표시용).
+    """
+    def _run(job: dict) -> dict:
+        args = {k: v for k, v in job.items() if k != "id"}
+        try:
+            content = chat_with_backoff(client, buyer_email_prompt(**args), EMAIL_SYSTEM, use_cache=use_cache)
+            return {"id": job.get("id"), "company_name": job["buyer_name"], "status": "ok", "content": content, "error": ""}
+        except Exception as e:
+            return {"id": job.get("id"), "company_name": job["buyer_name"], "status": "error", "content": "", "error": str(e)}
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = [pool.submit(_run, job) for job in jobs]
+        for fut in as_completed(futures):
+            res = fut.result()
+            results.append(res)
+            if on_result:
+                on_result(res)
+    return results
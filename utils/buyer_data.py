@@ -0,0 +1,456 @@
+"""
+바이어 CSV 로딩 & 표준화 모듈
+- 5개 공공기관 바이어 CSV 를 공통 스키마(company_name, country, ...)로 표준화
+- 표준화 결과를 소스별 Arrow(Feather) 파티션으로 저장하고, 원본 파일이 바뀐
+  소스만 다시 파싱한다 (나머지는 memory-map 으로 바로 읽어 concat)
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from utils.countries import guess_country_column, normalize_country_column
+from utils.data_files import find_data_file
+
+# ==================== 상수: CSV 파일명 매핑 ====================
+CSV_BUYER_FILES = {
+    "KOTRA_해외바이어현황_20240829":           "대한무역투자진흥공사_해외바이어 현황_20240829.csv",
+    "중진공_해외바이어구매오퍼_20241231":       "중소벤처기업진흥공단_해외바이어 구매오퍼 정보_20241231.csv",
+    "중진공_해외바이어인콰이어리_20241230":     "중소벤처기업진흥공단_해외바이어 인콰이어리 신청_20241230.csv",
+    "무보_화장품바이어_20200812":              "한국무역보험공사_화장품 바이어 정보_20200812.csv",
+    "중진공_고비즈코리아거래처_20250523":       "중소벤처기업진흥공단_고비즈코리아 거래처정보_20250523.csv",
+}
+
+
+# ============================================================
+# CSV 로딩 & 정규화 유틸리티
+# ============================================================
+# 작업 폴더 → data/ → datasets/ 순 (없으면 작업 폴더 전체 탐색)
+LOCAL_CSV_SUBDIRS = ["", "data", "datasets"]
+
+
+def find_local_csv_by_name(filename: str) -> str | None:
+    # 프로세스 공용 매니페스트 조회 (폴더가 바뀌지 않았으면 파일시스템 탐색 없음)
+    p = find_data_file(filename, subdirs=LOCAL_CSV_SUBDIRS)
+    return str(p) if p else None
+
+
+def _read_csv_bytes_flexible(raw: bytes) -> tuple[pd.DataFrame, str, str]:
+    encodings = ["utf-8-sig", "utf-8", "cp949", "euc-kr"]
+    text, used_enc = None, None
+    for enc in encodings:
+        try:
+            text     = raw.decode(enc)
+            used_enc = enc
+            break
+        except Exception:
+            continue
+    if text is None:
+        text     = raw.decode("cp949", errors="replace")
+        used_enc = "cp949(errors=replace)"
+
+    sample = text[:5000]
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
+        sep = dialect.delimiter
+    except Exception:
+        sep = ","
+
+    df = pd.read_csv(StringIO(text), sep=sep, engine="python", on_bad_lines="skip")
+    if df.shape[1] == 1:
+        for alt in [",", ";", "\t", "|"]:
+            if alt == sep:
+                continue
+            df2 = pd.read_csv(StringIO(text), sep=alt, engine="python", on_bad_lines="skip")
+            if df2.shape[1] > 1:
+                df, sep = df2, alt
+                break
+    return df, used_enc, sep
+
+
+# ------------------------------------------------------------
+# 빠른 로더: 앞부분 바이트 샘플로 인코딩/구분자를 정하고
+# C 엔진이 파일을 CSV_CHUNK_ROWS 행씩 직접 읽어 파싱 (전체 문자열 디코딩·전체 토큰화 없음)
+# 판단이 어긋나면(샘플 이후 디코딩 실패 등) _read_csv_bytes_flexible 로 폴백
+# ------------------------------------------------------------
+CSV_SAMPLE_BYTES = 64 * 1024
+CSV_CHUNK_ROWS = 100_000
+_CSV_DELIMITERS = [",", ";", "\t", "|"]
+
+
+def _detect_encoding(sample: bytes) -> str | None:
+    # _read_csv_bytes_flexible 의 시도 순서와 같은 결과 (utf-8-sig 는 BOM 없는 utf-8 도 허용)
+    for enc in ["utf-8-sig", "utf-8", "cp949", "euc-kr"]:
+        try:
+            sample.decode(enc)
+            return enc
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+def _sniff_delimiter(text: str) -> str:
+    try:
+        return csv.Sniffer().sniff(text[:5000], delimiters=_CSV_DELIMITERS).delimiter
+    except Exception:
+        return ","
+
+
+def _header_width(text: str, sep: str) -> int:
+    try:
+        return pd.read_csv(StringIO(text), sep=sep, engine="python", on_bad_lines="skip", nrows=50).shape[1]
+    except Exception:
+        return 0
+
+
+def _read_csv_fast(path: str) -> tuple[pd.DataFrame, str, str]:
+    with open(path, "rb") as f:
+        sample = f.read(CSV_SAMPLE_BYTES)
+        at_eof = not f.read(1)
+    if not at_eof:
+        # 마지막 줄은 멀티바이트 문자 중간에서 잘렸을 수 있으므로 버림
+        cut = sample.rfind(b"\n")
+        if cut <= 0:
+            raise ValueError("sample has no complete line")
+        sample = sample[:cut + 1]
+
+    enc = _detect_encoding(sample)
+    if enc is None:
+        raise ValueError("unknown encoding")
+    text = sample.decode(enc)
+
+    # 구분자로 1열만 나오면 나머지 후보를 샘플에서만 확인
+    sep = _sniff_delimiter(text)
+    if _header_width(text, sep) == 1:
+        for alt in _CSV_DELIMITERS:
+            if alt != sep and _header_width(text, alt) > 1:
+                sep = alt
+                break
+
+    # low_memory=False: 청크 안에서는 열 dtype 을 한 번에 추론 (청크 안쪽이 다시 쪼개져 타입이 섞이지 않도록)
+    opts = dict(sep=sep, encoding=enc, engine="c", on_bad_lines="skip", low_memory=False)
+    with pd.read_csv(path, chunksize=CSV_CHUNK_ROWS, **opts) as reader:
+        chunks = list(reader)
+    if not chunks:
+        return pd.read_csv(path, **opts), enc, sep
+    df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+    # dtype 은 청크마다 추론되므로, 값이 있는 청크끼리 dtype 이 갈린 열만 파일 전체 기준으로 다시 읽는다
+    # (전부 비어 있는 청크의 float64 는 concat 결과가 전체 읽기와 같아 무시)
+    mixed = [
+        i for i, col in enumerate(df.columns)
+        if len({str(ch.iloc[:, i].dtype) for ch in chunks if ch.iloc[:, i].notna().any()}) > 1
+    ]
+    if mixed:
+        whole = pd.read_csv(path, usecols=mixed, **opts)
+        for i, col in zip(mixed, whole.columns):
+            df[df.columns[i]] = whole[col].to_numpy()
+    return df, enc, sep
+
+
+def _read_csv_flexible_from_path(path: str) -> tuple[pd.DataFrame, str, str]:
+    try:
+        return _read_csv_fast(path)
+    except Exception:
+        return _read_csv_bytes_flexible(Path(path).read_bytes())
+
+
+def _norm_col(s: str) -> str:
+    s = re.sub(r"\s+", "", str(s).strip().lower())
+    return s.replace("-", "").replace("_", "")
+
+
+def _infer_col(cols: list[str], keywords: list[str]) -> str | None:
+    normed = {c: _norm_col(c) for c in cols}
+    for c, nc in normed.items():
+        for kw in keywords:
+            if kw in nc:
+                return c
+    return None
+
+
+def _safe_get(row, col) -> str:
+    if not col:
+        return ""
+    v = row.get(col)
+    return "" if pd.isna(v) else str(v).strip()
+
+
+_DATE_FORMATS = ["%Y-%m-%d", "%Y.%m.%d", "%Y/%m/%d", "%Y%m%d", "%Y-%m", "%Y.%m", "%Y/%m"]
+DATE_SAMPLE_SIZE = 500
+
+
+def _parse_date_column(values: pd.Series) -> pd.Series:
+    """
+    날짜 문자열 컬럼 → datetime64. 앞쪽 표본으로 가장 많이 맞는 형식을 고르고 컬럼 전체를
+    한 번에 파싱한 뒤, 실패한 행만 나머지 형식으로 다시 시도한다 (모두 실패하면 NaT).
+    """
+    text = values.fillna("").astype(str).str.strip()
+    out = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    todo = text != ""
+    if not todo.any():
+        return out
+
+    sample = text[todo].head(DATE_SAMPLE_SIZE)
+    hits = {fmt: pd.to_datetime(sample, format=fmt, errors="coerce").notna().sum() for fmt in _DATE_FORMATS}
+    for fmt in sorted(_DATE_FORMATS, key=lambda f: -hits[f]):
+        parsed = pd.to_datetime(text[todo], format=fmt, errors="coerce")
+        ok = parsed.notna()
+        out[ok[ok].index] = parsed[ok]
+        todo[ok[ok].index] = False
+        if not todo.any():
+            break
+    return out
+
+
+BUYER_COLUMNS = [
+    "company_name", "country", "city", "product_text", "hs_code",
+    "contact_person", "email", "phone", "website", "address", "date", "date_raw", "source",
+]
+_TEXT_COLUMNS = [c for c in BUYER_COLUMNS if c != "date"]
+
+
+def _empty_buyer_frame() -> pd.DataFrame:
+    df = pd.DataFrame({c: pd.Series(dtype=object) for c in BUYER_COLUMNS})
+    df["date"] = pd.Series(dtype="datetime64[ns]")
+    return df
+
+
+def standardize_buyer_source(source_name: str, path: str | None) -> tuple[pd.DataFrame, dict]:
+    """소스 CSV 1개 → 공통 스키마 DataFrame + 로딩 메타 (소스별 파티션 단위)"""
+    if not path:
+        return _empty_buyer_frame(), {"source": source_name, "status": "missing", "detail": "path not resolved"}
+    try:
+        df, enc, sep = _read_csv_flexible_from_path(path)
+    except Exception as e:
+        return _empty_buyer_frame(), {"source": source_name, "status": "fail", "detail": str(e)}
+
+    cols = list(df.columns)
+    col_company  = _infer_col(cols, ["상호명", "회사", "기업", "업체", "buyer", "company", "corporation", "기관명", "조직"])
+    col_title    = _infer_col(cols, ["제목", "title"])
+    col_item     = _infer_col(cols, ["품목명", "품목", "제품", "item", "product", "카테고리", "category", "오퍼", "inquiry"])
+    col_country  = _infer_col(cols, ["국가명", "국가", "country", "nation", "소재국", "거주국"])
+    col_city     = _infer_col(cols, ["도시", "city", "영문도시", "영문시군구", "시군구", "소재지"])
+    col_hs       = _infer_col(cols, ["hs", "hscode", "hs코드", "품목코드", "세번"])
+    col_name     = _infer_col(cols, ["담당자", "contact", "name", "성명", "대표자"])
+    col_email    = _infer_col(cols, ["이메일", "email", "e-mail", "메일"])
+    col_phone    = _infer_col(cols, ["전화", "phone", "tel", "연락처", "mobile", "핸드폰"])
+    col_web      = _infer_col(cols, ["웹", "홈페이지", "website", "url", "domain", "사이트"])
+    col_addr     = _infer_col(cols, ["주소", "기본주소", "address"])
+    col_date     = _infer_col(cols, ["상담일", "신청시작일", "신청종료일", "등록", "신청", "일자", "날짜", "date", "created", "updated"])
+
+    rows = []
+    for _, r in df.iterrows():
+        company = _safe_get(r, col_company)
+        title   = _safe_get(r, col_title)
+        item    = _safe_get(r, col_item)
+        if not company:
+            company = (f"Inquiry/Offer: {title or item}") if (title or item) else "Unknown Company"
+
+        rows.append({
+            "company_name":   company,
+            "country":        _safe_get(r, col_country),
+            "city":           _safe_get(r, col_city),
+            "product_text":   " ".join(x for x in [item, title] if x),
+            "hs_code":        _safe_get(r, col_hs),
+            "contact_person": _safe_get(r, col_name),
+            "email":          _safe_get(r, col_email),
+            "phone":          _safe_get(r, col_phone),
+            "website":        _safe_get(r, col_web),
+            "address":        _safe_get(r, col_addr),
+            "date":           None,
+            "date_raw":       _safe_get(r, col_date),
+            "source":         source_name,
+        })
+
+    out = pd.DataFrame(rows, columns=BUYER_COLUMNS)
+    for c in _TEXT_COLUMNS:
+        out[c] = out[c].fillna("").astype(str).str.strip()
+    out["date"] = _parse_date_column(out["date_raw"])
+
+    # 국가: 한글명/ISO 코드 → 영문 표준명, 비어 있으면 주소 → 웹사이트 → 이메일 순으로 추정
+    country = normalize_country_column(out["country"])
+    for c in ["address", "website", "email"]:
+        missing = country == ""
+        if not missing.any():
+            break
+        country[missing] = guess_country_column(out.loc[missing, c])
+    out["country"] = country
+    meta = {"source": source_name, "status": "ok", "rows": len(df), "cols": len(cols), "encoding": enc, "sep": sep, "path": path}
+    return out, meta
+
+
+def concat_buyer_partitions(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return _empty_buyer_frame()
+    return pd.concat(parts, ignore_index=True)
+
+
+def load_and_standardize_buyer_csv(resolved_paths: dict) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """전체 소스를 스냅샷 없이 처음부터 표준화 (빌드/벤치마크용)"""
+    parts, meta = [], []
+    for source_name, path in resolved_paths.items():
+        df, m = standardize_buyer_source(source_name, path)
+        parts.append(df)
+        meta.append(m)
+    return concat_buyer_partitions(parts), pd.DataFrame(meta)
+
+
+# ============================================================
+# 소스별 표준화 파티션 (Arrow / Feather)
+#   buyer_cache/<key>.feather : 소스 1개의 표준화 결과
+#   buyer_cache/<key>.json    : 원본 지문(크기/mtime/sha1) + 로딩 메타
+# 원본이 바뀐 소스만 다시 파싱하고 나머지는 memory-map 으로 읽어 concat 한다.
+# ============================================================
+BUYER_CACHE_DIR = os.getenv("BUYER_CACHE_DIR", "buyer_cache")
+
+# 표준화 로직이 바뀌면 올려서 기존 파티션을 무효화
+PARTITION_VERSION = 4
+
+
+def _file_sha1(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _file_fingerprint(path: str, with_hash: bool = True) -> dict:
+    st_ = os.stat(path)
+    fp = {"path": path, "size": st_.st_size, "mtime_ns": st_.st_mtime_ns}
+    if with_hash:
+        fp["sha1"] = _file_sha1(path)
+    return fp
+
+
+def buyer_source_signature(resolved_paths: dict) -> tuple:
+    """원본 파일 (경로, 크기, mtime) 묶음 — Streamlit 캐시 키용 (stat 만 수행)"""
+    sig = []
+    for source_name, path in sorted(resolved_paths.items()):
+        try:
+            st_ = os.stat(path) if path else None
+        except OSError:
+            st_ = None
+        sig.append((source_name, path, st_.st_size if st_ else None, st_.st_mtime_ns if st_ else None))
+    return tuple(sig)
+
+
+def _partition_paths(cache_dir: str, source_name: str) -> tuple[Path, Path]:
+    key = hashlib.sha1(source_name.encode("utf-8")).hexdigest()[:16]
+    return Path(cache_dir) / f"{key}.feather", Path(cache_dir) / f"{key}.json"
+
+
+def _write_atomic(path: Path, write) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _write_json_atomic(path: Path, data: dict) -> None:
+    def _write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+    _write_atomic(path, _write)
+
+
+def _read_sidecar(path: Path) -> dict | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _partition_is_fresh(sidecar: dict | None, source_name: str, path: str, data_file: Path, sidecar_file: Path) -> bool:
+    """
+    크기+mtime 이 같으면 그대로 사용, 다르면 해시를 비교해 내용이 같을 때만 재사용.
+    (파일 복사 등으로 mtime 만 바뀐 경우 sidecar 의 mtime 만 갱신)
+    """
+    if not sidecar or sidecar.get("version") != PARTITION_VERSION or sidecar.get("source") != source_name:
+        return False
+    if not data_file.exists():
+        return False
+    old = sidecar.get("fingerprint") or {}
+    if old.get("path") != path:
+        return False
+    cur = _file_fingerprint(path, with_hash=False)
+    if cur["size"] == old.get("size") and cur["mtime_ns"] == old.get("mtime_ns"):
+        return True
+    if cur["size"] != old.get("size") or _file_sha1(path) != old.get("sha1"):
+        return False
+    old["mtime_ns"] = cur["mtime_ns"]
+    _write_json_atomic(sidecar_file, sidecar)
+    return True
+
+
+def build_buyer_partition(source_name: str, path: str | None, cache_dir: str | None = None) -> tuple[pd.DataFrame, dict]:
+    """소스 1개를 다시 표준화하고 파티션 + sidecar 를 기록한다."""
+    cache_dir = cache_dir or BUYER_CACHE_DIR
+    df, meta = standardize_buyer_source(source_name, path)
+    if meta["status"] != "ok":
+        return df, meta
+
+    os.makedirs(cache_dir, exist_ok=True)
+    data_file, sidecar_file = _partition_paths(cache_dir, source_name)
+    fingerprint = _file_fingerprint(path)
+    _write_atomic(data_file, lambda tmp: feather.write_feather(df, tmp, compression="uncompressed"))
+    _write_json_atomic(sidecar_file, {
+        "version":     PARTITION_VERSION,
+        "source":      source_name,
+        "built_at":    datetime.now().isoformat(timespec="seconds"),
+        "fingerprint": fingerprint,
+        "meta":        meta,
+    })
+    return df, meta
+
+
+def load_buyer_partition(source_name: str, path: str | None, cache_dir: str | None = None) -> tuple[pd.DataFrame, dict]:
+    """파티션이 최신이면 memory-map 으로 읽고, 아니면 해당 소스만 재생성한다."""
+    cache_dir = cache_dir or BUYER_CACHE_DIR
+    if not path or not os.path.exists(path):
+        return standardize_buyer_source(source_name, None)
+
+    data_file, sidecar_file = _partition_paths(cache_dir, source_name)
+    sidecar = _read_sidecar(sidecar_file)
+    if _partition_is_fresh(sidecar, source_name, path, data_file, sidecar_file):
+        try:
+            table = feather.read_table(data_file, memory_map=True)
+            # 열마다 따로 블록을 두고(split_blocks) 변환한 Arrow 버퍼는 바로 놓아(self_destruct) 통합 복사를 피함
+            df = table.to_pandas(split_blocks=True, self_destruct=True)
+            del table
+            return df, sidecar["meta"]
+        except Exception:
+            pass
+    return build_buyer_partition(source_name, path, cache_dir)
+
+
+def load_buyer_snapshot(resolved_paths: dict, cache_dir: str | None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """소스별 파티션을 읽어(필요한 소스만 재생성) 하나의 바이어 테이블로 합친다."""
+    parts, meta = [], []
+    for source_name, path in resolved_paths.items():
+        df, m = load_buyer_partition(source_name, path, cache_dir)
+        parts.append(df)
+        meta.append(m)
+    return concat_buyer_partitions(parts), pd.DataFrame(meta)
+
+
+def build_buyer_snapshot(resolved_paths: dict, cache_dir: str | None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """모든 소스 파티션을 강제로 재생성한다."""
+    parts, meta = [], []
+    for source_name, path in resolved_paths.items():
+        df, m = build_buyer_partition(source_name, path, cache_dir)
+        parts.append(df)
+        meta.append(m)
+    return concat_buyer_partitions(parts), pd.DataFrame(meta)
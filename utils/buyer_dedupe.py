@@ -0,0 +1,296 @@
+"""
+바이어 중복 제거 (소스 간 동일 업체 묶기)
+- 정확 키  : 이메일 / 회사 도메인(무료메일 제외) / 전화번호(숫자 끝 9자리,
+             한 숫자 반복이나 MAX_PHONE_SHARE 행 넘게 겹치는 대표번호는 제외)
+- 유사 키  : 정규화 회사명의 문자 3-gram MinHash + LSH 밴딩으로 후보 쌍을 만들고
+             Jaccard 로 확인 (국가가 같아야 함. 국가 없는 행은 후보 국가가 하나뿐일 때만 연결)
+- 같은 업체로 판정된 행을 연결 요소(cluster)로 묶는다. 전체 비용은 행 수에 거의 선형.
+
+"UNILEVERNIGERIAPLC" / "Unilever Nigeria PLC" 는 정규화 후 같은 이름,
+"PTMANDOMINDONESIATBK" / "PT Mandom Indonesia Tbk" 는 MinHash 후보 → Jaccard 로 묶인다.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# ==================== 정규화 규칙 ====================
+FREE_MAIL_DOMAINS = {
+    "gmail.com", "googlemail.com", "yahoo.com", "yahoo.co.kr", "hotmail.com", "outlook.com",
+    "live.com", "msn.com", "aol.com", "icloud.com", "me.com", "mail.ru", "yandex.ru",
+    "naver.com", "daum.net", "hanmail.net", "nate.com", "qq.com", "163.com", "126.com",
+    "sina.com", "rediffmail.com", "protonmail.com",
+}
+
+# 띄어쓰기가 있는 이름에서 앞/뒤 토큰으로 붙은 법인 형태
+LEGAL_TOKENS = {
+    "co", "corp", "corporation", "company", "inc", "incorporated", "ltd", "limited", "llc",
+    "plc", "gmbh", "ag", "sa", "srl", "spa", "bv", "nv", "pty", "pvt", "pt", "tbk", "jsc",
+    "sarl", "sas", "kg", "oy", "ab", "as", "cv", "sdn", "bhd", "trading", "주식회사", "㈜",
+}
+# 붙여쓴 이름("YESSALESINC")의 끝에서만 떼어내는 형태 (짧은 형태는 오탐이 많아 제외)
+LEGAL_SUFFIXES = sorted(
+    ["corporation", "incorporated", "company", "limited", "coltd", "pvtltd", "gmbh", "corp", "plc", "ltd", "llc", "inc", "tbk"],
+    key=len, reverse=True,
+)
+# 원본 회사명이 비어 있어 표준화 단계에서 채운 자리표시 이름
+PLACEHOLDER_PREFIXES = ("inquiry/offer:", "unknown company")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize_company_name(name: str) -> str:
+    text = unicodedata.normalize("NFKC", str(name or "")).lower().strip()
+    if not text or text.startswith(PLACEHOLDER_PREFIXES):
+        return ""
+    tokens = [t for t in _TOKEN_RE.findall(text) if t != "_"]
+    while len(tokens) > 1 and tokens[-1] in LEGAL_TOKENS:
+        tokens.pop()
+    while len(tokens) > 1 and tokens[0] in LEGAL_TOKENS:
+        tokens.pop(0)
+    key = "".join(tokens)
+    stripped = True
+    while stripped:
+        stripped = False
+        for suf in LEGAL_SUFFIXES:
+            if key.endswith(suf) and len(key) - len(suf) >= 3:
+                key = key[: -len(suf)]
+                stripped = True
+                break
+    return key
+
+
+def normalize_domain(website: str = "", email: str = "") -> str:
+    dom = ""
+    w = str(website or "").strip().lower()
+    if w:
+        dom = re.sub(r"^[a-z]+://", "", w).split("/")[0].split("?")[0]
+    else:
+        e = str(email or "").strip().lower()
+        if "@" in e:
+            dom = e.rsplit("@", 1)[-1]
+    dom = dom.strip(". ")
+    if dom.startswith("www."):
+        dom = dom[4:]
+    if "." not in dom or dom in FREE_MAIL_DOMAINS:
+        return ""
+    return dom
+
+
+def normalize_phone(phone: str) -> str:
+    digits = re.sub(r"\D", "", str(phone or ""))
+    # 국가번호/지역번호 표기 차이를 피하려고 끝 9자리만 비교 (짧은 번호, 00000000 같은 자리표시는 제외)
+    key = digits[-9:] if len(digits) >= 8 else ""
+    return "" if len(set(key)) == 1 else key
+
+
+# ============================================================
+# MinHash + LSH
+# ============================================================
+SHINGLE = 3
+NUM_PERM = 32
+BANDS = 8                 # 8 밴드 × 4 행 → Jaccard ≈ 0.6 부터 후보
+JACCARD_MIN = 0.8
+MIN_NAME_LEN = 5          # 너무 짧은 이름은 유사 비교하지 않음 (정확 일치만)
+WINDOW = 4                # 버킷 안에서는 이름순 정렬 후 이웃 WINDOW 개와만 비교 (sorted-neighbourhood)
+MAX_PHONE_SHARE = 5       # 같은 번호가 이보다 많은 행에 있으면 대표번호/공용 번호로 보고 병합 키에서 제외
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+
+
+def _shingles(s: str) -> set[str]:
+    if len(s) <= SHINGLE:
+        return {s}
+    return {s[i:i + SHINGLE] for i in range(len(s) - SHINGLE + 1)}
+
+
+def _minhash(names: list[str], seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 31, NUM_PERM, dtype=np.uint64)
+    b = rng.integers(0, 1 << 31, NUM_PERM, dtype=np.uint64)
+    sigs = np.empty((len(names), NUM_PERM), dtype=np.uint64)
+    chunk = 20000
+    for start in range(0, len(names), chunk):
+        part = names[start:start + chunk]
+        hashes, lens = [], []
+        for s in part:
+            sh = _shingles(s)
+            lens.append(len(sh))
+            hashes.extend(zlib.crc32(x.encode("utf-8")) for x in sh)
+        h = np.asarray(hashes, dtype=np.uint64)
+        perm = (h[:, None] * a[None, :] + b[None, :]) % _MERSENNE
+        offsets = np.concatenate([[0], np.cumsum(lens)[:-1]])
+        sigs[start:start + len(part)] = np.minimum.reduceat(perm, offsets, axis=0)
+    return sigs
+
+
+def _lsh_pairs(sigs: np.ndarray) -> np.ndarray:
+    """
+    밴드별 해시가 같은 이름끼리 후보 쌍.
+    입력 이름이 정렬돼 있으므로 버킷 멤버를 인덱스 순으로 두고 앞쪽 WINDOW 개 이웃과만 짝지어
+    흔한 버킷에서도 쌍 수가 버킷 크기에 선형으로 유지된다.
+    """
+    rows = NUM_PERM // BANDS
+    pairs = []
+    for band in range(BANDS):
+        keys = np.zeros(len(sigs), dtype=np.uint64)
+        for col in range(band * rows, (band + 1) * rows):
+            keys = keys * np.uint64(1000003) + sigs[:, col]
+        order = np.lexsort((np.arange(len(keys)), keys))
+        sk = keys[order]
+        for w in range(1, WINDOW + 1):
+            same = sk[w:] == sk[:-w]
+            if same.any():
+                pairs.append(np.column_stack([order[:-w][same], order[w:][same]]))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.concatenate(pairs).astype(np.int64)
+    lo, hi = pairs.min(axis=1), pairs.max(axis=1)
+    flat = np.unique(lo * len(sigs) + hi)
+    return np.column_stack([flat // len(sigs), flat % len(sigs)])
+
+
+def _connected_components(n: int, edges: np.ndarray) -> np.ndarray:
+    # 최소 라벨 전파 + 포인터 점프 (scipy 없이 NumPy 만 사용)
+    labels = np.arange(n, dtype=np.int64)
+    if len(edges) == 0:
+        return labels
+    a, b = edges[:, 0], edges[:, 1]
+    while True:
+        prev = labels.copy()
+        m = np.minimum(labels[a], labels[b])
+        np.minimum.at(labels, a, m)
+        np.minimum.at(labels, b, m)
+        labels = labels[labels]
+        if np.array_equal(labels, prev):
+            return labels
+
+
+def _exact_edges(keys: np.ndarray) -> np.ndarray:
+    # 같은 키를 가진 행을 그룹 첫 행과 연결 (빈 키 제외)
+    codes, uniques = pd.factorize(pd.Series(keys, dtype=object))
+    valid = codes >= 0
+    if len(uniques) and (uniques == "").any():
+        valid &= codes != int(np.flatnonzero(uniques == "")[0])
+    rows = np.flatnonzero(valid)
+    if len(rows) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    _, first = np.unique(codes[rows], return_index=True)
+    leader = np.empty(len(uniques), dtype=np.int64)
+    leader[codes[rows][first]] = rows[first]
+    return np.column_stack([rows, leader[codes[rows]]])
+
+
+def _shared_phones_removed(phones) -> np.ndarray:
+    # 너무 많은 행이 공유하는 번호(대표번호/공용 번호)는 빈 키로 (서로 다른 업체를 한 덩어리로 묶지 않도록)
+    keys = pd.Series(phones, dtype=object).fillna("").astype(str)
+    counts = keys.map(keys.value_counts())
+    return keys.where(counts <= MAX_PHONE_SHARE, "").to_numpy()
+
+
+def cluster_buyers(
+    names: pd.Series,
+    countries: pd.Series,
+    domains: pd.Series,
+    phones: pd.Series,
+    emails: pd.Series,
+) -> np.ndarray:
+    """
+    행별 업체 클러스터 라벨 (같은 라벨 = 같은 업체로 판정).
+    domains / phones 는 normalize_domain / normalize_phone 결과, 나머지는 원문.
+    """
+    n = len(names)
+    name_keys = np.asarray([normalize_company_name(x) for x in names], dtype=object)
+    country_keys = pd.Series(countries, dtype=object).fillna("").astype(str).str.strip().str.lower().to_numpy()
+    email_keys = pd.Series(emails, dtype=object).fillna("").astype(str).str.strip().str.lower().to_numpy()
+
+    edges = [
+        _exact_edges(email_keys),
+        _exact_edges(np.asarray(domains, dtype=object)),
+        _exact_edges(_shared_phones_removed(phones)),
+        # 같은 정규화 이름 + 같은 국가 (국가 없는 행은 이름만)
+        _exact_edges(np.where(name_keys != "", name_keys + "|" + country_keys, "")),
+    ]
+
+    # 유사 이름: 고유 이름에서만 MinHash → 후보 쌍 확인 → 원래 행으로 펼침
+    uniq, inv = np.unique(name_keys, return_inverse=True)
+    eligible = np.flatnonzero(np.fromiter((len(u) >= MIN_NAME_LEN for u in uniq), dtype=bool, count=len(uniq)))
+    if len(eligible) > 1:
+        sigs = _minhash([uniq[i] for i in eligible])
+        cand = _lsh_pairs(sigs)
+        # MinHash 추정 Jaccard 로 1차 거르고, 남은 쌍만 실제 3-gram 집합으로 확인
+        est = (sigs[cand[:, 0]] == sigs[cand[:, 1]]).mean(axis=1) if len(cand) else np.empty(0)
+        cand = cand[est >= JACCARD_MIN - 0.15]
+        shingles = {int(i): _shingles(uniq[eligible[i]]) for i in np.unique(cand)}
+        similar = []
+        for x, y in cand:
+            ux, uy = eligible[x], eligible[y]
+            sx, sy = shingles[x], shingles[y]
+            if len(sx & sy) / len(sx | sy) >= JACCARD_MIN:
+                similar.append((ux, uy))
+        if similar:
+            # 이름 그룹끼리 국가별 대표 행을 연결: 같은 국가끼리만.
+            # 국가 없는 행은 유사 이름 상대들의 국가가 하나뿐일 때만 그 국가 행과 연결 (여러 국가를 잇는 다리 방지)
+            first = pd.DataFrame({"name": inv, "country": country_keys}).drop_duplicates()
+            groups: dict[int, dict[str, int]] = {}
+            for row, name, country in zip(first.index, first["name"], first["country"]):
+                groups.setdefault(int(name), {})[country] = int(row)
+            name_edges = []
+            blank_links: dict[int, dict[str, int]] = {}
+            for ux, uy in similar:
+                gx, gy = groups[ux], groups[uy]
+                for c, r1 in gx.items():
+                    if c in gy:
+                        name_edges.append((r1, gy[c]))
+                for ga, gb in ((gx, gy), (gy, gx)):
+                    if "" in ga:
+                        for c, r2 in gb.items():
+                            if c:
+                                blank_links.setdefault(ga[""], {}).setdefault(c, r2)
+            for r1, targets in blank_links.items():
+                if len(targets) == 1:
+                    name_edges.append((r1, next(iter(targets.values()))))
+            if name_edges:
+                edges.append(np.asarray(name_edges, dtype=np.int64))
+
+    return _connected_components(n, np.concatenate(edges).astype(np.int64))
+
+
+def cluster_buyer_frame(df: pd.DataFrame) -> np.ndarray:
+    """표준화된 바이어 테이블(company_name, country, website, email, phone) 전체 클러스터 라벨"""
+    def col(c: str) -> pd.Series:
+        return df[c].fillna("").astype(str) if c in df.columns else pd.Series([""] * len(df), index=df.index)
+
+    domains = [normalize_domain(w, e) for w, e in zip(col("website"), col("email"))]
+    phones = [normalize_phone(p) for p in col("phone")]
+    return cluster_buyers(col("company_name"), col("country"), pd.Series(domains), pd.Series(phones), col("email"))
+
+
+def dedupe_buyer_candidates(records: list[dict]) -> list[dict]:
+    """
+    검색 결과 후보(dict 목록)에서 같은 업체를 하나로 합친다.
+    업체별로 match_score 가 가장 높은 후보만 남기고 점수 내림차순으로 돌려준다.
+    """
+    if not records:
+        return records
+    df = pd.DataFrame(records)
+    if df.empty:
+        return records
+
+    def col(c: str) -> pd.Series:
+        return df[c].fillna("").astype(str) if c in df.columns else pd.Series([""] * len(df))
+
+    domains = [normalize_domain(w, e) for w, e in zip(col("website"), col("email"))]
+    phones = [normalize_phone(p) for p in col("_raw_phone")]
+    df["_cluster"] = cluster_buyers(col("company_name"), col("_raw_country"), pd.Series(domains), pd.Series(phones), col("email"))
+    out = (
+        df.sort_values("match_score", ascending=False, kind="stable")
+          .drop_duplicates("_cluster")
+          .drop(columns=["_cluster"])
+    )
+    return out.to_dict(orient="records")
@@ -0,0 +1,164 @@
+"""
+바이어 테이블 검색 인덱스
+- KeywordIndex  : product_text / company_name 토큰 역색인 (산업 키워드 후보 조회)
+- HSPrefixIndex : hs_code 정렬 배열 인덱스 (2/4/6/10자리 접두 검색)
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# 토큰 구분자: 문자/숫자/밑줄 이외 (색인과 키워드 모두 같은 규칙으로 분리)
+_SEPARATOR_RE = r"[^\p{L}\p{N}_]+"
+
+
+# HS 코드 셀 하나에 여러 코드가 들어있는 경우 구분자
+_HS_SPLIT_RE = re.compile(r"[,;/|]+")
+_NON_DIGIT_RE = re.compile(r"\D+")
+
+
+def normalize_hs_codes(text: str) -> list[str]:
+    """'3304.99, 8517-12' → ['330499', '851712'] (코드별 숫자만 남김)"""
+    codes = (_NON_DIGIT_RE.sub("", part) for part in _HS_SPLIT_RE.split(text or ""))
+    return [c for c in codes if c]
+
+
+def _split_tokens(texts: pa.Array) -> pa.ListArray:
+    return pc.split_pattern_regex(texts, _SEPARATOR_RE)
+
+
+@lru_cache(maxsize=1024)
+def _needle_pieces(needle: str) -> tuple[str, ...]:
+    return tuple(p for p in _split_tokens(pa.array([needle], type=pa.string()))[0].as_py() if p)
+
+
+# ============================================================
+# 키워드 역색인
+# ============================================================
+class KeywordIndex:
+    """
+    소문자 텍스트 배열에 대한 토큰 → 문서 id 역색인.
+    match_any(needles) 는 `any(n in text for n in needles)` 와 같은 결과를 내지만,
+    전체 텍스트 대신 토큰 사전(vocab)만 훑고 해당 posting list 만 모은다.
+
+    - 한 단어 키워드("cream")  : 키워드를 포함하는 토큰의 posting list 합집합 (검증 불필요)
+    - 여러 단어 키워드("skin care") : 첫 조각은 토큰 끝, 중간은 토큰 전체, 마지막은 토큰 시작과
+      일치하는 문서의 교집합을 후보로 잡고 원문에서 한 번 더 확인
+    토큰화와 사전 검색은 pyarrow compute 커널로 처리한다.
+    """
+
+    def __init__(self, texts: np.ndarray):
+        self._texts = np.asarray(texts, dtype=object)
+        self.n = len(self._texts)
+
+        tokens = _split_tokens(pa.array(self._texts, type=pa.string()))
+        doc_ids = pc.list_parent_indices(tokens).to_numpy().astype(np.int32, copy=False)
+        encoded = pc.dictionary_encode(pc.list_flatten(tokens))
+        tok_codes = encoded.indices.to_numpy()
+
+        # 토큰 코드로 안정 정렬 → 토큰별 연속 구간이 posting list (문서 id 오름차순)
+        order = np.argsort(tok_codes, kind="stable")
+        self._postings = doc_ids[order]
+        self._offsets = np.searchsorted(tok_codes[order], np.arange(len(encoded.dictionary) + 1))
+        self._vocab = encoded.dictionary
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _docs(self, token_mask: pa.Array) -> np.ndarray:
+        # 선택된 토큰들의 posting list 를 문서 bool 마스크로 펼친다
+        mask = np.zeros(self.n, dtype=bool)
+        tids = np.flatnonzero(token_mask.to_numpy(zero_copy_only=False))
+        if len(tids):
+            starts = self._offsets[tids]
+            lens = self._offsets[tids + 1] - starts
+            pos = np.repeat(starts - np.cumsum(lens) + lens, lens) + np.arange(lens.sum())
+            mask[self._postings[pos]] = True
+        return mask
+
+    def _lookup_phrase(self, needle: str, pieces: tuple[str, ...]) -> np.ndarray:
+        cand = np.ones(self.n, dtype=bool)
+        last = len(pieces) - 1
+        for i, piece in enumerate(pieces):
+            if i == 0:
+                token_mask = pc.ends_with(self._vocab, piece)
+            elif i == last:
+                token_mask = pc.starts_with(self._vocab, piece)
+            else:
+                token_mask = pc.equal(self._vocab, piece)
+            cand &= self._docs(token_mask)
+            if not cand.any():
+                return cand
+        for d in np.flatnonzero(cand):
+            cand[d] = needle in self._texts[d]
+        return cand
+
+    def match_any(self, needles: list[str]) -> np.ndarray:
+        """needles 중 하나라도 포함하는 문서의 bool 마스크"""
+        mask = np.zeros(self.n, dtype=bool)
+        if not needles or self.n == 0:
+            return mask
+        words = []
+        for needle in needles:
+            pieces = _needle_pieces(needle)
+            if pieces == (needle,):
+                words.append(needle)
+            elif len(pieces) > 1:
+                mask |= self._lookup_phrase(needle, pieces)
+            elif needle:
+                # 토큰이 하나뿐인데 구분자가 붙은 키워드 / 구분자만 있는 키워드는 원문 전체 확인
+                mask |= np.fromiter((needle in t for t in self._texts), dtype=bool, count=self.n)
+            else:
+                mask[:] = True
+                return mask
+        if words:
+            pat = "|".join(re.escape(w) for w in words)
+            mask |= self._docs(pc.match_substring_regex(self._vocab, pat))
+        return mask
+
+
+# ============================================================
+# HS 코드 접두 인덱스
+# ============================================================
+class HSPrefixIndex:
+    """
+    hs_code 문자열 배열에 대한 정렬 배열 인덱스.
+    코드를 숫자만 남겨 정렬해 두고, 접두어 p 로 시작하는 구간을
+    [searchsorted(p), searchsorted(p + ":")) 로 찾는다 (":" 는 "9" 바로 다음 문자).
+    한 셀에 코드가 여러 개면 각각 색인하며, 문자열 중간에 걸친 숫자는 매칭하지 않는다.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.n = len(values)
+        codes, doc_ids = [], []
+        for i, v in enumerate(values):
+            for c in normalize_hs_codes(v):
+                codes.append(c)
+                doc_ids.append(i)
+        codes = np.asarray(codes, dtype=object)
+        order = np.argsort(codes, kind="stable") if len(codes) else np.empty(0, dtype=np.int64)
+        self._codes = codes[order].astype(str) if len(codes) else np.empty(0, dtype=str)
+        self._doc_ids = np.asarray(doc_ids, dtype=np.int32)[order]
+
+    def __len__(self) -> int:
+        return self.n
+
+    def lookup(self, prefix: str) -> np.ndarray:
+        """prefix 로 시작하는 코드를 가진 문서 id (중복 가능, 정렬 안 됨)"""
+        if not prefix or len(self._codes) == 0:
+            return np.empty(0, dtype=np.int32)
+        lo = np.searchsorted(self._codes, prefix, side="left")
+        hi = np.searchsorted(self._codes, prefix + ":", side="left")
+        return self._doc_ids[lo:hi]
+
+    def match_any(self, prefixes: list[str]) -> np.ndarray:
+        """prefixes 중 하나로 시작하는 코드를 가진 문서의 bool 마스크"""
+        mask = np.zeros(self.n, dtype=bool)
+        for p in prefixes:
+            mask[self.lookup(p)] = True
+        return mask
@@ -0,0 +1,313 @@
+"""
+바이어 매칭 점수 계산 모듈
+- score_buyer_record : 레코드 1건 단위 점수 (기준 구현)
+- BuyerScoringEngine : 표준화된 바이어 테이블 전체를 컬럼 단위(NumPy)로 한 번에 채점
+  (산업 키워드 / HS 코드는 utils.buyer_index 인덱스로 후보만 조회,
+   제품 설명은 utils.buyer_semantic TF-IDF 유사도를 키워드 점수와 섞음)
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.buyer_index import HSPrefixIndex, KeywordIndex, normalize_hs_codes
+from utils.buyer_semantic import _hs_names, load_or_build_semantic_index, semantic_query
+
+# ==================== 상수: 산업 키워드 매핑 ====================
+INDUSTRY_KEYWORDS = {
+    "화장품/뷰티": [
+        "cosmetics", "beauty", "skincare", "skin care", "makeup", "personal care",
+        "lotion", "cream", "serum", "toner", "cleanser", "sunscreen", "mask", "fragrance",
+        "k-beauty", "kbeauty",
+    ],
+    "전자제품": [
+        "electronics", "electronic", "device", "gadget", "semiconductor", "chip",
+        "display", "battery", "charger", "adapter", "smart", "iot", "sensor", "led",
+    ],
+    "식품": [
+        "food", "beverage", "snack", "drink", "coffee", "tea", "sauce",
+        "noodle", "ramen", "instant", "frozen", "seafood", "meat", "fruit",
+    ],
+    "섬유/의류": [
+        "apparel", "clothing", "garment", "textile", "fabric", "fashion",
+        "yarn", "cotton", "polyester", "knit", "denim", "outerwear", "sportswear",
+    ],
+    "자동차 부품": [
+        "auto", "automotive", "car", "vehicle", "spare parts", "parts",
+        "engine", "brake", "filter", "tire", "tyre", "transmission", "sensor",
+    ],
+    "기계/설비": [
+        "machinery", "equipment", "industrial", "manufacturing", "factory",
+        "pump", "valve", "compressor", "tool", "robot", "automation", "cnc",
+    ],
+    "의료기기": [
+        "medical", "healthcare", "diagnostic", "surgical", "hospital",
+        "clinic", "monitor", "disposable", "sterile",
+    ],
+    "기타": ["import", "export", "trade", "sourcing", "procurement"],
+}
+
+# ==================== 의미 매칭 (TF-IDF) ====================
+# 제품 점수 = max(키워드 일치 30점, 30 × 코사인 / SEMANTIC_FULL_SIM) — 상위 SEMANTIC_TOP_K 개 고유 텍스트만
+# (산업+HS 질의와 자유 입력 질의를 따로 계산해 큰 쪽 사용)
+SEMANTIC_WEIGHT   = 30
+SEMANTIC_MIN_SIM  = 0.12
+SEMANTIC_FULL_SIM = 0.3
+SEMANTIC_TOP_K    = 2000
+
+# ==================== 소스별 가중치 ====================
+SOURCE_WEIGHT = {
+    "중진공_해외바이어구매오퍼_20241231":   6,
+    "중진공_해외바이어인콰이어리_20241230": 6,
+    "무보_화장품바이어_20200812":          8,
+    "중진공_고비즈코리아거래처_20250523":   2,
+    "KOTRA_해외바이어현황_20240829":       -5,
+}
+
+
+# ============================================================
+# 레코드 단위 스코어링 (기준 구현)
+# ============================================================
+def score_buyer_record(
+    row: dict,
+    industry: str,
+    hs_code: str,
+    countries_selected: list[str],
+    require_email: bool,
+) -> int:
+    score   = 0
+    prod    = (row.get("product_text") or "").lower()
+    comp    = (row.get("company_name") or "").lower()
+    hs      = normalize_hs_codes(row.get("hs_code") or "")
+    country = (row.get("country") or "").lower()
+
+    kws = INDUSTRY_KEYWORDS.get(industry, [])
+    if any(kw.lower() in prod for kw in kws):  score += 30
+    if any(kw.lower() in comp for kw in kws):  score += 10
+
+    # HS 코드는 접두 일치 (3304 → 330499 O, 123304 X)
+    if hs_code:
+        hks = normalize_hs_codes(hs_code)
+        if any(code.startswith(hk) for hk in hks for code in hs):
+            score += 45
+
+    if countries_selected:
+        if any(c.lower() in country for c in countries_selected if c):
+            score += 20
+        else:
+            score -= 15
+
+    if row.get("email"):          score += 20
+    if row.get("contact_person"): score += 8
+    if row.get("phone"):          score += 6
+    if row.get("website"):        score += 6
+
+    if require_email and not row.get("email"):
+        score -= 999
+
+    dt = row.get("date")
+    if isinstance(dt, datetime) and not pd.isna(dt):
+        days_ago = (datetime.now() - dt).days
+        if   days_ago <= 90:  score += 10
+        elif days_ago <= 365: score += 5
+
+    score += SOURCE_WEIGHT.get(row.get("source", ""), 0)
+    return max(-999, min(100, score))
+
+
+# ============================================================
+# 컬럼 단위 스코어링 엔진
+# ============================================================
+def _text_col(df: pd.DataFrame, col: str) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series([""] * len(df), index=df.index, dtype=object)
+    return df[col].fillna("").astype(str)
+
+
+def _factorize(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    # 중복 값이 많은 텍스트 컬럼은 고유값에서만 매칭하고 코드로 펼친다
+    codes, uniques = pd.factorize(values, sort=False)
+    return codes.astype(np.int64, copy=False), np.asarray(uniques, dtype=object)
+
+
+def _contains_any(uniques: np.ndarray, needles: list[str]) -> np.ndarray:
+    # `any(n in text for n in needles)` 와 동일한 결과 (리터럴 부분 문자열 OR)
+    if not needles or len(uniques) == 0:
+        return np.zeros(len(uniques), dtype=bool)
+    pat = re.compile("|".join(re.escape(n) for n in needles))
+    return np.fromiter((pat.search(u) is not None for u in uniques), dtype=bool, count=len(uniques))
+
+
+def _datetime_ns(df: pd.DataFrame) -> np.ndarray:
+    # 표준화된 스냅샷의 date 는 이미 datetime64 → 그대로 사용.
+    # 그 외(object 컬럼)는 datetime 인스턴스만 최신성 가점 대상 (문자열/None 은 NaT)
+    if "date" not in df.columns:
+        return np.full(len(df), np.datetime64("NaT"), dtype="datetime64[ns]")
+    col = df["date"]
+    if not pd.api.types.is_datetime64_any_dtype(col):
+        col = pd.to_datetime(col.where(col.map(lambda v: isinstance(v, datetime)), None), errors="coerce")
+    if getattr(col.dt, "tz", None) is not None:
+        col = col.dt.tz_localize(None)
+    return col.to_numpy(dtype="datetime64[ns]")
+
+
+class BuyerScoringEngine:
+    """
+    표준화된 바이어 DataFrame 을 한 번 전처리해 두고,
+    검색 조건이 바뀔 때마다 전체 행 점수를 NumPy 벡터 연산으로 계산한다.
+    semantic=False 면 score_buyer_record 와 동일한 점수를 반환한다.
+    """
+
+    # 고유값 매칭 결과 캐시 크기 (산업 8개 + HS/국가 조합 여유분)
+    MATCH_CACHE_SIZE = 64
+
+    def __init__(self, df: pd.DataFrame, semantic: bool = True, cache_dir: str | None = None):
+        self.n = len(df)
+        self._match_cache: dict[tuple, np.ndarray] = {}
+        self._match_lock = threading.Lock()
+
+        self._prod_codes, self._prod_uniques = _factorize(_text_col(df, "product_text").str.lower())
+        self._comp_codes, self._comp_uniques = _factorize(_text_col(df, "company_name").str.lower())
+        self._country_codes, self._country_uniques = _factorize(_text_col(df, "country").str.lower())
+        self._hs_codes, self._hs_uniques = _factorize(_text_col(df, "hs_code"))
+
+        # 산업 키워드는 토큰 역색인, HS 코드는 접두 인덱스로 후보 고유값만 조회
+        self._indexes = {
+            "prod": KeywordIndex(self._prod_uniques),
+            "comp": KeywordIndex(self._comp_uniques),
+            "hs":   HSPrefixIndex(self._hs_uniques),
+        }
+        # 제품 텍스트 TF-IDF 행렬 (buyer_cache 에 저장된 것이 있으면 읽기만)
+        self._semantic = load_or_build_semantic_index(self._prod_uniques, cache_dir) if semantic else None
+        if semantic:
+            _hs_names()  # HS 품목명 표는 첫 HS 검색이 아니라 엔진 구축 때 읽어 둔다 (프로세스당 1회)
+
+        self._has_email = (_text_col(df, "email") != "").to_numpy()
+
+        # 조건과 무관한 고정 점수: 연락처 완성도 + 소스 가중치
+        base = np.zeros(self.n, dtype=np.int64)
+        base += np.where(self._has_email, 20, 0)
+        base += np.where((_text_col(df, "contact_person") != "").to_numpy(), 8, 0)
+        base += np.where((_text_col(df, "phone") != "").to_numpy(), 6, 0)
+        base += np.where((_text_col(df, "website") != "").to_numpy(), 6, 0)
+        base += _text_col(df, "source").map(SOURCE_WEIGHT).fillna(0).to_numpy(dtype=np.int64)
+        self._base = base
+
+        self._date_ns = _datetime_ns(df)
+        self._has_date = ~np.isnat(self._date_ns)
+
+    def _match(self, field: str, needles: list[str]) -> np.ndarray:
+        # 필드별 고유값 매칭 → 행 단위 bool 배열 (같은 조건 재검색 시 캐시 사용)
+        key = (field, tuple(needles))
+        hit = self._match_cache.get(key)
+        if hit is None:
+            codes = getattr(self, f"_{field}_codes")
+            index = self._indexes.get(field)
+            if index is not None:
+                hit = index.match_any(needles)[codes]
+            else:
+                hit = _contains_any(getattr(self, f"_{field}_uniques"), needles)[codes]
+            with self._match_lock:
+                if len(self._match_cache) >= self.MATCH_CACHE_SIZE:
+                    self._match_cache.pop(next(iter(self._match_cache)))
+                self._match_cache[key] = hit
+        return hit
+
+    def _semantic_score(self, query: str) -> np.ndarray:
+        # 질의와 비슷한 제품 텍스트 상위 SEMANTIC_TOP_K 개에만 점수 → 행 단위로 펼침 (같은 질의는 캐시)
+        key = ("semantic", query)
+        hit = self._match_cache.get(key)
+        if hit is None:
+            docs, sims = self._semantic.top_k(query, SEMANTIC_TOP_K)
+            keep = sims >= SEMANTIC_MIN_SIM
+            per_doc = np.zeros(len(self._prod_uniques), dtype=np.int64)
+            per_doc[docs[keep]] = np.rint(SEMANTIC_WEIGHT * np.minimum(1.0, sims[keep] / SEMANTIC_FULL_SIM))
+            hit = per_doc[self._prod_codes]
+            with self._match_lock:
+                if len(self._match_cache) >= self.MATCH_CACHE_SIZE:
+                    self._match_cache.pop(next(iter(self._match_cache)))
+                self._match_cache[key] = hit
+        return hit
+
+    def _recency_bonus(self) -> np.ndarray:
+        bonus = np.zeros(self.n, dtype=np.int64)
+        if not self._has_date.any():
+            return bonus
+        now = np.datetime64(datetime.now(), "ns")
+        # timedelta.days 와 같은 내림(floor) 일수
+        days_ago = (now - self._date_ns[self._has_date]) // np.timedelta64(1, "D")
+        bonus[self._has_date] = np.where(days_ago <= 90, 10, np.where(days_ago <= 365, 5, 0))
+        return bonus
+
+    def score(
+        self,
+        industry: str,
+        hs_code: str,
+        countries_selected: list[str],
+        require_email: bool,
+        query_text: str = "",
+    ) -> np.ndarray:
+        score = self._base.copy()
+
+        kws = [kw.lower() for kw in INDUSTRY_KEYWORDS.get(industry, [])]
+        product = np.where(self._match("prod", kws), 30, 0)
+        if self._semantic is not None:
+            for query in [semantic_query(industry, kws, hs_code), query_text.strip()]:
+                if query:
+                    product = np.maximum(product, self._semantic_score(query))
+        score += product
+        score += np.where(self._match("comp", kws), 10, 0)
+
+        if hs_code:
+            hks = normalize_hs_codes(hs_code)
+            if hks:
+                score += np.where(self._match("hs", hks), 45, 0)
+
+        if countries_selected:
+            wanted = [c.lower() for c in countries_selected if c]
+            score += np.where(self._match("country", wanted), 20, -15)
+
+        if require_email:
+            score -= np.where(self._has_email, 0, 999)
+
+        score += self._recency_bonus()
+        return np.clip(score, -999, 100)
+
+
+# ============================================================
+# 결과 조립 (상위 k 건만)
+# ============================================================
+def top_k_indices(scores: np.ndarray, threshold: int, k: int) -> np.ndarray:
+    """
+    threshold 이상인 행 중 점수 상위 k 개의 행 번호 (점수 내림차순, 동점은 행 순서).
+    전체 정렬 대신 argpartition 으로 k 번째 점수를 찾고 후보만 정렬한다.
+    """
+    idx = np.flatnonzero(scores >= threshold)
+    if k <= 0:
+        return idx[:0]
+    if len(idx) > k:
+        sel = scores[idx]
+        kth = np.partition(sel, len(sel) - k)[len(sel) - k]
+        above = idx[sel > kth]
+        ties = idx[sel == kth][: k - len(above)]
+        idx = np.concatenate([above, ties])
+    return idx[np.lexsort((idx, -scores[idx]))]
+
+
+def buyer_domains(website: pd.Series, email: pd.Series) -> pd.Series:
+    """웹사이트 호스트(없으면 이메일 도메인)를 소문자로 — 행 단위 루프 없이 문자열 연산으로 처리"""
+    web = website.fillna("").astype(str)
+    mail = email.fillna("").astype(str)
+    from_web = (
+        web.str.strip().str.lower()
+           .str.replace("https://", "", regex=False)
+           .str.replace("http://", "", regex=False)
+           .str.split("/", n=1).str[0]
+    )
+    from_mail = mail.str.rsplit("@", n=1).str[-1].str.strip().str.lower()
+    return from_web.where(web != "", from_mail.where(mail.str.contains("@", regex=False), ""))
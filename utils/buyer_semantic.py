@@ -0,0 +1,205 @@
+"""
+오프라인 TF-IDF 의미 매칭 (네트워크 호출 없음)
+- 바이어 product_text 고유값마다 단어 + 글자 n-gram(영문 3~4, 한글 2~3) TF-IDF 벡터를 만들어 희소 행렬로 보관
+  (열 우선 CSC: 특징별 문서 목록 → 질의 특징만 골라 내적)
+- 한 번 만든 행렬은 buyer_cache/semantic_<key>.npz 로 저장해 다음 실행부터 바로 읽는다 (새로 저장할 때 예전 행렬은 삭제)
+- 질의 = 산업명 + 산업 키워드 + HS 코드 품목명(data/HScode_customs.csv), 자유 입력 문구는 별도 질의
+scipy / scikit-learn 없이 NumPy 만 사용한다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.buyer_data import BUYER_CACHE_DIR, _write_atomic
+from utils.buyer_index import normalize_hs_codes
+from utils.hs_codes import hs_table
+
+# 특징/가중치 계산이 바뀌면 올려서 저장된 행렬을 무효화
+SEMANTIC_VERSION = 1
+CHAR_NGRAMS = (3, 4)        # 영문 등 (짧은 n-gram 은 무관한 단어끼리도 너무 자주 겹침)
+CHAR_NGRAMS_CJK = (2, 3)    # 한글은 2음절 단어가 많아 2-gram 부터
+MAX_DF_RATIO = 0.2          # 문서의 20% 넘게 나오는 특징은 변별력이 없어 제외 (질의 비용도 줄어듦)
+HS_DESC_LIMIT = 60          # HS 코드 1개당 질의에 넣을 품목명 수
+_GENERIC_HS_NAMES = {"기타", "other", "others", "기타의 것"}
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def _features(text: str) -> Counter:
+    feats: Counter = Counter()
+    for word in _WORD_RE.findall(str(text or "").lower()):
+        feats["w:" + word] += 1
+        padded = f" {word} "
+        for n in (CHAR_NGRAMS if word.isascii() else CHAR_NGRAMS_CJK):
+            for i in range(len(padded) - n + 1):
+                feats["c:" + padded[i:i + n]] += 1
+    return feats
+
+
+class SemanticIndex:
+    """
+    문서(고유 텍스트) × 특징 TF-IDF 행렬 (행 L2 정규화, CSC 보관).
+    similarity(query) → 문서별 코사인 유사도
+    """
+
+    def __init__(self, vocab: list[str], idf: np.ndarray, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, n_docs: int):
+        self.vocab = {f: i for i, f in enumerate(vocab)}
+        self._vocab_list = vocab
+        self.idf = idf
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.n_docs = n_docs
+
+    @classmethod
+    def build(cls, texts) -> "SemanticIndex":
+        vocab: dict[str, int] = {}
+        doc_ids, feat_ids, counts = [], [], []
+        for d, text in enumerate(texts):
+            for feat, cnt in _features(text).items():
+                doc_ids.append(d)
+                feat_ids.append(vocab.setdefault(feat, len(vocab)))
+                counts.append(cnt)
+        n_docs = len(texts)
+        doc = np.asarray(doc_ids, dtype=np.int32)
+        feat = np.asarray(feat_ids, dtype=np.int64)
+        tf = np.asarray(counts, dtype=np.float32)
+
+        # 너무 흔한 특징 제외 후 특징 번호 다시 매기기
+        df = np.bincount(feat, minlength=len(vocab))
+        keep = df <= max(1, MAX_DF_RATIO * n_docs)
+        remap = np.cumsum(keep) - 1
+        sel = keep[feat]
+        doc, feat, tf = doc[sel], remap[feat[sel]], tf[sel]
+        names = [f for f, i in vocab.items() if keep[i]]
+        df = df[keep]
+
+        # sublinear tf × smooth idf, 문서별 L2 정규화
+        idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+        w = (1 + np.log(tf)) * idf[feat]
+        norms = np.sqrt(np.bincount(doc, weights=w * w, minlength=n_docs)).astype(np.float32)
+        w = w / np.where(norms[doc] > 0, norms[doc], 1)
+
+        order = np.argsort(feat, kind="stable")
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(feat, minlength=len(names)))]).astype(np.int64)
+        return cls(names, idf, indptr, doc[order], w[order].astype(np.float32), n_docs)
+
+    def query_vector(self, text: str) -> tuple[np.ndarray, np.ndarray]:
+        ids, weights = [], []
+        for feat, cnt in _features(text).items():
+            i = self.vocab.get(feat)
+            if i is not None:
+                ids.append(i)
+                weights.append((1 + np.log(cnt)) * self.idf[i])
+        ids = np.asarray(ids, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float32)
+        norm = float(np.sqrt((weights * weights).sum()))
+        return ids, (weights / norm if norm else weights)
+
+    def similarity(self, text: str) -> np.ndarray:
+        ids, q = self.query_vector(text)
+        if len(ids) == 0:
+            return np.zeros(self.n_docs, dtype=np.float32)
+        starts, ends = self.indptr[ids], self.indptr[ids + 1]
+        docs = np.concatenate([self.indices[s:e] for s, e in zip(starts, ends)])
+        vals = np.concatenate([self.data[s:e] * w for s, e, w in zip(starts, ends, q)])
+        return np.bincount(docs, weights=vals, minlength=self.n_docs).astype(np.float32)
+
+    def top_k(self, text: str, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """유사도 상위 k 문서 번호와 유사도 (내림차순, 0 인 문서 제외)"""
+        sims = self.similarity(text)
+        cand = np.flatnonzero(sims > 0)
+        if len(cand) > k:
+            cand = cand[np.argpartition(sims[cand], len(cand) - k)[len(cand) - k:]]
+        cand = cand[np.argsort(-sims[cand], kind="stable")]
+        return cand, sims[cand]
+
+    # ---------- 저장 / 로드 ----------
+    def save(self, path: Path) -> None:
+        vocab = np.frombuffer("\n".join(self._vocab_list).encode("utf-8"), dtype=np.uint8)
+
+        def _write(tmp):
+            with open(tmp, "wb") as f:
+                np.savez(f, vocab=vocab, idf=self.idf, indptr=self.indptr, indices=self.indices,
+                         data=self.data, n_docs=np.int64(self.n_docs))
+        _write_atomic(path, _write)
+
+    @classmethod
+    def load(cls, path: Path) -> "SemanticIndex":
+        with np.load(path, allow_pickle=False) as z:
+            raw = z["vocab"].tobytes().decode("utf-8")
+            vocab = raw.split("\n") if raw else []
+            return cls(vocab, z["idf"], z["indptr"], z["indices"], z["data"], int(z["n_docs"]))
+
+
+def semantic_index_key(texts) -> str:
+    h = hashlib.sha1(f"v{SEMANTIC_VERSION}".encode())
+    for t in texts:
+        h.update(str(t).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+def load_or_build_semantic_index(texts, cache_dir: str | None = None) -> SemanticIndex:
+    """같은 텍스트 목록으로 만든 행렬이 저장돼 있으면 읽고, 없으면 만들어 저장 (저장 실패는 무시)"""
+    path = Path(cache_dir or BUYER_CACHE_DIR) / f"semantic_{semantic_index_key(texts)}.npz"
+    if path.exists():
+        try:
+            return SemanticIndex.load(path)
+        except Exception:
+            pass
+    index = SemanticIndex.build(texts)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        index.save(path)
+    except OSError:
+        return index
+    # 바이어 데이터가 바뀌어 키가 달라지면 예전 행렬은 다시 쓰이지 않으므로 정리
+    for old in path.parent.glob("semantic_*.npz"):
+        if old != path:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+    return index
+
+
+# ============================================================
+# 질의 문구
+# ============================================================
+@lru_cache(maxsize=1)
+def _hs_names() -> pd.DataFrame:
+    table = hs_table()
+    names = pd.concat([
+        pd.DataFrame({"hs": table["hs"], "name": table["kor"]}),
+        pd.DataFrame({"hs": table["hs"], "name": table["eng"]}),
+    ], ignore_index=True)
+    names["name"] = names["name"].fillna("").astype(str).str.strip()
+    names = names[(names["name"] != "") & ~names["name"].str.lower().isin(_GENERIC_HS_NAMES)]
+    return names.sort_values("hs", kind="stable").reset_index(drop=True)
+
+
+@lru_cache(maxsize=256)
+def hs_description(hs_code: str) -> str:
+    """HS 코드(여러 개 가능) 접두에 해당하는 관세청 품목명(한글/영문)을 이어 붙인 문구"""
+    names = _hs_names()
+    codes = names["hs"].to_numpy()
+    parts = []
+    for prefix in normalize_hs_codes(hs_code):
+        # hs 로 정렬돼 있으므로 접두 구간은 이진 탐색 (":" 는 "9" 다음 문자)
+        lo, hi = np.searchsorted(codes, [prefix, prefix + ":"])
+        hit = names["name"].iloc[lo:hi].drop_duplicates()
+        parts.extend(hit.head(HS_DESC_LIMIT).tolist())
+    return " ".join(parts)
+
+
+def semantic_query(industry: str, keywords: list[str], hs_code: str = "") -> str:
+    return " ".join(x for x in [industry, " ".join(keywords), hs_description(hs_code) if hs_code else ""] if x)
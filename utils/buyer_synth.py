@@ -0,0 +1,148 @@
+"""
+합성 바이어 풀 생성기 (벤치마크용)
+- 실제 소스 CSV 5개의 컬럼/인코딩/구분자를 그대로 따르는 CSV 를 원하는 행 수만큼 생성
+- 원본 행을 seed 고정 난수로 복원 추출하고, 회사명/이메일/웹사이트/전화번호 같은 식별 컬럼은
+  업체마다 새로 만들어 중복 묶기가 실제처럼 동작하도록 한다 (일부는 다른 행의 업체를 변형해 재사용)
+- mixed_delimiters=True 면 소스별로 ; / 탭 / | 구분자를 섞어 구분자 감지 경로까지 측정
+"""
+
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.buyer_data import CSV_BUYER_FILES, _read_csv_fast, find_local_csv_by_name
+from utils.buyer_dedupe import FREE_MAIL_DOMAINS, normalize_domain
+
+# 같은 업체가 다른 행/소스에 다시 나오는 비율
+DUPLICATE_RATE = 0.05
+
+_DELIMITERS = [",", ";", "\t", "|"]
+_SYLLABLES = np.array([c + v for c in "bcdfghjklmnprstvwz" for v in "aeiou"], dtype=object)
+_NAME_WORDS = np.array(["Trading", "Global", "Cosmetics", "Beauty", "Foods", "Industries", "Import", "Export",
+                        "Group", "International", "Supply", "Distribution", "Partners", "Holdings"], dtype=object)
+_LEGAL = np.array(["Co., Ltd.", "Inc.", "LLC", "PLC", "PTY LTD", "GmbH", "S.A.", "Limited", ""], dtype=object)
+_NAME_VARIANTS = ["upper", "no_suffix", "co_ltd"]
+
+# 식별 컬럼 역할 (원본 헤더 기준)
+_IDENTITY_ROLES = {"상호명": "company", "이메일": "email", "홈페이지": "website", "전화번호": "phone", "팩스번호": "fax"}
+
+
+def _source_rows(total_rows: int, weights: dict[str, int]) -> dict[str, int]:
+    # 실제 파일 행 수 비율로 나누고, 반올림 오차는 가장 큰 소스에 몰아준다
+    whole = sum(weights.values()) or 1
+    rows = {k: int(total_rows * w / whole) for k, w in weights.items()}
+    biggest = max(weights, key=weights.get)
+    rows[biggest] += total_rows - sum(rows.values())
+    return rows
+
+
+def _company_names(rng: np.random.Generator, n: int) -> pd.Series:
+    syl = _SYLLABLES[rng.integers(0, len(_SYLLABLES), size=(n, 3))]
+    stem = pd.Series(syl[:, 0] + syl[:, 1] + syl[:, 2]).str.capitalize()
+    word = _NAME_WORDS[rng.integers(0, len(_NAME_WORDS), n)]
+    legal = _LEGAL[rng.integers(0, len(_LEGAL), n)]
+    return (stem + " " + word + " " + legal).str.strip()
+
+
+def _tld(domain: str) -> str:
+    parts = domain.lower().strip(". ").split(".")
+    if len(parts) >= 3 and len(parts[-1]) == 2 and parts[-2] in ("co", "com", "net", "or", "ne"):
+        return ".".join(parts[-2:])
+    return parts[-1] if len(parts) >= 2 else "com"
+
+
+def _identity_columns(tmpl: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+    """템플릿 행에서 식별 컬럼만 새 업체 값으로 교체 (DUPLICATE_RATE 만큼은 다른 행 업체를 변형해 재사용)"""
+    n = len(tmpl)
+    out = tmpl.copy()
+    roles = {role: col for col, role in _IDENTITY_ROLES.items() if col in tmpl.columns}
+    if not roles or n == 0:
+        return out
+
+    names = _company_names(rng, n)
+    slug = names.str.lower().str.replace(r"[^a-z]", "", regex=True).str[:24]
+    if "email" in roles:
+        email_tmpl = tmpl[roles["email"]].fillna("").astype(str)
+        email_dom = email_tmpl.str.rsplit("@", n=1).str[-1].str.lower()
+        local = email_tmpl.str.split("@", n=1).str[0]
+    if "website" in roles:
+        web_tmpl = tmpl[roles["website"]].fillna("").astype(str)
+        tld = web_tmpl.map(lambda w: _tld(normalize_domain(w)))
+    else:
+        tld = pd.Series(["com"] * n)
+    domain = slug + "." + tld.to_numpy()
+
+    if "company" in roles:
+        out[roles["company"]] = names.to_numpy()
+    if "website" in roles:
+        out[roles["website"]] = np.where(web_tmpl.to_numpy() != "", ("www." + domain).to_numpy(), "")
+    if "email" in roles:
+        free = email_dom.isin(FREE_MAIL_DOMAINS).to_numpy()
+        own = (local + "@" + domain).to_numpy()
+        freemail = (local + slug.str[:6] + "@" + email_dom).to_numpy()
+        out[roles["email"]] = np.where(email_tmpl.to_numpy() == "", "", np.where(free, freemail, own))
+    for role in ("phone", "fax"):
+        if role in roles:
+            tmpl_phone = tmpl[roles[role]].fillna("").astype(str)
+            prefix = tmpl_phone.str.split("-", n=1).str[0].to_numpy()
+            digits = pd.Series(rng.integers(10_000_000, 100_000_000, n)).astype(str).to_numpy()
+            number = prefix + "-" + pd.Series(digits).str[:4].to_numpy() + "-" + pd.Series(digits).str[4:].to_numpy()
+            out[roles[role]] = np.where(tmpl_phone.to_numpy() != "", number, "")
+
+    # 중복 업체: 다른 행의 식별 컬럼을 복사하고 회사명 표기만 조금 바꾼다
+    dup = np.flatnonzero(rng.random(n) < DUPLICATE_RATE)
+    if len(dup):
+        target = rng.integers(0, n, len(dup))
+        for col in roles.values():
+            out.iloc[dup, out.columns.get_loc(col)] = out.iloc[target, out.columns.get_loc(col)].to_numpy()
+        if "company" in roles:
+            col = out.columns.get_loc(roles["company"])
+            base = out.iloc[dup, col].astype(str)
+            variant = rng.integers(0, len(_NAME_VARIANTS), len(dup))
+            no_suffix = base.str.replace(r"\s+(Co\., Ltd\.|Inc\.|LLC|PLC|PTY LTD|GmbH|S\.A\.|Limited)$", "", regex=True)
+            out.iloc[dup, col] = np.select(
+                [variant == 0, variant == 1],
+                [base.str.upper().to_numpy(), no_suffix.to_numpy()],
+                (no_suffix + " Co., Ltd.").to_numpy(),
+            )
+    return out
+
+
+def generate_buyer_pool(
+    out_dir: str,
+    total_rows: int,
+    seed: int = 0,
+    mixed_delimiters: bool = False,
+) -> dict[str, str]:
+    """
+    out_dir 에 CSV_BUYER_FILES 와 같은 파일명으로 합성 CSV 를 쓰고 {소스: 경로} 를 돌려준다.
+    총 행 수는 실제 파일 행 수 비율로 소스에 나눈다. 같은 seed 면 같은 파일이 나온다.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    originals = {}
+    for source, filename in CSV_BUYER_FILES.items():
+        path = find_local_csv_by_name(filename)
+        if not path:
+            continue
+        _, enc, sep = _read_csv_fast(path)
+        df = pd.read_csv(path, sep=sep, encoding=enc, dtype=str, keep_default_na=False, on_bad_lines="skip")
+        originals[source] = (df, enc, sep)
+    if not originals:
+        raise FileNotFoundError("원본 바이어 CSV 를 찾을 수 없습니다.")
+
+    rows = _source_rows(total_rows, {k: len(v[0]) for k, v in originals.items()})
+    paths = {}
+    for source, (df, enc, sep) in originals.items():
+        tmpl = df.iloc[rng.integers(0, len(df), rows[source])].reset_index(drop=True)
+        synth = _identity_columns(tmpl, rng)
+        if mixed_delimiters:
+            sep = _DELIMITERS[int(rng.integers(0, len(_DELIMITERS)))]
+        path = os.path.join(out_dir, CSV_BUYER_FILES[source])
+        synth.to_csv(path, sep=sep, index=False, encoding=enc, errors="replace")
+        paths[source] = path
+    return paths
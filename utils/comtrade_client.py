@@ -0,0 +1,218 @@
+"""
+UN Comtrade API 공용 클라이언트
+- requests.Session 연결 풀 재사용 (페이지/스레드 간 공유)
+- 토큰 버킷으로 초당 호출 수 제한 (Comtrade 구독 한도에 맞춤, 환경변수로 조정)
+- 429 / 5xx / 연결 오류는 지터를 섞은 지수 백오프 후 재시도, 401/403 은 바로 다음 키로
+- 여러 구독 키를 라운드 로빈으로 돌려 쓰기
+- 호출마다 지연 시간/상태 코드를 로그로 남기고 최근 통계를 보관
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+COMTRADE_BASE_URL = "https://comtradeapi.un.org/data/v1/get"
+
+# 거시 분석 페이지(macro_1)의 분석 대상국 선택지 (Comtrade reporter 코드)
+MACRO_REPORTERS = {
+    "미국": "842", "중국": "156", "한국": "410", "독일": "276", "일본": "392",
+    "영국": "826", "프랑스": "250", "캐나다": "124",
+}
+
+# 수출 솔루션 페이지(new_kotra_4)의 타겟 국가 → Comtrade 코드 (ISO 3166-1 numeric code)
+# 한국: 410, 세계: 0
+COUNTRY_TO_COMTRADE = {
+    "미국": "840", "중국": "156", "일본": "392", "베트남": "704",
+    "홍콩": "344", "대만": "490", "인도": "356", "싱가포르": "702",
+    "호주": "036", "멕시코": "484", "독일": "276", "프랑스": "250",
+    "영국": "826", "러시아": "643", "브라질": "076", "캐나다": "124",
+    "인도네시아": "360", "태국": "764", "필리핀": "608", "아랍에미리트": "784",
+    "이탈리아": "380", "스페인": "724", "네덜란드": "528", "한국": "410", "세계": "0"
+}
+
+# 페이지가 조회하는 기간 (캐시 예열 스크립트가 같은 기간을 받도록 공용)
+MACRO_ANNUAL_YEARS = ["2022", "2021", "2020"]   # 거시 분석: 기준 연도 선택지
+MACRO_MONTHLY_YEARS = [2020, 2021, 2022, 2023]  # 거시 분석: 월별 시작/종료 선택지
+MARKET_SHARE_PERIOD = "2023"                    # 수출 솔루션: 수입 시장 점유율 연도
+
+# 무료 구독 기준 초당 1회 (버스트 2회). 유료 구독이면 환경변수로 올린다.
+COMTRADE_RATE_PER_SEC = float(os.getenv("COMTRADE_RATE_PER_SEC", "1.0"))
+COMTRADE_BURST        = int(os.getenv("COMTRADE_BURST", "2"))
+COMTRADE_POOL_SIZE    = 8
+
+MAX_RETRIES = 4
+BASE_DELAY  = 1.0
+MAX_DELAY   = 30.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+KEY_REJECTED_STATUS = {401, 403}
+
+# 키를 찾는 환경변수 (페이지마다 이름이 달라 모두 확인, 순서 유지·중복 제거)
+COMTRADE_KEY_ENV = ["UN_COMTRADE_KEY", "UN_API_KEY", "UN_SECOND_API_KEY", "UN_COMTRADE_SECONDARY_KEY"]
+
+
+def comtrade_keys_from_env() -> list[str]:
+    keys = [(os.getenv(name) or "").strip() for name in COMTRADE_KEY_ENV]
+    return list(dict.fromkeys(k for k in keys if k))
+
+
+class TokenBucket:
+    """rate 개/초로 채워지는 용량 capacity 토큰 버킷 (스레드 안전, 토큰이 없으면 기다림)"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = max(rate, 1e-6)
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """토큰 1개를 가져간다. 기다린 시간(초)을 돌려준다."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+# 프로세스 공용 호출 한도 (페이지마다 키 이름이 달라도 같은 구독 한도를 나눠 씀)
+_RATE_LIMITER = TokenBucket(COMTRADE_RATE_PER_SEC, COMTRADE_BURST)
+
+
+class ComtradeClient:
+    def __init__(self, keys: list[str], bucket: TokenBucket | None = None, max_retries: int = MAX_RETRIES):
+        self.keys = list(dict.fromkeys(k for k in keys if k))
+        self.max_retries = max_retries
+        self.bucket = bucket or _RATE_LIMITER
+        self._key_cycle = itertools.cycle(range(len(self.keys))) if self.keys else None
+        self._key_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=200)
+        self._counters = {"calls": 0, "ok": 0, "retries": 0, "failed": 0}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=COMTRADE_POOL_SIZE, pool_maxsize=COMTRADE_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _next_key(self) -> int:
+        with self._key_lock:
+            return next(self._key_cycle)
+
+    def _record(self, latency: float | None, outcome: str | None = None) -> None:
+        with self._stats_lock:
+            if latency is not None:
+                self._counters["calls"] += 1
+                self._latencies.append(latency)
+            if outcome:
+                self._counters[outcome] += 1
+
+    @staticmethod
+    def _backoff(attempt: int, resp: requests.Response | None) -> float:
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = min(MAX_DELAY, BASE_DELAY * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.5)
+
+    def get(self, url: str, params: dict, timeout: float = 30) -> dict | None:
+        """
+        GET url (전체 URL 또는 COMTRADE_BASE_URL 기준 경로, 예: "C/A/HS") → JSON dict.
+        키가 없거나 재시도를 모두 소진하면 None (예외를 올리지 않음).
+        """
+        if not self.keys:
+            return None
+        if not url.startswith("http"):
+            url = f"{COMTRADE_BASE_URL}/{url.lstrip('/')}"
+
+        rejected: set[int] = set()
+        for attempt in range(self.max_retries + 1):
+            key_idx = self._next_key()
+            if key_idx in rejected and len(rejected) < len(self.keys):
+                key_idx = next(i for i in range(len(self.keys)) if i not in rejected)
+            waited = self.bucket.acquire()
+            t0 = time.perf_counter()
+            resp = None
+            try:
+                resp = self.session.get(
+                    url, params=params, timeout=timeout,
+                    headers={"Ocp-Apim-Subscription-Key": self.keys[key_idx]},
+                )
+                status = resp.status_code
+            except requests.RequestException as e:
+                status = type(e).__name__
+            latency = time.perf_counter() - t0
+            self._record(latency)
+            logger.info(
+                "comtrade %s %s -> %s %.0fms (attempt %d, key #%d, throttled %.0fms)",
+                url.rsplit("/get/", 1)[-1], params.get("cmdCode", ""), status,
+                latency * 1000, attempt + 1, key_idx + 1, waited * 1000,
+            )
+
+            if status == 200:
+                try:
+                    data = resp.json()
+                except ValueError:
+                    self._record(None, "failed")
+                    return None
+                self._record(None, "ok")
+                return data
+            if status in KEY_REJECTED_STATUS:
+                rejected.add(key_idx)
+                if len(rejected) >= len(self.keys):
+                    break
+                continue
+            if status in RETRY_STATUS or isinstance(status, str):
+                if attempt < self.max_retries:
+                    self._record(None, "retries")
+                    time.sleep(self._backoff(attempt, resp))
+                continue
+            break   # 400/404 등: 재시도해도 같은 결과
+
+        self._record(None, "failed")
+        return None
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            lat = sorted(self._latencies)
+            out = dict(self._counters)
+        out["keys"] = len(self.keys)
+        out["avg_ms"] = round(1000 * sum(lat) / len(lat), 1) if lat else 0.0
+        out["p95_ms"] = round(1000 * lat[int(0.95 * (len(lat) - 1))], 1) if lat else 0.0
+        return out
+
+
+_CLIENTS: dict[tuple, ComtradeClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_comtrade_client(keys: list[str] | None = None) -> ComtradeClient:
+    """
+    프로세스 공용 클라이언트 (같은 키 묶음이면 같은 세션을 공유, 호출 한도는 전체 공용).
+    keys 를 주지 않으면 환경변수(COMTRADE_KEY_ENV)에서 읽는다.
+    """
+    keys = list(dict.fromkeys(k.strip() for k in (keys if keys is not None else comtrade_keys_from_env()) if k and k.strip()))
+    sig = tuple(keys)
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(sig)
+        if client is None:
+            client = _CLIENTS[sig] = ComtradeClient(keys)
+        return client
@@ -0,0 +1,419 @@
+"""
+UN Comtrade 로컬 저장소 (SQLite)
+- 레코드 단위로 (hs, reporter, partner, flow, freq, period) 색인 저장
+- 어떤 기간을 이미 받아 왔는지는 fetched 테이블에 따로 기록 (데이터가 없던 기간도 기록해 재호출 방지)
+- 범위 조회는 (캐시 레코드, 아직 없는 기간, TTL 이 지난 기간) 을 돌려줘 빠진 기간만 API 로 받고
+  TTL 이 지난 기간은 우선 저장된 값을 보여 준 뒤 뒤에서 갱신하게 한다 (put 은 기간 단위로 원자적 교체)
+- 스레드별 연결 + WAL → Streamlit 워커 스레드/프로세스가 같은 파일을 함께 써도 안전
+- 정리: TTL + stale 기간이 지난 기간은 삭제, 전체 크기가 한도를 넘으면 마지막 조회 시각이 오래된 기간부터 삭제(LRU).
+  백그라운드 스레드가 주기적으로 실행 → 오래 켜 둔 서버에서도 캐시가 끝없이 커지지 않음
+- 적중/미적중 기간 수와 API 호출 없이 재사용한 바이트 수를 DB 에 누적 (캐시 패널 표시용)
+- HS 계층 합계(rollups): 4단위 호(heading) 자신과 그 아래 6단위 소호를 한 번에 받아 저장하면 4단위·2단위 합계를
+  파트너별로 미리 만들어 둔다 (4단위는 Comtrade 가 보고한 호 합계, 없을 때만 소호 합)
+  → 6단위 데이터가 없을 때 4단위로 다시 API 를 부르지 않고 로컬 값을 읽음
+- 분석 요청(HS 코드, 대상국) 사용 기록 → scripts/warm_comtrade_cache.py 가 자주 찾는 HS 코드를 미리 받아 둠
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+COMTRADE_STORE_FILE = "comtrade.sqlite3"
+COMTRADE_CACHE_TTL_DAYS = 7   # 거시 분석 페이지 CACHE_EXPIRY_DAYS 와 같게
+COMTRADE_CACHE_MAX_BYTES = int(os.getenv("COMTRADE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+COMTRADE_CACHE_SWEEP_SEC = int(os.getenv("COMTRADE_CACHE_SWEEP_SEC", "600"))
+# TTL 이 지난 뒤에도 이 기간 동안은 오래된 데이터를 먼저 보여 주고 뒤에서 갱신 (stale-while-revalidate)
+COMTRADE_CACHE_STALE_SEC = int(os.getenv("COMTRADE_CACHE_STALE_SEC", str(30 * 24 * 3600)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    hs       TEXT NOT NULL,
+    reporter TEXT NOT NULL,
+    flow     TEXT NOT NULL,
+    freq     TEXT NOT NULL,
+    period   TEXT NOT NULL,
+    partner  TEXT NOT NULL,
+    payload  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_records_key ON records(hs, reporter, flow, freq, period, partner);
+CREATE TABLE IF NOT EXISTS fetched (
+    hs         TEXT NOT NULL,
+    reporter   TEXT NOT NULL,
+    flow       TEXT NOT NULL,
+    freq       TEXT NOT NULL,
+    period     TEXT NOT NULL,
+    rows       INTEGER NOT NULL,
+    bytes      INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (hs, reporter, flow, freq, period)
+);
+CREATE INDEX IF NOT EXISTS idx_fetched_accessed ON fetched(accessed_at);
+CREATE TABLE IF NOT EXISTS rollups (
+    hs       TEXT NOT NULL,
+    reporter TEXT NOT NULL,
+    flow     TEXT NOT NULL,
+    freq     TEXT NOT NULL,
+    period   TEXT NOT NULL,
+    partner  TEXT NOT NULL,
+    value    REAL NOT NULL,
+    weight   REAL NOT NULL,
+    PRIMARY KEY (hs, reporter, flow, freq, period, partner)
+);
+CREATE TABLE IF NOT EXISTS rollup_built (
+    hs          TEXT NOT NULL,
+    reporter    TEXT NOT NULL,
+    flow        TEXT NOT NULL,
+    freq        TEXT NOT NULL,
+    period      TEXT NOT NULL,
+    parts       INTEGER NOT NULL,
+    parts_total INTEGER NOT NULL,
+    built_at    REAL NOT NULL,
+    PRIMARY KEY (hs, reporter, flow, freq, period)
+);
+CREATE TABLE IF NOT EXISTS usage (
+    hs           TEXT NOT NULL,
+    reporter     TEXT NOT NULL,
+    requested_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_usage_time ON usage(requested_at);
+CREATE TABLE IF NOT EXISTS stats (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats(name, value) VALUES ('hits', 0), ('misses', 0), ('bytes_saved', 0), ('evictions', 0), ('expired', 0);
+"""
+
+
+def monthly_periods(start_year: int, end_year: int) -> list[str]:
+    return [f"{y}{m:02d}" for y in range(start_year, end_year + 1) for m in range(1, 13)]
+
+
+def _is_total_row(rec: dict) -> bool:
+    """운송수단/2차 파트너/세관 구분이 있는 응답이면 합계 행(0 / C00)만 합계에 넣는다 (중복 합산 방지)"""
+    return (
+        str(rec.get("motCode", 0)) in ("0", "None")
+        and str(rec.get("partner2Code", 0)) in ("0", "None")
+        and str(rec.get("customsCode", "C00")) in ("C00", "None")
+    )
+
+
+class ComtradeStore:
+    def __init__(self, path: str, ttl: float, max_bytes: int = COMTRADE_CACHE_MAX_BYTES, stale_ttl: float = COMTRADE_CACHE_STALE_SEC):
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def _conn(self) -> sqlite3.Connection:
+        # fork 된 자식 프로세스는 부모의 연결을 물려받지 않고 새로 연결
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")   # 새 파일에만 적용, 정리 후 빈 페이지 반환용
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._init_lock:
+                if not self._ready:
+                    conn.executescript(_SCHEMA)
+                    self._ready = True
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def lookup(
+        self, hs: str, reporter: str, flow: str, freq: str, periods: Iterable[str], track: bool = True,
+    ) -> tuple[list[dict], list[str], list[str]]:
+        """
+        요청 기간의 (저장된 레코드, 다시 받아야 할 기간, 오래됐지만 보여 줄 수 있는 기간).
+        TTL 이 지났어도 stale_ttl 이내면 레코드를 돌려주고 stale 목록에 넣는다 (뒤에서 갱신하라는 뜻).
+        track=False 면 적중 통계/마지막 조회 시각을 건드리지 않음 (캐시 예열 등 사용자 요청이 아닌 조회)
+        """
+        periods = [str(p) for p in periods]
+        if not periods:
+            return [], [], []
+        conn = self._conn()
+        now = time.time()
+        marks = ",".join("?" * len(periods))
+        ages = dict(conn.execute(
+            f"SELECT period, ? - fetched_at FROM fetched WHERE hs=? AND reporter=? AND flow=? AND freq=? "
+            f"AND period IN ({marks}) AND fetched_at >= ?",
+            (now, hs, reporter, flow, freq, *periods, now - self.ttl - self.stale_ttl),
+        ).fetchall())
+        fresh = set(ages)
+        stale = [p for p in periods if p in ages and ages[p] > self.ttl]
+        missing = [p for p in periods if p not in fresh]
+        if track:
+            self._bump(conn, "misses", len(missing))
+        if not fresh:
+            return [], missing, []
+        hit = sorted(fresh)
+        marks = ",".join("?" * len(hit))
+        key = (hs, reporter, flow, freq, *hit)
+        rows = conn.execute(
+            f"SELECT payload FROM records WHERE hs=? AND reporter=? AND flow=? AND freq=? AND period IN ({marks})", key,
+        ).fetchall()
+        if track:
+            saved = conn.execute(
+                f"SELECT COALESCE(SUM(bytes), 0) FROM fetched WHERE hs=? AND reporter=? AND flow=? AND freq=? AND period IN ({marks})", key,
+            ).fetchone()[0]
+            conn.execute(
+                f"UPDATE fetched SET accessed_at=? WHERE hs=? AND reporter=? AND flow=? AND freq=? AND period IN ({marks})",
+                (time.time(), *key),
+            )
+            self._bump(conn, "hits", len(hit))
+            self._bump(conn, "bytes_saved", saved)
+        return [json.loads(r[0]) for r in rows], missing, stale
+
+    def _bump(self, conn: sqlite3.Connection, name: str, n: int = 1) -> None:
+        if n:
+            conn.execute("UPDATE stats SET value = value + ? WHERE name = ?", (n, name))
+
+    def put(self, hs: str, reporter: str, flow: str, freq: str, periods: Iterable[str], records: list[dict]) -> None:
+        """
+        요청한 기간들의 API 결과를 기간별로 통째로 교체 저장 (결과가 없던 기간은 0행으로 기록).
+        레코드의 period 값이 요청 기간 밖이면 버린다.
+        """
+        periods = [str(p) for p in periods]
+        by_period: dict[str, list[str]] = {p: [] for p in periods}
+        partners: dict[str, list[str]] = {p: [] for p in periods}
+        for rec in records:
+            p = str(rec.get("period", periods[0] if len(periods) == 1 else ""))
+            if p in by_period:
+                by_period[p].append(json.dumps(rec, ensure_ascii=False))
+                partners[p].append(str(rec.get("partnerCode", "")))
+
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for p in periods:
+                key = (hs, reporter, flow, freq, p)
+                conn.execute("DELETE FROM records WHERE hs=? AND reporter=? AND flow=? AND freq=? AND period=?", key)
+                conn.executemany(
+                    "INSERT INTO records(hs, reporter, flow, freq, period, partner, payload) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(*key, partner, payload) for partner, payload in zip(partners[p], by_period[p])],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO fetched(hs, reporter, flow, freq, period, rows, bytes, fetched_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*key, len(by_period[p]), sum(len(x.encode("utf-8")) for x in by_period[p]), now, now),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def evict(self) -> dict:
+        """TTL + stale_ttl 이 지난(갱신 중 보여 주기에도 너무 오래된) 기간 삭제 후, 남은 크기가 max_bytes 를 넘으면 오래 안 쓴 기간부터 삭제"""
+        conn = self._conn()
+        cutoff = time.time() - self.ttl - self.stale_ttl
+        # 한 트랜잭션 안에서 크기 확인 + 삭제 (다른 프로세스와 겹치지 않도록 IMMEDIATE)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            expired = conn.execute(
+                "SELECT hs, reporter, flow, freq, period FROM fetched WHERE fetched_at < ?", (cutoff,),
+            ).fetchall()
+            total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM fetched WHERE fetched_at >= ?", (cutoff,)).fetchone()[0]
+            lru = []
+            if total > self.max_bytes:
+                for *key, size in conn.execute(
+                    "SELECT hs, reporter, flow, freq, period, bytes FROM fetched WHERE fetched_at >= ? ORDER BY accessed_at",
+                    (cutoff,),
+                ).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    lru.append(tuple(key))
+                    total -= size
+            conn.execute("DELETE FROM usage WHERE requested_at < ?", (cutoff,))
+            conn.execute(
+                "DELETE FROM rollups WHERE (hs, reporter, flow, freq, period) IN "
+                "(SELECT hs, reporter, flow, freq, period FROM rollup_built WHERE built_at < ?)", (cutoff,),
+            )
+            conn.execute("DELETE FROM rollup_built WHERE built_at < ?", (cutoff,))
+            for key in expired + lru:
+                conn.execute("DELETE FROM records WHERE hs=? AND reporter=? AND flow=? AND freq=? AND period=?", key)
+                conn.execute("DELETE FROM fetched WHERE hs=? AND reporter=? AND flow=? AND freq=? AND period=?", key)
+            self._bump(conn, "expired", len(expired))
+            self._bump(conn, "evictions", len(lru))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if expired or lru:
+            conn.execute("PRAGMA incremental_vacuum")
+        return {"expired": len(expired), "evicted": len(lru)}
+
+    def start_sweeper(self, interval: float = COMTRADE_CACHE_SWEEP_SEC) -> None:
+        """evict() 를 interval 초마다 실행하는 데몬 스레드 (프로세스당 1개)"""
+        with self._init_lock:
+            if getattr(self, "_sweeper_pid", None) == os.getpid():
+                return
+            self._sweeper_pid = os.getpid()
+
+        def _loop():
+            while True:
+                try:
+                    result = self.evict()
+                    if result["expired"] or result["evicted"]:
+                        logger.info("comtrade cache sweep: %s", result)
+                except Exception:
+                    logger.exception("comtrade cache sweep failed")
+                time.sleep(interval)
+
+        threading.Thread(target=_loop, name="comtrade-cache-sweep", daemon=True).start()
+
+    # ---------- HS 계층 합계 (6 → 4 → 2 단위) ----------
+    def put_heading(
+        self, heading: str, subheadings: Iterable[str], chapter_headings: int,
+        reporter: str, flow: str, freq: str, periods: Iterable[str], records: list[dict],
+    ) -> None:
+        """
+        4단위 heading 자신과 그 아래 6단위 subheadings 전체를 한 번에 받은 API 결과 저장.
+        코드별로 put (데이터가 없던 코드도 기록) 후 heading 합계와 2단위 chapter 합계를 다시 만든다.
+        heading 합계는 Comtrade 가 호 단위로 보고한 값을 그대로 쓰고 (소호에 배분되지 않은 금액 포함),
+        그 기간에 호 단위 행이 없을 때만 소호 합으로 만든다.
+        chapter_headings: chapter 아래 4단위 호 개수 (모두 모여야 chapter 합계를 완전한 것으로 봄)
+        """
+        periods = [str(p) for p in periods]
+        by_code: dict[str, list[dict]] = {str(c): [] for c in [heading, *subheadings]}
+        for rec in records:
+            code = str(rec.get("cmdCode", ""))
+            if code in by_code:
+                by_code[code].append(rec)
+        for code, recs in by_code.items():
+            self.put(code, reporter, flow, freq, periods, recs)
+
+        own: dict[tuple[str, str], list[float]] = {}
+        summed: dict[tuple[str, str], list[float]] = {}
+        for rec in records:
+            code = str(rec.get("cmdCode", ""))
+            if code in by_code and _is_total_row(rec):
+                totals = own if code == heading else summed
+                acc = totals.setdefault((str(rec.get("period", "")), str(rec.get("partnerCode", ""))), [0.0, 0.0])
+                acc[0] += float(rec.get("primaryValue") or 0)
+                acc[1] += float(rec.get("netWgt") or 0)
+
+        chapter = heading[:2]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for p in periods:
+                totals = own if any(period == p for period, _ in own) else summed
+                rows = [(partner, v, w) for (period, partner), (v, w) in totals.items() if period == p]
+                self._replace_rollup(conn, heading, reporter, flow, freq, p, rows, 1, 1)
+                # chapter 합계 = 저장된 4단위 합계들의 합 (TTL 이내 것만)
+                fresh = time.time() - self.ttl
+                parts = conn.execute(
+                    "SELECT COUNT(*) FROM rollup_built WHERE length(hs)=4 AND hs LIKE ? AND reporter=? AND flow=? "
+                    "AND freq=? AND period=? AND built_at >= ?",
+                    (chapter + "%", reporter, flow, freq, p, fresh),
+                ).fetchone()[0]
+                ch_rows = conn.execute(
+                    "SELECT r.partner, SUM(r.value), SUM(r.weight) FROM rollups r JOIN rollup_built b "
+                    "ON r.hs=b.hs AND r.reporter=b.reporter AND r.flow=b.flow AND r.freq=b.freq AND r.period=b.period "
+                    "WHERE length(r.hs)=4 AND r.hs LIKE ? AND r.reporter=? AND r.flow=? AND r.freq=? AND r.period=? "
+                    "AND b.built_at >= ? GROUP BY r.partner",
+                    (chapter + "%", reporter, flow, freq, p, fresh),
+                ).fetchall()
+                self._replace_rollup(conn, chapter, reporter, flow, freq, p, ch_rows, parts, max(chapter_headings, parts))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _replace_rollup(self, conn, hs, reporter, flow, freq, period, rows, parts, parts_total) -> None:
+        key = (hs, reporter, flow, freq, period)
+        conn.execute("DELETE FROM rollups WHERE hs=? AND reporter=? AND flow=? AND freq=? AND period=?", key)
+        conn.executemany(
+            "INSERT INTO rollups(hs, reporter, flow, freq, period, partner, value, weight) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(*key, partner, value, weight) for partner, value, weight in rows],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO rollup_built(hs, reporter, flow, freq, period, parts, parts_total, built_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (*key, parts, parts_total, time.time()),
+        )
+
+    def rollup(self, hs: str, reporter: str, flow: str, freq: str, period: str) -> list[dict] | None:
+        """
+        4단위/2단위 합계의 파트너별 레코드 (partnerCode, primaryValue, netWgt).
+        아직 없거나 만료됐거나 하위 호가 다 모이지 않았으면 None, 모두 모였는데 거래가 없으면 [].
+        """
+        conn = self._conn()
+        key = (hs, reporter, flow, freq, str(period))
+        built = conn.execute(
+            "SELECT parts, parts_total, built_at FROM rollup_built WHERE hs=? AND reporter=? AND flow=? AND freq=? AND period=?", key,
+        ).fetchone()
+        if built is None or built[0] < built[1] or built[2] < time.time() - self.ttl - self.stale_ttl:
+            return None
+        rows = conn.execute(
+            "SELECT partner, value, weight FROM rollups WHERE hs=? AND reporter=? AND flow=? AND freq=? AND period=?", key,
+        ).fetchall()
+        return [
+            {"cmdCode": hs, "period": str(period), "partnerCode": int(p) if p.isdigit() else p, "primaryValue": v, "netWgt": w}
+            for p, v, w in rows
+        ]
+
+    def log_usage(self, hs: str, reporter: str) -> None:
+        """분석 요청 1건 기록 (캐시 예열 대상 선정용)"""
+        self._conn().execute("INSERT INTO usage(hs, reporter, requested_at) VALUES (?, ?, ?)", (hs, reporter, time.time()))
+
+    def top_hs(self, n: int, days: float = 30) -> list[tuple[str, int]]:
+        """최근 days 일 동안 가장 많이 요청된 HS 코드 n 개 [(hs, 요청 수)]"""
+        return self._conn().execute(
+            "SELECT hs, COUNT(*) AS cnt FROM usage WHERE requested_at >= ? GROUP BY hs ORDER BY cnt DESC, MAX(requested_at) DESC LIMIT ?",
+            (time.time() - days * 86400, n),
+        ).fetchall()
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+        periods, rows, payload = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(rows), 0), COALESCE(SUM(bytes), 0) FROM fetched"
+        ).fetchone()
+        size = sum(os.path.getsize(self.path + suffix) for suffix in ("", "-wal") if os.path.exists(self.path + suffix))
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "periods": periods, "rows": rows, "payload_bytes": payload, "bytes": size,
+            "hit_ratio": counters["hits"] / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM records")
+        conn.execute("DELETE FROM fetched")
+        conn.execute("DELETE FROM rollups")
+        conn.execute("DELETE FROM rollup_built")
+        conn.execute("UPDATE stats SET value = 0")   # 사용 기록(usage)은 예열 대상 선정용이라 유지
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+_STORES: dict[str, ComtradeStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_comtrade_store(cache_dir: str, ttl: float) -> ComtradeStore:
+    """캐시 폴더별 프로세스 공용 저장소 (파일은 프로세스 간 공유). 처음 열 때 정리 스레드도 띄운다."""
+    path = os.path.abspath(os.path.join(cache_dir, COMTRADE_STORE_FILE))
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = _STORES[path] = ComtradeStore(path, ttl)
+        store.ttl = ttl
+    store.start_sweeper()
+    return store
@@ -0,0 +1,286 @@
+"""
+국가명 정규화 & 텍스트 국가 탐지
+- normalize_country_column : 국가 컬럼 값(한글명/오탈자 변형/ISO2·ISO3 코드/영문명) → 영문 표준 국가명
+- guess_country_column     : 주소/웹사이트/이메일 텍스트에서 국가 추정 (단어 경계 정규식 1개로 컴파일,
+                             못 찾으면 .co.za 같은 국가 도메인)
+둘 다 고유값 단위로 한 번만 계산해 컬럼 전체에 펼친다.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# (영문 표준명, ISO2, ISO3, 한글명·변형, 영문 별칭)
+COUNTRIES = [
+    ("United States", "US", "USA", ["미국", "미합중국", "마국", "하와이", "괌", "푸에르토리코"], ["usa", "u.s.", "u.s.a.", "united states of america", "america"]),
+    ("Canada", "CA", "CAN", ["캐나다"], []),
+    ("Mexico", "MX", "MEX", ["멕시코"], []),
+    ("Brazil", "BR", "BRA", ["브라질"], []),
+    ("Argentina", "AR", "ARG", ["아르헨티나"], []),
+    ("Chile", "CL", "CHL", ["칠레"], []),
+    ("Peru", "PE", "PER", ["페루"], []),
+    ("Colombia", "CO", "COL", ["콜롬비아"], []),
+    ("Ecuador", "EC", "ECU", ["에콰도르"], []),
+    ("Venezuela", "VE", "VEN", ["베네수엘라"], []),
+    ("Bolivia", "BO", "BOL", ["볼리비아"], []),
+    ("Uruguay", "UY", "URY", ["우루과이", "우르과이"], []),
+    ("Paraguay", "PY", "PRY", ["파라과이"], []),
+    ("Panama", "PA", "PAN", ["파나마"], []),
+    ("Costa Rica", "CR", "CRI", ["코스타리카"], []),
+    ("Guatemala", "GT", "GTM", ["과테말라"], []),
+    ("Honduras", "HN", "HND", ["온두라스"], []),
+    ("El Salvador", "SV", "SLV", ["엘살바도르"], []),
+    ("Nicaragua", "NI", "NIC", ["니카라과"], []),
+    ("Dominican Republic", "DO", "DOM", ["도미니카공화국", "도미니카"], []),
+    ("Dominica", "DM", "DMA", ["도미니카연방"], []),
+    ("Jamaica", "JM", "JAM", ["자메이카"], []),
+    ("Trinidad and Tobago", "TT", "TTO", ["트리니다드토바고"], []),
+    ("Cuba", "CU", "CUB", ["쿠바"], []),
+    ("Haiti", "HT", "HTI", ["아이티"], []),
+    ("Bahamas", "BS", "BHS", ["바하마"], []),
+    ("Barbados", "BB", "BRB", ["바베이도스"], []),
+    ("Belize", "BZ", "BLZ", ["벨리즈"], []),
+    ("Suriname", "SR", "SUR", ["수리남"], []),
+    ("Guyana", "GY", "GUY", ["가이아나"], []),
+    ("United Kingdom", "GB", "GBR", ["영국"], ["uk", "u.k.", "great britain", "england", "britain"]),
+    ("Ireland", "IE", "IRL", ["아일랜드"], []),
+    ("Germany", "DE", "DEU", ["독일"], []),
+    ("France", "FR", "FRA", ["프랑스"], []),
+    ("Italy", "IT", "ITA", ["이탈리아", "이태리"], []),
+    ("Spain", "ES", "ESP", ["스페인"], []),
+    ("Portugal", "PT", "PRT", ["포르투갈", "포루투갈"], []),
+    ("Netherlands", "NL", "NLD", ["네덜란드", "네델란드"], ["holland"]),
+    ("Belgium", "BE", "BEL", ["벨기에"], []),
+    ("Luxembourg", "LU", "LUX", ["룩셈부르크"], []),
+    ("Switzerland", "CH", "CHE", ["스위스"], []),
+    ("Austria", "AT", "AUT", ["오스트리아"], []),
+    ("Sweden", "SE", "SWE", ["스웨덴"], []),
+    ("Norway", "NO", "NOR", ["노르웨이"], []),
+    ("Denmark", "DK", "DNK", ["덴마크"], []),
+    ("Finland", "FI", "FIN", ["핀란드"], []),
+    ("Iceland", "IS", "ISL", ["아이슬란드"], []),
+    ("Poland", "PL", "POL", ["폴란드"], []),
+    ("Czech Republic", "CZ", "CZE", ["체코", "체코공화국"], ["czechia"]),
+    ("Slovakia", "SK", "SVK", ["슬로바키아"], []),
+    ("Hungary", "HU", "HUN", ["헝가리"], []),
+    ("Romania", "RO", "ROU", ["루마니아"], []),
+    ("Bulgaria", "BG", "BGR", ["불가리아"], []),
+    ("Greece", "GR", "GRC", ["그리스"], []),
+    ("Cyprus", "CY", "CYP", ["키프로스", "사이프러스", "시프러스"], []),
+    ("Malta", "MT", "MLT", ["몰타"], []),
+    ("Croatia", "HR", "HRV", ["크로아티아"], []),
+    ("Slovenia", "SI", "SVN", ["슬로베니아"], []),
+    ("Serbia", "RS", "SRB", ["세르비아"], []),
+    ("Montenegro", "ME", "MNE", ["몬테네그로", "몬테네그"], []),
+    ("Bosnia and Herzegovina", "BA", "BIH", ["보스니아헤르체고비나", "보스니아-헤르체고비나"], []),
+    ("North Macedonia", "MK", "MKD", ["마케도니아", "북마케도니아"], ["macedonia"]),
+    ("Albania", "AL", "ALB", ["알바니아", "알마니아"], []),
+    ("Kosovo", "XK", "XKX", ["코소보"], []),
+    ("Estonia", "EE", "EST", ["에스토니아"], []),
+    ("Latvia", "LV", "LVA", ["라트비아"], []),
+    ("Lithuania", "LT", "LTU", ["리투아니아"], []),
+    ("Ukraine", "UA", "UKR", ["우크라이나"], []),
+    ("Belarus", "BY", "BLR", ["벨라루스", "벨로루시"], []),
+    ("Moldova", "MD", "MDA", ["몰도바", "몰다비아"], []),
+    ("Russia", "RU", "RUS", ["러시아", "러시아연방"], ["russian federation"]),
+    ("Turkey", "TR", "TUR", ["터키", "튀르키예"], ["turkiye"]),
+    ("Georgia", "GE", "GEO", ["조지아"], []),
+    ("Armenia", "AM", "ARM", ["아르메니아"], []),
+    ("Azerbaijan", "AZ", "AZE", ["아제르바이잔", "아제르바이젠", "아르제바이잔"], []),
+    ("Kazakhstan", "KZ", "KAZ", ["카자흐스탄"], []),
+    ("Uzbekistan", "UZ", "UZB", ["우즈베키스탄"], []),
+    ("Kyrgyzstan", "KG", "KGZ", ["키르기스스탄", "키르기즈스탄"], []),
+    ("Tajikistan", "TJ", "TJK", ["타지키스탄", "타지크스탄"], []),
+    ("Turkmenistan", "TM", "TKM", ["투르크메니스탄"], []),
+    ("Mongolia", "MN", "MNG", ["몽골", "몽골리아"], []),
+    ("United Arab Emirates", "AE", "ARE", ["아랍에미리트", "아랍에미레이트"], ["uae", "u.a.e", "u.a.e."]),
+    ("Saudi Arabia", "SA", "SAU", ["사우디아라비아", "사우디"], ["saudi"]),
+    ("Qatar", "QA", "QAT", ["카타르"], []),
+    ("Kuwait", "KW", "KWT", ["쿠웨이트"], []),
+    ("Bahrain", "BH", "BHR", ["바레인"], []),
+    ("Oman", "OM", "OMN", ["오만"], []),
+    ("Yemen", "YE", "YEM", ["예멘", "예맨"], []),
+    ("Iraq", "IQ", "IRQ", ["이라크"], []),
+    ("Iran", "IR", "IRN", ["이란"], []),
+    ("Israel", "IL", "ISR", ["이스라엘"], []),
+    ("Palestine", "PS", "PSE", ["팔레스타인"], []),
+    ("Jordan", "JO", "JOR", ["요르단"], []),
+    ("Lebanon", "LB", "LBN", ["레바논"], []),
+    ("Syria", "SY", "SYR", ["시리아"], []),
+    ("Afghanistan", "AF", "AFG", ["아프가니스탄", "아프카니스탄"], []),
+    ("Pakistan", "PK", "PAK", ["파키스탄"], []),
+    ("India", "IN", "IND", ["인도"], []),
+    ("Bangladesh", "BD", "BGD", ["방글라데시"], []),
+    ("Sri Lanka", "LK", "LKA", ["스리랑카"], []),
+    ("Nepal", "NP", "NPL", ["네팔"], []),
+    ("Bhutan", "BT", "BTN", ["부탄"], []),
+    ("Maldives", "MV", "MDV", ["몰디브"], []),
+    ("China", "CN", "CHN", ["중국"], ["prc"]),
+    ("Hong Kong", "HK", "HKG", ["홍콩"], []),
+    ("Macau", "MO", "MAC", ["마카오"], ["macao"]),
+    ("Taiwan", "TW", "TWN", ["대만", "타이완"], []),
+    ("Japan", "JP", "JPN", ["일본"], []),
+    ("South Korea", "KR", "KOR", ["대한민국", "한국"], ["korea", "republic of korea", "korea, republic of"]),
+    ("Vietnam", "VN", "VNM", ["베트남", "배트남"], ["viet nam"]),
+    ("Thailand", "TH", "THA", ["태국", "타이"], []),
+    ("Malaysia", "MY", "MYS", ["말레이시아", "말레이지아"], []),
+    ("Singapore", "SG", "SGP", ["싱가포르", "싱가폴", "싱가포로"], []),
+    ("Indonesia", "ID", "IDN", ["인도네시아"], []),
+    ("Philippines", "PH", "PHL", ["필리핀"], []),
+    ("Myanmar", "MM", "MMR", ["미얀마"], ["burma"]),
+    ("Cambodia", "KH", "KHM", ["캄보디아"], []),
+    ("Laos", "LA", "LAO", ["라오스"], []),
+    ("Brunei", "BN", "BRN", ["브루나이", "부루나이"], []),
+    ("Timor-Leste", "TL", "TLS", ["동티모르", "동티모르민주공화국"], ["east timor"]),
+    ("Australia", "AU", "AUS", ["호주", "오스트레일리아"], []),
+    ("New Zealand", "NZ", "NZL", ["뉴질랜드"], []),
+    ("Papua New Guinea", "PG", "PNG", ["파푸아뉴기니"], []),
+    ("Fiji", "FJ", "FJI", ["피지"], []),
+    ("Egypt", "EG", "EGY", ["이집트"], []),
+    ("Libya", "LY", "LBY", ["리비아"], []),
+    ("Tunisia", "TN", "TUN", ["튀니지"], []),
+    ("Algeria", "DZ", "DZA", ["알제리", "알제리아"], []),
+    ("Morocco", "MA", "MAR", ["모로코", "모르코"], []),
+    ("Sudan", "SD", "SDN", ["수단"], []),
+    ("South Sudan", "SS", "SSD", ["남수단"], []),
+    ("Ethiopia", "ET", "ETH", ["에티오피아", "에디오피아"], []),
+    ("Eritrea", "ER", "ERI", ["에리트레아"], []),
+    ("Somalia", "SO", "SOM", ["소말리아"], []),
+    ("Djibouti", "DJ", "DJI", ["지부티"], []),
+    ("Kenya", "KE", "KEN", ["케냐", "케냐공화국"], []),
+    ("Uganda", "UG", "UGA", ["우간다"], []),
+    ("Tanzania", "TZ", "TZA", ["탄자니아"], []),
+    ("Rwanda", "RW", "RWA", ["르완다"], []),
+    ("Burundi", "BI", "BDI", ["부룬디"], []),
+    ("Nigeria", "NG", "NGA", ["나이지리아"], []),
+    ("Ghana", "GH", "GHA", ["가나"], []),
+    ("Cote d'Ivoire", "CI", "CIV", ["코트디부아르", "코트티부아르", "고트디부아르"], ["ivory coast"]),
+    ("Senegal", "SN", "SEN", ["세네갈"], []),
+    ("Togo", "TG", "TGO", ["토고"], []),
+    ("Benin", "BJ", "BEN", ["베냉"], []),
+    ("Cameroon", "CM", "CMR", ["카메룬", "카메론"], []),
+    ("Sierra Leone", "SL", "SLE", ["시에라리온", "시에라레논"], []),
+    ("Liberia", "LR", "LBR", ["라이베리아"], []),
+    ("Guinea", "GN", "GIN", ["기니"], []),
+    ("Mali", "ML", "MLI", ["말리"], []),
+    ("Niger", "NE", "NER", ["니제르"], []),
+    ("Burkina Faso", "BF", "BFA", ["부르키나파소"], []),
+    ("Chad", "TD", "TCD", ["차드"], []),
+    ("Gabon", "GA", "GAB", ["가봉"], []),
+    ("Gambia", "GM", "GMB", ["감비아"], []),
+    ("Congo", "CG", "COG", ["콩고"], []),
+    ("DR Congo", "CD", "COD", ["콩고민주공화국"], []),
+    ("Central African Republic", "CF", "CAF", ["중앙아프리카공화국"], []),
+    ("Angola", "AO", "AGO", ["앙골라"], []),
+    ("Zambia", "ZM", "ZMB", ["잠비아"], []),
+    ("Zimbabwe", "ZW", "ZWE", ["짐바브웨"], []),
+    ("Malawi", "MW", "MWI", ["말라위"], []),
+    ("Mozambique", "MZ", "MOZ", ["모잠비크"], []),
+    ("Madagascar", "MG", "MDG", ["마다가스카르"], []),
+    ("Mauritius", "MU", "MUS", ["모리셔스"], []),
+    ("Namibia", "NA", "NAM", ["나미비아"], []),
+    ("Botswana", "BW", "BWA", ["보츠와나"], []),
+    ("South Africa", "ZA", "ZAF", ["남아프리카공화국", "남아프리카", "남아공"], []),
+    ("Eswatini", "SZ", "SWZ", ["스와질란드", "에스와티니"], ["swaziland"]),
+    ("Lesotho", "LS", "LSO", ["레소토"], []),
+    ("Seychelles", "SC", "SYC", ["세이셸", "세이셀"], []),
+    ("Mauritania", "MR", "MRT", ["모리타니", "모리타니아"], []),
+]
+
+# 고유 코드가 아니거나 국가가 아닌 값 (정규화 대상 아님)
+NON_COUNTRY_VALUES = {"", "없음", "미정", "미기재", "기타국", "eu", "국제도"}
+
+
+def _key(s: str) -> str:
+    # 비교용 키: NFC, 소문자, 공백 제거
+    return re.sub(r"\s+", "", unicodedata.normalize("NFC", str(s)).strip().lower())
+
+
+_NAME_BY_KEY: dict[str, str] = {}
+for _name, _iso2, _iso3, _ko, _en in COUNTRIES:
+    for _alias in [_name, *_ko, *_en]:
+        _NAME_BY_KEY.setdefault(_key(_alias), _name)
+_NAME_BY_CODE = {code: name for name, iso2, iso3, _, _ in COUNTRIES for code in (iso2, iso3)}
+
+ISO2_BY_NAME = {name: iso2 for name, iso2, _, _, _ in COUNTRIES}
+ISO3_BY_NAME = {name: iso3 for name, _, iso3, _, _ in COUNTRIES}
+
+
+def normalize_country(value: str) -> str:
+    """국가 컬럼 값 1개 → 영문 표준명 (모르는 값은 공백만 정리해 그대로)"""
+    raw = unicodedata.normalize("NFC", str(value or "")).strip()
+    if _key(raw) in NON_COUNTRY_VALUES:
+        return ""
+    if raw.isascii() and raw.isupper() and len(raw) in (2, 3) and raw in _NAME_BY_CODE:
+        return _NAME_BY_CODE[raw]
+    return _NAME_BY_KEY.get(_key(raw), raw)
+
+
+def _map_uniques(values: pd.Series, fn) -> pd.Series:
+    codes, uniques = pd.factorize(values.fillna("").astype(str), sort=False)
+    mapped = np.asarray([fn(u) for u in uniques], dtype=object)
+    if len(mapped) == 0:
+        return pd.Series([""] * len(values), index=values.index, dtype=object)
+    return pd.Series(mapped[codes], index=values.index, dtype=object)
+
+
+def normalize_country_column(values: pd.Series) -> pd.Series:
+    return _map_uniques(values, normalize_country)
+
+
+# ============================================================
+# 텍스트 속 국가 탐지 (단어 경계 정규식 1개)
+# ============================================================
+def _build_text_matcher() -> tuple[re.Pattern, dict[str, str]]:
+    names: dict[str, str] = {}
+    for name, _, _, ko, en in COUNTRIES:
+        for alias in [name, *ko, *en]:
+            names.setdefault(unicodedata.normalize("NFC", alias).lower(), name)
+    # 긴 별칭 우선 ("republic of korea" > "korea", "남아프리카공화국" > "남아프리카")
+    alts = sorted(names, key=len, reverse=True)
+    pattern = re.compile(r"(?<!\w)(?:" + "|".join(re.escape(a) for a in alts) + r")(?!\w)")
+    return pattern, names
+
+
+_TEXT_PATTERN, _TEXT_NAMES = _build_text_matcher()
+
+# 도메인 마지막 라벨이 국가 코드인 경우 (…co.za, …@abc.com.my). 국가와 무관하게 쓰이는 코드는 제외
+_TLD_RE = re.compile(r"\.([a-z]{2})(?![\w.])")
+_VANITY_TLDS = {"io", "ai", "co", "me", "tv", "fm", "ly", "cc", "ws", "to", "gg", "la", "eu"}
+_NAME_BY_TLD = {iso2.lower(): name for name, iso2, _, _, _ in COUNTRIES if iso2.lower() not in _VANITY_TLDS}
+_NAME_BY_TLD["uk"] = "United Kingdom"
+
+
+# 국가명이면서 미국 주·도시 이름에도 쓰이는 별칭 ("Atlanta, Georgia", "New Mexico", "Lebanon, PA")
+_AMBIGUOUS_TEXT_ALIASES = {"georgia", "mexico", "jordan", "lebanon", "chad"}
+
+
+def guess_country(text: str) -> str:
+    """
+    주소/도메인/이메일 텍스트에서 가장 앞에 나오는 국가명 (단어 단위로만 매칭, 없으면 국가 도메인).
+    주·도시 이름과 겹치는 별칭(Georgia, New Mexico …)은 다른 국가명이 하나도 없을 때만 쓴다.
+
+    >>> guess_country("1180 Peachtree St, Atlanta, Georgia 30309, USA")
+    'United States'
+    >>> guess_country("Albuquerque, New Mexico, United States")
+    'United States'
+    >>> guess_country("Rustaveli Ave 12, Tbilisi, Georgia")
+    'Georgia'
+    """
+    t = unicodedata.normalize("NFC", str(text or "")).lower()
+    if not t:
+        return ""
+    found = [m.group(0) for m in _TEXT_PATTERN.finditer(t)]
+    if found:
+        clear = [a for a in found if a not in _AMBIGUOUS_TEXT_ALIASES]
+        return _TEXT_NAMES[(clear or found)[0]]
+    m = _TLD_RE.search(t)
+    return _NAME_BY_TLD.get(m.group(1), "") if m else ""
+
+
+def guess_country_column(values: pd.Series) -> pd.Series:
+    return _map_uniques(values, guess_country)
@@ -0,0 +1,123 @@
+"""
+데이터 파일 위치 매니페스트 (프로세스 공용)
+- 알려진 데이터 폴더(data/, datasets/, assets/pages/data/ ...)마다 파일명(NFC) → 경로 표를
+  만들어 두고, 이후 조회는 폴더 stat + dict 조회로 끝낸다.
+- 폴더 mtime(파일 추가/삭제/이름 변경 시 바뀜)이 달라진 폴더만 다시 훑는다.
+- 폴더 우선순위는 호출하는 쪽이 정한다 (find_data_file(name, subdirs=[...])).
+- 표에 없는 파일명만 작업 폴더 전체를 재귀 탐색한다. 찾은 경로는 파일이 남아 있는 동안,
+  못 찾은 결과는 WALK_MISS_TTL_SEC 동안만 기억한다 (하위 폴더에 새로 넣은 파일도 곧 보이도록).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Sequence
+
+# 기본 우선순위 순서 (앞쪽 폴더의 파일이 이긴다)
+DATA_SUBDIRS = ["", "data", "datasets", "assets/pages/data", "pages/data"]
+WALK_MISS_TTL_SEC = 30
+
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _nfc(s: str) -> str:
+    return unicodedata.normalize("NFC", s)
+
+
+def _mtime_ns(path: Path) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _list_files(d: Path) -> dict[str, Path]:
+    files: dict[str, Path] = {}
+    try:
+        entries = list(os.scandir(d))
+    except OSError:
+        return files
+    for e in entries:
+        if e.is_file():
+            files.setdefault(_nfc(e.name), Path(e.path))
+    return files
+
+
+class DataFileManifest:
+    """파일명 → 경로 매니페스트. find() 는 후보 폴더 stat 몇 번 외에는 파일시스템을 건드리지 않는다."""
+
+    def __init__(self, roots: list[Path] | None = None):
+        self._roots = roots
+        self._lock = threading.Lock()
+        self._listings: dict[Path, tuple[int | None, dict[str, Path]]] = {}
+        self._walked: dict[str, tuple[Path | None, float]] = {}
+
+    def _candidate_dirs(self, subdirs: Sequence[str]) -> list[Path]:
+        roots = self._roots or [Path.cwd().resolve(), _REPO_ROOT]
+        dirs, seen = [], set()
+        for root in roots:
+            for sub in subdirs:
+                d = (root / sub) if sub else root
+                if d not in seen:
+                    seen.add(d)
+                    dirs.append(d)
+        return dirs
+
+    def _files_in(self, d: Path) -> dict[str, Path]:
+        # 폴더 mtime 이 그대로면 기억해 둔 목록 (없는 폴더는 빈 목록, 생기면 mtime 이 달라져 다시 훑음)
+        mtime = _mtime_ns(d)
+        cached = self._listings.get(d)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, _list_files(d) if mtime is not None else {})
+            self._listings[d] = cached
+        return cached[1]
+
+    def _walk(self, name: str) -> Path | None:
+        # 알려진 폴더에 없을 때만: 작업 폴더 아래 전체 탐색
+        for dirpath, dirnames, filenames in os.walk(Path.cwd()):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            for fn in filenames:
+                if _nfc(fn) == name:
+                    return Path(dirpath) / fn
+        return None
+
+    def find(self, filename: str, subdirs: Sequence[str] = DATA_SUBDIRS) -> Path | None:
+        name = _nfc(filename)
+        with self._lock:
+            for d in self._candidate_dirs(subdirs):
+                hit = self._files_in(d).get(name)
+                if hit is not None:
+                    return hit
+            cached = self._walked.get(name)
+            if cached is not None:
+                path, at = cached
+                if path is not None and path.exists():
+                    return path
+                if path is None and time.monotonic() - at < WALK_MISS_TTL_SEC:
+                    return None
+            path = self._walk(name)
+            self._walked[name] = (path, time.monotonic())
+            return path
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._listings, self._walked = {}, {}
+
+
+_MANIFEST = DataFileManifest()
+
+
+def find_data_file(filename: str, subdirs: Sequence[str] = DATA_SUBDIRS) -> Path | None:
+    """
+    프로세스 공용 매니페스트에서 데이터 파일 경로를 찾는다 (없으면 None).
+    subdirs: 작업 폴더/저장소 루트 기준으로 찾아볼 하위 폴더 (우선순위 순, "" 는 루트 자체)
+    """
+    return _MANIFEST.find(filename, subdirs)
+
+
+def invalidate_data_files() -> None:
+    _MANIFEST.invalidate()
@@ -0,0 +1,100 @@
+"""
+Plotly 그림 캐시 (Streamlit 재실행마다 같은 차트를 다시 만들지 않기)
+- 키: 함수 이름 + 입력 DataFrame 내용 해시(값·인덱스·컬럼·dtype) + 나머지 인자
+- 값: 그림 JSON (fig.to_json) — 꺼낼 때마다 새 Figure 로 복원하므로 호출한 쪽이 고쳐도 캐시는 그대로
+- 프로세스 공용 LRU (세션 간 공유, 스레드 안전)
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+
+FIGURE_CACHE_SIZE = 64
+
+_CACHE: OrderedDict[str, object] = OrderedDict()
+_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0}
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()
+
+
+def _arg_key(value) -> str:
+    if isinstance(value, pd.DataFrame):
+        return "df:" + frame_fingerprint(value)
+    if isinstance(value, pd.Series):
+        return "s:" + frame_fingerprint(value.to_frame())
+    return repr(value)
+
+
+def _dump(result):
+    if isinstance(result, go.Figure):
+        return ("fig", result.to_json())
+    if isinstance(result, tuple):
+        return ("tuple", [_dump(x) for x in result])
+    return ("value", result)
+
+
+def _load(entry):
+    kind, payload = entry
+    if kind == "fig":
+        # 직접 만든 JSON 이라 다시 검증할 필요 없음 (from_json 보다 몇 배 빠름)
+        return go.Figure(json.loads(payload), _validate=False)
+    if kind == "tuple":
+        return tuple(_load(x) for x in payload)
+    return payload
+
+
+def cached_figure(func):
+    """
+    Figure (또는 Figure 가 든 tuple) 를 돌려주는 차트 함수에 붙인다.
+    같은 내용의 DataFrame 과 같은 인자로 다시 부르면 저장된 JSON 에서 바로 복원한다.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        parts = [str(func.__module__), func.__qualname__]
+        parts += [_arg_key(a) for a in args]
+        parts += [f"{k}={_arg_key(v)}" for k, v in sorted(kwargs.items())]
+        key = hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+        with _LOCK:
+            entry = _CACHE.get(key)
+            if entry is not None:
+                _CACHE.move_to_end(key)
+                _STATS["hits"] += 1
+            else:
+                _STATS["misses"] += 1
+        if entry is not None:
+            return _load(entry)
+
+        result = func(*args, **kwargs)
+        entry = _dump(result)
+        with _LOCK:
+            _CACHE[key] = entry
+            _CACHE.move_to_end(key)
+            while len(_CACHE) > FIGURE_CACHE_SIZE:
+                _CACHE.popitem(last=False)
+        return result   # 이미 JSON 으로 저장했으므로 호출한 쪽이 고쳐도 캐시에는 영향 없음
+
+    return wrapper
+
+
+def figure_cache_stats() -> dict:
+    with _LOCK:
+        return {**_STATS, "entries": len(_CACHE)}
+
+
+def clear_figure_cache() -> None:
+    with _LOCK:
+        _CACHE.clear()
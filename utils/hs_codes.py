@@ -0,0 +1,64 @@
+"""
+관세청 HS 부호 표 (data/HScode_customs.csv)
+- hs_table(): 필요한 열만 (hs 10자리, kor 한글품목명, eng 영문품목명), 프로세스당 한 번 읽음
+- HS 계층: hs_subcodes(prefix, digits) 로 하위 코드 목록, hs_heading_plan(hs) 으로
+  4단위 호 + 6단위 소호를 한 번에 받는 Comtrade 요청 계획 (수출 솔루션 페이지·캐시 예열 스크립트 공용)
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+import pandas as pd
+
+from utils.data_files import find_data_file
+
+HS_TABLE_FILE = "HScode_customs.csv"
+HS_TABLE_COLUMNS = {"HS부호": "hs", "한글품목명": "kor", "영문품목명": "eng"}
+_HS_TABLE_ENCODINGS = ["utf-8-sig", "cp949", "euc-kr"]
+
+
+@lru_cache(maxsize=1)
+def hs_table() -> pd.DataFrame:
+    """관세청 HS 표의 필요한 열만 (hs 10자리, kor, eng). 파일이 없거나 열이 다르면 빈 표"""
+    empty = pd.DataFrame(columns=list(HS_TABLE_COLUMNS.values()))
+    path = find_data_file(HS_TABLE_FILE)
+    if path is None:
+        return empty
+    for enc in _HS_TABLE_ENCODINGS:
+        try:
+            df = pd.read_csv(path, encoding=enc, usecols=list(HS_TABLE_COLUMNS), dtype=str)
+            break
+        except UnicodeDecodeError:
+            continue
+        except (OSError, ValueError):
+            return empty
+    else:
+        return empty
+    df = df[list(HS_TABLE_COLUMNS)].rename(columns=HS_TABLE_COLUMNS)
+    df["hs"] = df["hs"].astype(str).str.replace(r"\D", "", regex=True).str.zfill(10)
+    return df
+
+
+@lru_cache(maxsize=1)
+def hs_codes() -> tuple[str, ...]:
+    return tuple(sorted(set(hs_table()["hs"])))
+
+
+@lru_cache(maxsize=1024)
+def hs_subcodes(prefix: str, digits: int) -> tuple[str, ...]:
+    """관세청 HS 표에서 prefix 아래의 digits 자리 코드 목록 (예: "3304", 6 → 330410, 330420, …)"""
+    return tuple(sorted({c[:digits] for c in hs_codes() if c.startswith(prefix)}))
+
+
+def hs_heading_plan(hs_code: str) -> tuple[str, list[str], int]:
+    """
+    4단위 호 아래 6단위 소호를 한 번에 받을 때의 (heading, 소호 목록, 같은 류의 호 개수).
+    6단위 입력 코드는 관세청 표에 없어도 소호 목록에 넣는다. 4자리 미만이면 소호 목록은 비어 있음.
+    요청 cmdCode 는 heading 자신 + 소호 목록 (호 단위 합계를 Comtrade 가 보고한 값 그대로 쓰기 위해)
+    """
+    heading = hs_code[:4]
+    subheadings = list(hs_subcodes(heading, 6)) if len(hs_code) >= 4 else []
+    if len(hs_code) == 6 and hs_code not in subheadings:
+        subheadings.append(hs_code)
+    return heading, subheadings, len(hs_subcodes(heading[:2], 4))
@@ -0,0 +1,140 @@
+"""
+LLM 응답 디스크 캐시 (SQLite)
+- 키: (model, system prompt, user prompt, temperature, max_tokens) 의 SHA-256
+- TTL 이 지난 항목은 조회 시 삭제, 전체 크기가 한도를 넘으면 마지막 사용 시각이 오래된 것부터 삭제(LRU)
+- 적중/미적중 카운터는 DB 에 원자적으로 누적 → 여러 Streamlit 워커 프로세스가 같은 파일을 공유해도 안전
+  (WAL 모드 + busy timeout, 스레드별 연결)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+LLM_CACHE_PATH      = os.getenv("LLM_CACHE_PATH", os.path.join("llm_cache", "responses.sqlite3"))
+LLM_CACHE_TTL       = int(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))     # 30일
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    model       TEXT NOT NULL,
+    response    TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at);
+CREATE TABLE IF NOT EXISTS stats (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats(name, value) VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+"""
+
+
+def llm_cache_key(model: str, system_message: str, prompt: str, temperature: float, max_tokens: int | None = None) -> str:
+    payload = json.dumps([model, system_message, prompt, float(temperature), max_tokens], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: int = LLM_CACHE_TTL, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def _conn(self) -> sqlite3.Connection:
+        # fork 된 자식 프로세스는 부모의 연결을 물려받지 않고 새로 연결
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._init_lock:
+                if not self._ready:
+                    conn.executescript(_SCHEMA)
+                    self._ready = True
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _bump(self, conn: sqlite3.Connection, name: str, n: int = 1) -> None:
+        conn.execute("UPDATE stats SET value = value + ? WHERE name = ?", (n, name))
+
+    def get(self, key: str) -> str | None:
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None and now - row[1] > self.ttl:
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            row = None
+        if row is None:
+            self._bump(conn, "misses")
+            return None
+        conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self._bump(conn, "hits")
+        return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        conn = self._conn()
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        conn.execute(
+            "INSERT OR REPLACE INTO responses(key, model, response, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, model, response, size, now, now),
+        )
+        self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # 한 트랜잭션 안에서 크기 확인 + 오래된 항목 삭제 (다른 프로세스와 겹치지 않도록 IMMEDIATE)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            removed = 0
+            if total > self.max_bytes:
+                for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    total -= size
+                    removed += 1
+            if removed:
+                self._bump(conn, "evictions", removed)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {**counters, "entries": entries, "bytes": size}
+
+    def clear(self) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM responses")
+        conn.execute("UPDATE stats SET value = 0")
+
+
+_CACHE: LLMResponseCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """프로세스 공용 캐시 인스턴스 (파일은 프로세스 간 공유)"""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = LLMResponseCache()
+        return _CACHE
@@ -0,0 +1,41 @@
+"""
+Stale-while-revalidate (오래된 값을 먼저 돌려주고 뒤에서 새로 받기)
+- revalidate(key, fn): 같은 key 의 갱신이 이미 돌고 있으면 건너뛰는 백그라운드 실행 (프로세스 공용 스레드 풀)
+- 부르는 쪽은 저장된 값을 바로 보여 주고, fn 이 저장소를 새 값으로 통째로 바꿔 끼운다.
+- 갱신 작업은 작업 스레드에서 돌기 때문에 st.* 를 부르지 않는 함수에만 쓴다.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+SWR_MAX_WORKERS = 4
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=SWR_MAX_WORKERS, thread_name_prefix="swr")
+_IN_FLIGHT: set[Hashable] = set()
+_IN_FLIGHT_LOCK = threading.Lock()
+
+
+def revalidate(key: Hashable, fn: Callable[[], Any]) -> bool:
+    """fn 을 백그라운드에서 실행. 같은 key 가 이미 실행 중이면 False (중복 호출 방지)"""
+    with _IN_FLIGHT_LOCK:
+        if key in _IN_FLIGHT:
+            return False
+        _IN_FLIGHT.add(key)
+
+    def _run():
+        try:
+            fn()
+        except Exception:
+            logger.exception("background refresh failed: %r", key)
+        finally:
+            with _IN_FLIGHT_LOCK:
+                _IN_FLIGHT.discard(key)
+
+    _EXECUTOR.submit(_run)
+    return True